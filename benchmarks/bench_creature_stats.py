@@ -0,0 +1,89 @@
+"""
+Per-creature query dispatch versus `Game.effective_stats` batch evaluation (broken_chain).
+
+Run from the project root with `src` on PYTHONPATH (see scripts/set_pythonpath.bat):
+
+    python benchmarks/bench_creature_stats.py --creatures 50000
+
+Every creature has one or two attack modifiers. Each side is timed over cold ticks,
+where `game.invalidate()` runs first on both sides so both redo the full computation
+(recomposing modifiers included), and over warm ticks, where nothing changed since the
+previous tick. The batch side runs with NumPy (if installed) and with plain Python.
+"""
+
+import argparse
+import time
+from typing import Any, Callable
+
+from behavioral.chain_of_responsibility import broken_chain
+from behavioral.chain_of_responsibility.broken_chain import (
+    Creature,
+    DoubleAttackModifier,
+    Game,
+    IncreaseDefenseModifier,
+    WhatToQuery,
+)
+
+
+def build_game(count: int) -> tuple[Game, list[Creature]]:
+    """
+    :param count: Number of creatures.
+    :return: A game and its creatures, each with active modifiers.
+    """
+    game = Game()
+    creatures = [
+        Creature(game, f"goblin{i}", attack=1 + i % 5, defense=1 + i % 3) for i in range(count)
+    ]
+    for i, creature in enumerate(creatures):
+        DoubleAttackModifier(game, creature)
+        if i % 2:
+            DoubleAttackModifier(game, creature)
+            IncreaseDefenseModifier(game, creature)
+    return game, creatures
+
+
+def per_tick(game: Game, ticks: int, cold: bool, tick: Callable[[], Any]) -> tuple[float, Any]:
+    """
+    :param cold: Invalidate every cache before each tick.
+    :return: (seconds per tick, result of the last tick).
+    """
+    result = None
+    started = time.perf_counter()
+    for _ in range(ticks):
+        if cold:
+            game.invalidate()
+        result = tick()
+    return (time.perf_counter() - started) / ticks, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--creatures", type=int, default=50_000)
+    parser.add_argument("--ticks", type=int, default=5)
+    args = parser.parse_args()
+
+    game, creatures = build_game(args.creatures)
+
+    def dispatch() -> list[tuple[int, int]]:
+        return [(c.attack, c.defense) for c in creatures]
+
+    def batch() -> list[tuple[int, int]]:
+        attacks = game.effective_stats(creatures, WhatToQuery.ATTACK)
+        defenses = game.effective_stats(creatures, WhatToQuery.DEFENSE)
+        return list(zip(attacks, defenses, strict=True))
+
+    backends = [False] + [True] * broken_chain.HAVE_NUMPY
+    for cold in (True, False):
+        dispatch_s, expected = per_tick(game, args.ticks, cold, dispatch)
+        line = f"{'cold' if cold else 'warm'}: dispatch {dispatch_s * 1e3:8.1f} ms/tick"
+        for numpy_enabled in backends:
+            broken_chain.HAVE_NUMPY = numpy_enabled
+            batch_s, values = per_tick(game, args.ticks, cold, batch)
+            assert values == expected
+            label = "numpy" if numpy_enabled else "python"
+            line += f", batch[{label}] {batch_s * 1e3:8.1f} ms/tick ({dispatch_s / batch_s:.2f}x)"
+        print(f"{args.creatures:,} creatures {line}")
+
+
+if __name__ == "__main__":
+    main()
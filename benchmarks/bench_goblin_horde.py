@@ -0,0 +1,75 @@
+"""
+Cost of computing every goblin's stats: roster aggregates versus Query broadcast.
+
+Run from the project root with `src` on PYTHONPATH (see scripts/set_pythonpath.bat):
+
+    python benchmarks/bench_goblin_horde.py --sample 200
+
+Broadcasting a Query visits every creature, so a full horde pass is O(N^2). For large
+hordes the broadcast cost is measured on `--sample` goblins and extrapolated to N.
+"""
+
+import argparse
+import time
+
+from behavioral.chain_of_responsibility.goblin_horde_chain import (
+    Creature,
+    Game,
+    Goblin,
+    GoblinKing,
+    Query,
+    WhatToQuery,
+)
+
+
+def broadcast_stats(creature: Creature) -> tuple[int, int]:
+    """
+    :param creature: Creature to evaluate.
+    :return: (attack, defense) computed by broadcasting Queries to the whole roster.
+    """
+    attack = Query(WhatToQuery.ATTACK, creature.initial_attack)
+    defense = Query(WhatToQuery.DEFENSE, creature.initial_defense)
+    for other in creature.game.creatures:
+        other.query(creature, attack)
+        other.query(creature, defense)
+    return attack.value, defense.value
+
+
+def build_horde(size: int) -> Game:
+    """
+    :param size: Number of creatures; every tenth one is a GoblinKing.
+    :return: Game holding the horde.
+    """
+    game = Game()
+    game.creatures += [GoblinKing(game) if i % 10 == 0 else Goblin(game) for i in range(size)]
+    return game
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sample", type=int, default=200)
+    args = parser.parse_args()
+
+    for size in (10, 1_000, 100_000):
+        game = build_horde(size)
+        horde = list(game.creatures)
+
+        started = time.perf_counter()
+        aggregated = [(c.attack, c.defense) for c in horde]
+        aggregate_s = time.perf_counter() - started
+
+        sample = horde[: min(size, args.sample)]
+        started = time.perf_counter()
+        broadcast = [broadcast_stats(c) for c in sample]
+        broadcast_s = (time.perf_counter() - started) * size / len(sample)
+
+        assert aggregated[: len(sample)] == broadcast
+        note = " (extrapolated)" if len(sample) < size else ""
+        print(
+            f"N={size:>7,}: aggregates {aggregate_s * 1e3:10.2f} ms, "
+            f"broadcast {broadcast_s * 1e3:12.2f} ms{note} ({broadcast_s / aggregate_s:,.0f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Ticks/sec of the array-backed horde simulation versus per-object stat reads.
+
+Run from the project root with `src` on PYTHONPATH (see scripts/set_pythonpath.bat):
+
+    python benchmarks/bench_horde_simulation.py --creatures 100000 --ticks 20 --shards 4
+
+A per-object tick reads `attack`/`defense` of every goblin (O(1) each thanks to the
+registry aggregates). The sharded run executes `--shards` independent games in
+worker processes and reports aggregate throughput.
+"""
+
+import argparse
+import time
+
+from behavioral.chain_of_responsibility.goblin_horde_chain import Game, Goblin, GoblinKing
+from behavioral.chain_of_responsibility.horde_simulation import (
+    HAVE_NUMPY,
+    HordeSimulation,
+    run_sharded,
+    total_ticks_per_second,
+)
+
+
+def build_game(size: int) -> Game:
+    """
+    :param size: Number of creatures; every tenth one is a GoblinKing.
+    :return: Game holding the horde.
+    """
+    game = Game()
+    game.creatures += [GoblinKing(game) if i % 10 == 0 else Goblin(game) for i in range(size)]
+    return game
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--creatures", type=int, default=100_000)
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--shards", type=int, default=4)
+    args = parser.parse_args()
+
+    game = build_game(args.creatures)
+    creatures = list(game.creatures)
+    per_object_ticks = max(1, args.ticks // 10)
+    started = time.perf_counter()
+    for _ in range(per_object_ticks):
+        stats = [(c.attack, c.defense) for c in creatures]
+    per_object_tps = per_object_ticks / (time.perf_counter() - started)
+
+    simulation = HordeSimulation.from_game(game)
+    report = simulation.run(args.ticks)
+    assert stats == list(zip(simulation.attack, simulation.defense, strict=True))
+
+    shards = [HordeSimulation.from_game(game) for _ in range(args.shards)]
+    reports = run_sharded(shards, args.ticks)
+    print(f"{args.creatures:,} creatures, numpy={HAVE_NUMPY}")
+    print(f"  per-object      {per_object_tps:10.1f} ticks/s")
+    print(
+        f"  simulation      {report.ticks_per_second:10.1f} ticks/s "
+        f"({report.ticks_per_second / per_object_tps:.1f}x)"
+    )
+    print(f"  {args.shards} shards        {total_ticks_per_second(reports):10.1f} ticks/s (total)")
+
+
+if __name__ == "__main__":
+    main()
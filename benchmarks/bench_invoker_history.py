@@ -0,0 +1,60 @@
+"""
+Per-command cost of the Invoker undo history once the undo limit is reached.
+
+Run from the project root with `src` on PYTHONPATH (see scripts/set_pythonpath.bat):
+
+    python benchmarks/bench_invoker_history.py --undo-limit 100000 --commands 400000
+
+Each window of `--window` commands is timed; a flat column means eviction cost does not
+grow with the history size. `ListHistoryInvoker` reproduces the former list-based history
+(`pop(0)` eviction) for comparison.
+"""
+
+import argparse
+import time
+from typing import List
+
+from behavioral.command.text_editor_command import Command, InsertText, Invoker, TextBuffer
+
+
+class ListHistoryInvoker:
+    """Former Invoker history: a list whose oldest entry is evicted with pop(0)."""
+
+    def __init__(self, undo_limit: int = 100) -> None:
+        self._undo_stack: List[Command] = []
+        self._undo_limit = max(1, undo_limit)
+
+    def run(self, cmd: Command) -> None:
+        cmd.execute()
+        self._undo_stack.append(cmd)
+        if len(self._undo_stack) > self._undo_limit:
+            self._undo_stack.pop(0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--undo-limit", type=int, default=100_000)
+    parser.add_argument("--commands", type=int, default=400_000)
+    parser.add_argument("--window", type=int, default=50_000)
+    args = parser.parse_args()
+
+    deque_invoker = Invoker(args.undo_limit)
+    for name, invoker in (
+        ("list", ListHistoryInvoker(args.undo_limit)),
+        ("deque", deque_invoker),
+    ):
+        buffer = TextBuffer()
+        windows = []
+        for _ in range(args.commands // args.window):
+            started = time.perf_counter()
+            for _ in range(args.window):
+                buffer.cursor = 0  # keep the string short: measure history cost only
+                buffer.text = ""
+                invoker.run(InsertText(buffer, "x"))
+            windows.append((time.perf_counter() - started) / args.window * 1e6)
+        print(f"{name:>6}: " + " ".join(f"{us:6.2f}" for us in windows) + "  us/command")
+    print(f"deque stats: {deque_invoker.stats()}")
+
+
+if __name__ == "__main__":
+    main()
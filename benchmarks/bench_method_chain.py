@@ -0,0 +1,146 @@
+"""
+Requests/sec of linked (recursive) versus compiled (flattened) method_chain handlers.
+
+Run from the project root with `src` on PYTHONPATH (see scripts/set_pythonpath.bat):
+
+    python benchmarks/bench_method_chain.py --requests 200000
+
+Each chain has N - 1 pass-through handlers followed by a BusinessRuleHandler, so every
+request visits all N handlers.
+
+It then replays a pool of repeated requests (distinct objects, equal contents) through
+`memoize_chain` versus the plain chain, both for the default chain and for one with a
+costly pure handler, and asserts that memoization is never slower: the memoized priced
+chain must beat the plain one, and the default chain (no costly handler) must be left
+unmemoized, so it does no lookups at all.
+"""
+
+import argparse
+import time
+
+from behavioral.chain_of_responsibility.method_chain import (
+    AuthenticationHandler,
+    BaseHandler,
+    BusinessRuleHandler,
+    RateLimitHandler,
+    Request,
+    Result,
+    ResultCache,
+    build_default_chain,
+    compile_chain,
+    memoize_chain,
+)
+
+
+class PricingHandler(BaseHandler):
+    """Pure handler doing real work per request (prices every item)."""
+
+    kinds = frozenset({"create_order"})
+    pure = True
+    costly = True
+
+    def process(self, request: Request) -> Result | None:
+        total = 0
+        for item in request.payload.get("items", []):
+            for position, char in enumerate(item * 50):
+                total += position * ord(char) % 97
+        return Result(success=True, message="Priced", data={"total": total})
+
+
+def build_chain(length: int) -> BaseHandler:
+    """
+    :param length: Total number of handlers.
+    :return: Head of a linked chain of `length` handlers.
+    """
+    head: BaseHandler = AuthenticationHandler()
+    node = head
+    for i in range(length - 2):
+        node = node.set_next(RateLimitHandler() if i % 2 else AuthenticationHandler())
+    node.set_next(BusinessRuleHandler())
+    return head
+
+
+def build_priced_chain() -> BaseHandler:
+    """
+    :return: Head of Authentication -> Pricing -> BusinessRule.
+    """
+    head = AuthenticationHandler()
+    head.set_next(PricingHandler()).set_next(BusinessRuleHandler())
+    return head
+
+
+def requests_per_second(chain: BaseHandler, request: Request, count: int) -> float:
+    handle = chain.handle
+    started = time.perf_counter()
+    for _ in range(count):
+        handle(request)
+    return count / (time.perf_counter() - started)
+
+
+def replay_per_second(
+    chains: tuple[BaseHandler, ...], requests: list[Request], repeats: int = 7
+) -> list[float]:
+    """
+    Replays `requests` through each chain in turn, `repeats` times, interleaved so that
+    machine noise hits every chain alike.
+
+    :return: Best requests/sec of each chain (its least disturbed run).
+    """
+    best = [float("inf")] * len(chains)
+    for _ in range(repeats):
+        for i, chain in enumerate(chains):
+            handle = chain.handle
+            started = time.perf_counter()
+            for request in requests:
+                handle(request)
+            best[i] = min(best[i], time.perf_counter() - started)
+    return [len(requests) / seconds for seconds in best]
+
+
+def bench_memoization(count: int) -> None:
+    """Replays `count` requests drawn from 32 distinct payloads, memoized versus plain."""
+    replay = [
+        Request(kind="create_order", payload={"user_id": f"u{i % 32}", "items": ["A", "B"]})
+        for i in range(count)
+    ]
+    for name, build in (("default", build_default_chain), ("priced", build_priced_chain)):
+        for compiled in (False, True):
+            cache = ResultCache()
+            plain = build()
+            memoized = memoize_chain(build(), cache)
+            if compiled:
+                plain, memoized = compile_chain(plain), compile_chain(memoized)
+            plain_rps, memoized_rps = replay_per_second((plain, memoized), replay)
+            label = f"{name} {'compiled' if compiled else 'linked'}"
+            print(
+                f"{label:>16}: plain {plain_rps:>10,.0f} req/s, "
+                f"memoized {memoized_rps:>10,.0f} req/s ({memoized_rps / plain_rps:.2f}x)"
+            )
+            if name == "default":
+                assert cache.hits + cache.misses == 0, f"{label} paid for cache lookups"
+            else:
+                assert memoized_rps >= plain_rps, f"memoization slowed down {label}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200_000)
+    args = parser.parse_args()
+
+    request = Request(kind="create_order", payload={"user_id": "u1", "items": ["A"]})
+    for length in (3, 20, 100):
+        linked = build_chain(length)
+        compiled = compile_chain(linked)
+        assert linked.handle(request) == compiled.handle(request)
+        count = max(1, args.requests * 3 // length)
+        linked_rps = requests_per_second(linked, request, count)
+        compiled_rps = requests_per_second(compiled, request, count)
+        print(
+            f"{length:>4} handlers: linked {linked_rps:>10,.0f} req/s, "
+            f"compiled {compiled_rps:>10,.0f} req/s ({compiled_rps / linked_rps:.2f}x)"
+        )
+    bench_memoization(args.requests)
+
+
+if __name__ == "__main__":
+    main()
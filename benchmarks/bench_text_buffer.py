@@ -0,0 +1,75 @@
+"""
+Random-edit benchmark for the TextBuffer implementations in text_editor_command.
+
+Run from the project root with `src` on PYTHONPATH (see scripts/set_pythonpath.bat):
+
+    python benchmarks/bench_text_buffer.py --edits 1000000 --size 1000000
+
+The string-backed TextBuffer copies the whole document on every edit, so it is measured
+on `--baseline-edits` edits only and compared per edit. `--run-length` edits are applied at
+each random cursor position (1 = fully random edits, larger = typing runs).
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, Dict
+
+from behavioral.command.text_editor_command import GapBuffer, PieceTableBuffer, TextBuffer
+
+BUFFERS: Dict[str, Callable[[str], TextBuffer]] = {
+    "string": TextBuffer,
+    "gap": GapBuffer,
+    "piece_table": PieceTableBuffer,
+}
+
+
+def run_edits(buffer: TextBuffer, edits: int, seed: int, run_length: int = 1) -> float:
+    """
+    Applies random cursor moves, inserts and deletes to `buffer`.
+
+    :param buffer: Buffer under test.
+    :param edits: Number of edits to apply.
+    :param seed: Seed for the edit sequence (same seed -> same edits).
+    :param run_length: Number of consecutive edits per cursor move.
+    :return: Elapsed seconds.
+    """
+    rng = random.Random(seed)
+    length = len(buffer.text)
+    started = time.perf_counter()
+    for i in range(edits):
+        if i % run_length == 0:
+            buffer.move_cursor(rng.randint(0, length))
+        if rng.random() < 0.6:
+            buffer.insert("x")
+            length += 1
+        else:
+            length -= len(buffer.delete(1))
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--edits", type=int, default=1_000_000)
+    parser.add_argument("--baseline-edits", type=int, default=10_000)
+    parser.add_argument("--size", type=int, default=1_000_000, help="initial document size")
+    parser.add_argument("--run-length", type=int, default=1, help="edits per cursor move")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    document = "a" * args.size
+    for name, factory in BUFFERS.items():
+        edits = args.baseline_edits if name == "string" else args.edits
+        buffer = factory(document)
+        elapsed = run_edits(buffer, edits, args.seed, max(1, args.run_length))
+        text_started = time.perf_counter()
+        _ = buffer.text
+        materialize = time.perf_counter() - text_started
+        print(
+            f"{name:>12}: {edits:>9} edits in {elapsed:8.3f}s "
+            f"({elapsed / edits * 1e6:8.2f} us/edit, text read {materialize * 1e3:.1f} ms)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Simulated suite time of WaitStable in fixed versus adaptive stability mode.
+
+Run from the project root with `src` on PYTHONPATH (see scripts/set_pythonpath.bat):
+
+    python benchmarks/bench_ui_wait_stable.py --steps 2000
+
+No browser is used: a fake driver animates a fraction (`--animated`) of the elements
+for a random settle time (0–`--max-settle` seconds), the rest are already static, and
+every WebDriver call costs `--rtt` seconds. Time is
+virtual (a clock is injected into WaitStable), so the run is fast and deterministic.
+"""
+
+import argparse
+import random
+
+from behavioral.chain_of_responsibility.ui_chain import UIRequest, WaitStable
+
+
+class VirtualClock:
+    """Virtual monotonic clock and sleep injected into WaitStable and the fake driver."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class AnimatedElement:
+    def __init__(self, clock: VirtualClock, settle_at: float) -> None:
+        self.clock = clock
+        self.settle_at = settle_at
+
+
+class FakeDriver:
+    def __init__(self, clock: VirtualClock, rtt: float) -> None:
+        self.clock = clock
+        self.rtt = rtt
+        self.element: AnimatedElement
+
+    def find_element(self, by: str, value: str) -> AnimatedElement:
+        self.clock.sleep(self.rtt)
+        return self.element
+
+    def execute_script(self, script: str, element: AnimatedElement) -> dict:
+        self.clock.sleep(self.rtt)
+        y = min(self.clock.now, element.settle_at) * 1000
+        return {"x": 10, "y": round(y), "width": 100, "height": 40}
+
+
+def run_suite(params: dict, settle_times: list[float], rtt: float) -> tuple[float, int]:
+    """
+    :param params: UIRequest params selecting the stability mode.
+    :param settle_times: Animation length of each step's element.
+    :param rtt: Simulated cost of one WebDriver call.
+    :return: (virtual seconds spent, steps that failed the stability check).
+    """
+    clock = VirtualClock()
+    driver = FakeDriver(clock, rtt)
+    handler = WaitStable(clock=clock.monotonic, sleep=clock.sleep)
+    failures = 0
+    for settle in settle_times:
+        driver.element = AnimatedElement(clock, clock.now + settle)
+        result = handler.handle(UIRequest(driver, "id", "btn", params=params))
+        failures += result is not None and not result.success
+    return clock.now, failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--animated", type=float, default=0.2)
+    parser.add_argument("--max-settle", type=float, default=0.15)
+    parser.add_argument("--rtt", type=float, default=0.003)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    settle_times = [
+        rng.uniform(0, args.max_settle) if rng.random() < args.animated else 0.0
+        for _ in range(args.steps)
+    ]
+    fixed_s, fixed_failures = run_suite({}, settle_times, args.rtt)
+    adaptive_s, adaptive_failures = run_suite(
+        {"stability_mode": "adaptive"}, settle_times, args.rtt
+    )
+    print(
+        f"{args.steps:,} steps, {args.animated:.0%} animated for 0-{args.max_settle}s, "
+        f"rtt {args.rtt * 1e3:.1f} ms"
+    )
+    print(f"  fixed     {fixed_s:8.1f} s  ({fixed_failures} unstable)")
+    print(f"  adaptive  {adaptive_s:8.1f} s  ({adaptive_failures} unstable)")
+    print(f"  suite time reduced {fixed_s / adaptive_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
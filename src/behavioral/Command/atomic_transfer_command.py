@@ -1,19 +1,30 @@
 from __future__ import annotations
 
+import logging
+import threading
+import time
 from abc import ABC, abstractmethod
+from bisect import bisect_right
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 
 __all__ = [
     "Command",
     "AtomicCompositeCommand",
     "TransferCommand",
+    "NettedTransferBatch",
+    "net_transfers",
+    "RollbackMetrics",
+    "default_metrics",
     "BankAccount",
     "AccountError",
     "TransactionError",
+    "PartialRollbackError",
 ]
 
+logger = logging.getLogger(__name__)
+
 
 # ==========================
 # Module: atomic_transfer_command
@@ -41,6 +52,23 @@ class TransactionError(RuntimeError):
         self.cause = cause
 
 
+class PartialRollbackError(TransactionError):
+    """
+    Raised when a composite with partial rollback fails and has been rolled back only to
+    its last savepoint. Steps before the savepoint remain applied.
+
+    :param message: Human-readable description of the failure.
+    :param cause: Original exception that triggered the rollback.
+    :param savepoint: Index of the first sub-command that ``resume()`` will re-execute.
+    """
+
+    def __init__(
+        self, message: str, cause: Optional[BaseException] = None, savepoint: int = 0
+    ) -> None:
+        super().__init__(message, cause=cause)
+        self.savepoint = savepoint
+
+
 class Command(ABC):
     """
     Base interface for executable actions with compensating undo.
@@ -172,18 +200,150 @@ class WithdrawCommand(Command):
         self._executed = False
 
 
+class RollbackMetrics:
+    """
+    Thread-safe registry of execute/rollback counters and timers for atomic composites.
+
+    Failure-triggered rollbacks (``rollbacks``) and explicit ``rollback()``/``undo()``
+    calls (``undos``) are counted and timed separately; ``resume()`` counts as a resume,
+    not an execute. Only rollback paths read the clock. Use ``snapshot()`` to export the
+    current values.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clears all counters and timers."""
+        with self._lock:
+            self.executes = 0
+            self.resumes = 0
+            self.rollbacks = 0
+            self.partial_rollbacks = 0
+            self.steps_undone = 0
+            self.max_steps_undone = 0
+            self.undo_failures = 0
+            self.rollback_seconds = 0.0
+            self.max_rollback_seconds = 0.0
+            self.undos = 0
+            self.undo_seconds = 0.0
+
+    def record_execute(self, resume: bool = False) -> None:
+        """
+        Records one execution attempt.
+
+        :param resume: True for ``resume()`` of a pending composite.
+        """
+        with self._lock:
+            if resume:
+                self.resumes += 1
+            else:
+                self.executes += 1
+
+    def record_rollback(
+        self, steps: int, seconds: float, partial: bool, failures: int = 0
+    ) -> None:
+        """
+        Records one failure-triggered rollback.
+
+        :param steps: Number of sub-commands undone.
+        :param seconds: Wall time spent undoing.
+        :param partial: True if the rollback stopped at a savepoint.
+        :param failures: Compensations that raised during the rollback.
+        """
+        with self._lock:
+            self.rollbacks += 1
+            if partial:
+                self.partial_rollbacks += 1
+            self.steps_undone += steps
+            self.max_steps_undone = max(self.max_steps_undone, steps)
+            self.undo_failures += failures
+            self.rollback_seconds += seconds
+            self.max_rollback_seconds = max(self.max_rollback_seconds, seconds)
+
+    def record_undo(self, seconds: float) -> None:
+        """
+        Records one explicit ``rollback()``/``undo()`` of a composite.
+
+        :param seconds: Wall time spent undoing.
+        """
+        with self._lock:
+            self.undos += 1
+            self.undo_seconds += seconds
+
+    def snapshot(self) -> Dict[str, float]:
+        """
+        :return: Copy of all counters plus derived means, keyed by metric name.
+        """
+        with self._lock:
+            rollbacks = self.rollbacks or 1
+            return {
+                "executes": self.executes,
+                "resumes": self.resumes,
+                "rollbacks": self.rollbacks,
+                "partial_rollbacks": self.partial_rollbacks,
+                "steps_undone": self.steps_undone,
+                "mean_steps_undone": self.steps_undone / rollbacks,
+                "max_steps_undone": self.max_steps_undone,
+                "undo_failures": self.undo_failures,
+                "rollback_seconds": self.rollback_seconds,
+                "mean_rollback_seconds": self.rollback_seconds / rollbacks,
+                "max_rollback_seconds": self.max_rollback_seconds,
+                "undos": self.undos,
+                "undo_seconds": self.undo_seconds,
+            }
+
+
+default_metrics = RollbackMetrics()
+
+
 class AtomicCompositeCommand(Command):
     """
     Executes a sequence of commands atomically: if any step fails, all prior steps are undone.
 
+    With ``partial_rollback=True`` a failure only undoes the steps executed since the last
+    savepoint (see ``savepoint()``); earlier steps stay applied and the composite can be
+    continued with ``resume()`` or abandoned with ``rollback()``. Nested composites that
+    contain a failure at their own savepoint are resumed in place by their parent.
+
     :param description: Short description for the composite.
     :param items: Ordered list of sub-commands to execute.
+    :param partial_rollback: Roll back only to the last savepoint instead of the whole batch.
+    :param metrics: Registry receiving execute/rollback metrics. If None, the composite
+                    reports to its parent's registry once nested, else to the module default.
     """
 
-    def __init__(self, description: str, items: Optional[List[Command]] = None) -> None:
+    def __init__(
+        self,
+        description: str,
+        items: Optional[List[Command]] = None,
+        partial_rollback: bool = False,
+        metrics: Optional[RollbackMetrics] = None,
+    ) -> None:
         super().__init__(description=description)
-        self._items: List[Command] = list(items) if items else []
+        self._items: List[Command] = []
         self._executed_count = 0
+        self._partial_rollback = partial_rollback
+        self._savepoints: List[int] = []
+        self._explicit_metrics = metrics is not None
+        self._metrics = metrics if metrics is not None else default_metrics
+        for item in items or ():
+            self.add(item)
+
+    @property
+    def pending(self) -> bool:
+        """
+        :return: True if a partial rollback left earlier steps applied (here or in a nested
+                 composite at the failed position), awaiting ``resume()`` or ``rollback()``;
+                 False otherwise.
+        """
+        if self._executed:
+            return False
+        if self._executed_count > 0:
+            return True
+        nested = self._items[0] if self._items else None
+        return isinstance(nested, AtomicCompositeCommand) and nested.pending
 
     def add(self, cmd: Command) -> None:
         """
@@ -191,30 +351,136 @@ class AtomicCompositeCommand(Command):
 
         :param cmd: Command to add.
         """
+        if isinstance(cmd, AtomicCompositeCommand):
+            cmd._inherit_metrics(self._metrics)
         self._items.append(cmd)
 
+    def _inherit_metrics(self, metrics: RollbackMetrics) -> None:
+        """
+        Adopts the parent's registry unless one was passed explicitly, recursively.
+
+        :param metrics: Registry of the enclosing composite.
+        """
+        if self._explicit_metrics:
+            return
+        self._metrics = metrics
+        for item in self._items:
+            if isinstance(item, AtomicCompositeCommand):
+                item._inherit_metrics(metrics)
+
+    def savepoint(self) -> int:
+        """
+        Marks a savepoint after the sub-commands added so far. A failure in a later step
+        rolls back no further than this point when ``partial_rollback`` is enabled.
+
+        :return: Index of the first sub-command after the savepoint.
+        """
+        position = len(self._items)
+        if not self._savepoints or self._savepoints[-1] != position:
+            self._savepoints.append(position)
+        return position
+
     def execute(self) -> None:
         """
-        Executes sub-commands in order. On failure, undoes all executed sub-commands
-        in reverse order and raises TransactionError.
+        Executes sub-commands in order. On failure, undoes executed sub-commands in reverse
+        order (all of them, or only those since the last savepoint) and raises
+        TransactionError (PartialRollbackError for a partial rollback).
         """
+        if self.pending:
+            self.rollback()
         self._executed_count = 0
+        self._run_from(0)
+
+    def resume(self) -> None:
+        """
+        Continues a composite left pending by a partial rollback, re-executing only the
+        failed segment and the steps after it.
+        """
+        if self._executed:
+            return
+        self._run_from(self._executed_count, resume=True)
+
+    def _run_from(self, start: int, resume: bool = False) -> None:
+        """
+        Executes sub-commands from `start` and handles rollback on failure.
+
+        :param start: Index of the first sub-command to execute.
+        :param resume: True when continuing a pending composite.
+        """
+        self._executed = False
+        self._metrics.record_execute(resume=resume)
+        index = start
         try:
-            for cmd in self._items:
-                cmd.execute()
-                self._executed_count += 1
+            while index < len(self._items):
+                cmd = self._items[index]
+                if isinstance(cmd, AtomicCompositeCommand) and cmd.pending:
+                    cmd.resume()
+                else:
+                    cmd.execute()
+                index += 1
+                self._executed_count = index
             self._executed = True
         except BaseException as exc:  # rollback on any failure
-            for cmd in reversed(self._items[: self._executed_count]):
-                try:
-                    cmd.undo()
-                except BaseException:
-                    # Intentionally swallow to keep rollback best-effort and deterministic.
-                    # In production, log this incident.
-                    pass
-            self._executed = False
+            failed = self._items[index]
+            nested_pending = isinstance(failed, AtomicCompositeCommand) and failed.pending
+            if self._partial_rollback and nested_pending:
+                # The nested composite already contained the failure at its own savepoint.
+                raise PartialRollbackError(
+                    "Nested composite was rolled back to its savepoint.",
+                    cause=exc,
+                    savepoint=index,
+                ) from exc
+            started = time.perf_counter()
+            failures = 0
+            if nested_pending and not _undo_quietly(failed):
+                failures += 1
+            target = self._last_savepoint(index) if self._partial_rollback else 0
+            for position in range(self._executed_count - 1, target - 1, -1):
+                if not _undo_quietly(self._items[position]):
+                    failures += 1
+            self._metrics.record_rollback(
+                self._executed_count - target,
+                time.perf_counter() - started,
+                partial=target > 0,
+                failures=failures,
+            )
+            self._executed_count = target
+            if target:
+                raise PartialRollbackError(
+                    "Atomic composite failed and was rolled back to its last savepoint.",
+                    cause=exc,
+                    savepoint=target,
+                ) from exc
             raise TransactionError("Atomic composite failed and was rolled back.", cause=exc) from exc
 
+    def _last_savepoint(self, index: int) -> int:
+        """
+        :param index: Index of the failed sub-command.
+        :return: Position of the last savepoint at or before `index` (0 if none).
+        """
+        slot = bisect_right(self._savepoints, index)
+        return self._savepoints[slot - 1] if slot else 0
+
+    def rollback(self) -> None:
+        """
+        Undoes every applied sub-command in reverse order, including a nested composite
+        left pending by a partial rollback. Works both after success and while pending.
+        """
+        started = time.perf_counter()
+        self._rollback_all()
+        self._metrics.record_undo(time.perf_counter() - started)
+
+    def _rollback_all(self) -> None:
+        """Rollback without recording metrics (used for nested composites)."""
+        if self._executed_count < len(self._items):
+            nested = self._items[self._executed_count]
+            if isinstance(nested, AtomicCompositeCommand) and nested.pending:
+                nested._rollback_all()
+        for position in range(self._executed_count - 1, -1, -1):
+            _compensate(self._items[position])
+        self._executed_count = 0
+        self._executed = False
+
     def undo(self) -> None:
         """
         Undoes all successfully executed sub-commands in reverse order.
@@ -222,10 +488,36 @@ class AtomicCompositeCommand(Command):
         """
         if not self._executed:
             return
-        for cmd in reversed(self._items[: self._executed_count]):
-            cmd.undo()
-        self._executed_count = 0
-        self._executed = False
+        self.rollback()
+
+
+def _compensate(cmd: Command) -> None:
+    """
+    Undoes a sub-command on behalf of its parent; nested composites are rolled back
+    without recording an explicit undo, since the parent records the operation.
+
+    :param cmd: Command to compensate.
+    """
+    if isinstance(cmd, AtomicCompositeCommand):
+        cmd._rollback_all()
+    else:
+        cmd.undo()
+
+
+def _undo_quietly(cmd: Command) -> bool:
+    """
+    Best-effort compensation used while rolling back after a failure.
+
+    :param cmd: Command to compensate (a pending composite is rolled back).
+    :return: True if the compensation succeeded; False if it raised.
+    """
+    try:
+        _compensate(cmd)
+    except BaseException as undo_exc:
+        # Swallow to keep rollback best-effort and deterministic; the failure is counted.
+        logger.warning("Undo failed for '%s': %r", cmd.description, undo_exc)
+        return False
+    return True
 
 
 class TransferCommand(AtomicCompositeCommand):
@@ -241,5 +533,160 @@ class TransferCommand(AtomicCompositeCommand):
     def __init__(self, source: BankAccount, destination: BankAccount, amount_cents: int) -> None:
         description = f"Transfer {amount_cents}c {source.name} -> {destination.name}"
         super().__init__(description=description)
+        self._source = source
+        self._destination = destination
+        self._amount = amount_cents
         self.add(WithdrawCommand(source, amount_cents))
         self.add(DepositCommand(destination, amount_cents))
+
+    @property
+    def source(self) -> BankAccount:
+        """
+        :return: Account the money is withdrawn from.
+        """
+        return self._source
+
+    @property
+    def destination(self) -> BankAccount:
+        """
+        :return: Account the money is deposited into.
+        """
+        return self._destination
+
+    @property
+    def amount_cents(self) -> int:
+        """
+        :return: Transfer amount in cents.
+        """
+        return self._amount
+
+
+def _accumulate_flows(
+    transfers: Iterable[TransferCommand],
+) -> Tuple[Dict[int, BankAccount], Dict[Tuple[int, int], int], Dict[int, int]]:
+    """
+    Sums gross transfers per account pair and per account.
+
+    :param transfers: Gross transfers.
+    :return: (accounts by id in order of first appearance, signed pair flows, net positions).
+    :raises AccountError: If a transfer amount is negative.
+    """
+    accounts: Dict[int, BankAccount] = {}
+    order: Dict[int, int] = {}
+    pairs: Dict[Tuple[int, int], int] = {}
+    positions: Dict[int, int] = {}
+    for transfer in transfers:
+        if transfer.amount_cents < 0:
+            raise AccountError("Transfer amount must be non-negative.")
+        src, dst = id(transfer.source), id(transfer.destination)
+        for key, account in ((src, transfer.source), (dst, transfer.destination)):
+            if key not in accounts:
+                accounts[key] = account
+                order[key] = len(order)
+        positions[src] = positions.get(src, 0) - transfer.amount_cents
+        positions[dst] = positions.get(dst, 0) + transfer.amount_cents
+        if order[src] <= order[dst]:
+            pairs[(src, dst)] = pairs.get((src, dst), 0) + transfer.amount_cents
+        else:
+            pairs[(dst, src)] = pairs.get((dst, src), 0) - transfer.amount_cents
+    return accounts, pairs, positions
+
+
+def _net_pairs(
+    accounts: Dict[int, BankAccount], pairs: Dict[Tuple[int, int], int]
+) -> List[TransferCommand]:
+    """
+    :param accounts: Accounts by id.
+    :param pairs: Signed flow per account pair (positive: first → second).
+    :return: At most one transfer per account pair.
+    """
+    netted: List[TransferCommand] = []
+    for (first, second), amount in pairs.items():
+        if amount > 0:
+            netted.append(TransferCommand(accounts[first], accounts[second], amount))
+        elif amount < 0:
+            netted.append(TransferCommand(accounts[second], accounts[first], -amount))
+    return netted
+
+
+def _settle_positions(
+    accounts: Dict[int, BankAccount], positions: Dict[int, int]
+) -> List[TransferCommand]:
+    """
+    :param accounts: Accounts by id.
+    :param positions: Net position per account (negative: owes money).
+    :return: Transfers from debtors to creditors settling every position.
+    """
+    debtors = [[key, -amount] for key, amount in positions.items() if amount < 0]
+    creditors = [[key, amount] for key, amount in positions.items() if amount > 0]
+    netted: List[TransferCommand] = []
+    d = c = 0
+    while d < len(debtors) and c < len(creditors):
+        amount = min(debtors[d][1], creditors[c][1])
+        netted.append(TransferCommand(accounts[debtors[d][0]], accounts[creditors[c][0]], amount))
+        debtors[d][1] -= amount
+        creditors[c][1] -= amount
+        if debtors[d][1] == 0:
+            d += 1
+        if creditors[c][1] == 0:
+            c += 1
+    return netted
+
+
+def net_transfers(
+    transfers: Iterable[TransferCommand], multilateral: bool = False
+) -> List[TransferCommand]:
+    """
+    Collapses a batch of transfers into the net movements that produce the same final
+    balances. Bilateral netting keeps at most one transfer per account pair; multilateral
+    netting settles each account's net position, needing at most (accounts - 1) transfers.
+    Output order follows the first appearance of the accounts in `transfers`.
+
+    :param transfers: Gross transfers to net.
+    :param multilateral: Net across all accounts instead of per account pair.
+    :return: Reduced list of transfers (zero-sum flows are dropped).
+    :raises AccountError: If a transfer amount is negative.
+    """
+    accounts, pairs, positions = _accumulate_flows(transfers)
+    if multilateral:
+        return _settle_positions(accounts, positions)
+    return _net_pairs(accounts, pairs)
+
+
+class NettedTransferBatch(AtomicCompositeCommand):
+    """
+    Atomic batch that nets its transfers before execution: offsetting flows are collapsed
+    and only the net movements are executed (and compensated on failure). Final balances
+    match the gross batch; overdraft checks apply to the net movements.
+
+    :param description: Short description for the batch.
+    :param transfers: Gross transfers to net and execute.
+    :param multilateral: Net across all accounts instead of per account pair.
+    :param metrics: Registry receiving execute/rollback metrics for the batch and its
+                    transfers (module default if None).
+    """
+
+    def __init__(
+        self,
+        description: str,
+        transfers: List[TransferCommand],
+        multilateral: bool = False,
+        metrics: Optional[RollbackMetrics] = None,
+    ) -> None:
+        netted: List[Command] = list(net_transfers(transfers, multilateral=multilateral))
+        super().__init__(description=description, items=netted, metrics=metrics)
+        self._gross_count = len(transfers)
+
+    @property
+    def gross_count(self) -> int:
+        """
+        :return: Number of transfers in the batch before netting.
+        """
+        return self._gross_count
+
+    @property
+    def net_count(self) -> int:
+        """
+        :return: Number of transfers actually executed after netting.
+        """
+        return len(self._items)
@@ -1,6 +1,13 @@
+import os
+import random
+import sys
+import time
 from abc import ABC, abstractmethod
+from array import array
+from collections import deque
+from itertools import chain
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Any, Callable, Deque, List, Optional, Sequence, Tuple, Union
 
 
 # ==========================
@@ -40,6 +47,24 @@ class Command(ABC):
         Reverts the effects of execute().
         """
 
+    def payload_size(self) -> int:
+        """
+        Estimates the memory retained by this command for undo/redo.
+
+        :return: Approximate size in bytes.
+        """
+        return sys.getsizeof(self._description)
+
+    def merge(self, other: "Command") -> bool:
+        """
+        Absorbs an executed `other` that directly continues this command, so that undoing
+        the merged command equals undoing both. Used by Invoker to coalesce typing runs.
+
+        :param other: Command executed right after this one.
+        :return: True if `other` was merged into this command; False otherwise.
+        """
+        return False
+
 
 @dataclass
 class TextBuffer:
@@ -81,6 +106,527 @@ class TextBuffer:
         self.cursor = pos
         return prev
 
+    def apply_batch(self, edits: Sequence[Tuple[int, int, str]]) -> List[str]:
+        """
+        Applies many edits in one linear pass over the text (O(n + k)).
+
+        Positions refer to the text before the batch. A cursor after an edit shifts with
+        it; a cursor inside a deleted range moves to the end of that edit's insertion.
+
+        :param edits: (position, delete_count, insert_text) tuples, sorted by position
+                      and non-overlapping.
+        :return: The deleted substrings, one per edit (for undo).
+        :raises ValueError: If edits are unsorted, overlapping or out of range.
+        """
+        text = self.text
+        parts: List[str] = []
+        deleted: List[str] = []
+        last = delta = 0
+        inside: Optional[int] = None
+        for pos, count, insert in edits:
+            if pos < last or count < 0 or pos + count > len(text):
+                raise ValueError("Batch edits must be sorted, non-overlapping and in range.")
+            parts.append(text[last:pos])
+            parts.append(insert)
+            deleted.append(text[pos: pos + count])
+            if pos + count <= self.cursor:
+                delta += len(insert) - count
+            elif pos < self.cursor:
+                inside = pos + delta + len(insert)
+            last = pos + count
+        parts.append(text[last:])
+        cursor = inside if inside is not None else self.cursor + delta
+        self.text = "".join(parts)
+        self.cursor = cursor
+        return deleted
+
+
+class _Piece:
+    """
+    Treap node referencing a slice of an immutable source string.
+
+    :param source: String the piece points into (original text or an inserted string).
+    :param start: Offset of the piece within `source`.
+    :param length: Number of characters in the piece.
+    :param priority: Heap priority keeping the treap balanced.
+    """
+
+    __slots__ = ("source", "start", "length", "priority", "size", "left", "right")
+
+    def __init__(self, source: str, start: int, length: int, priority: float) -> None:
+        self.source = source
+        self.start = start
+        self.length = length
+        self.priority = priority
+        self.size = length
+        self.left: Optional[_Piece] = None
+        self.right: Optional[_Piece] = None
+
+
+def _size(node: Optional[_Piece]) -> int:
+    return node.size if node is not None else 0
+
+
+def _update(node: _Piece) -> None:
+    node.size = node.length + _size(node.left) + _size(node.right)
+
+
+def _split(node: Optional[_Piece], pos: int) -> Tuple[Optional[_Piece], Optional[_Piece]]:
+    """
+    Splits a piece tree into the first `pos` characters and the rest.
+
+    :param node: Root of the tree to split.
+    :param pos: Character offset of the split.
+    :return: (left, right) trees.
+    """
+    if node is None:
+        return None, None
+    left_size = _size(node.left)
+    if pos <= left_size:
+        left, node.left = _split(node.left, pos)
+        _update(node)
+        return left, node
+    if pos >= left_size + node.length:
+        node.right, right = _split(node.right, pos - left_size - node.length)
+        _update(node)
+        return node, right
+    # The split falls inside this piece: cut it in two; the tail inherits the priority.
+    offset = pos - left_size
+    tail = _Piece(node.source, node.start + offset, node.length - offset, node.priority)
+    tail.right = node.right
+    _update(tail)
+    node.length = offset
+    node.right = None
+    _update(node)
+    return node, tail
+
+
+def _merge(left: Optional[_Piece], right: Optional[_Piece]) -> Optional[_Piece]:
+    """
+    Concatenates two piece trees.
+
+    :param left: Tree holding the leading characters.
+    :param right: Tree holding the trailing characters.
+    :return: Root of the merged tree.
+    """
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _update(left)
+        return left
+    right.left = _merge(left, right.left)
+    _update(right)
+    return right
+
+
+def _materialize(node: Optional[_Piece]) -> str:
+    """
+    :param node: Root of a piece tree.
+    :return: The text the tree represents (in-order concatenation of its pieces).
+    """
+    parts: List[str] = []
+    stack: List[_Piece] = []
+    while stack or node is not None:
+        while node is not None:
+            stack.append(node)
+            node = node.left
+        node = stack.pop()
+        parts.append(node.source[node.start: node.start + node.length])
+        node = node.right
+    return "".join(parts)
+
+
+class PieceTableBuffer(TextBuffer):
+    """
+    TextBuffer backed by a piece table kept in a treap, for large documents.
+
+    Edits never copy document text: insert/delete split and merge pieces in O(log n)
+    expected time, and `text` is materialized lazily (and cached) only when read.
+    Works as a drop-in receiver for all commands in this module.
+    """
+
+    def __init__(self, text: str = "", cursor: int = 0) -> None:
+        self._root: Optional[_Piece] = None
+        self._cache: Optional[str] = None
+        super().__init__(text=text, cursor=cursor)
+
+    @property
+    def text(self) -> str:
+        """
+        :return: Current document text (materialized on first read after an edit).
+        """
+        if self._cache is None:
+            self._cache = _materialize(self._root)
+        return self._cache
+
+    @text.setter
+    def text(self, value: str) -> None:
+        self._load(value)
+
+    def _load(self, value: str) -> None:
+        """
+        Replaces the whole document with a single piece.
+
+        :param value: New document text.
+        """
+        self._root = _Piece(value, 0, len(value), random.random()) if value else None
+        self._cache = value
+
+    def __len__(self) -> int:
+        return _size(self._root)
+
+    def insert(self, s: str) -> None:
+        """
+        Inserts string at the current cursor and moves the cursor forward.
+
+        :param s: Text to insert.
+        """
+        if s:
+            left, right = _split(self._root, self.cursor)
+            piece = _Piece(s, 0, len(s), random.random())
+            self._root = _merge(_merge(left, piece), right)
+            self._cache = None
+        self.cursor += len(s)
+
+    def delete(self, count: int) -> str:
+        """
+        Deletes `count` characters starting at current cursor.
+
+        :param count: Number of characters to delete.
+        :return: The deleted substring (for undo).
+        """
+        if count <= 0:
+            return ""
+        left, rest = _split(self._root, self.cursor)
+        removed, right = _split(rest, count)
+        self._root = _merge(left, right)
+        if removed is not None:
+            self._cache = None
+        return _materialize(removed)
+
+    def move_cursor(self, pos: int) -> int:
+        """
+        Moves cursor to `pos` within [0, len(text)] without materializing the text.
+
+        :param pos: Target position.
+        :return: Previous cursor position (for undo).
+        """
+        pos = max(0, min(pos, len(self)))
+        prev = self.cursor
+        self.cursor = pos
+        return prev
+
+
+class GapBuffer(TextBuffer):
+    """
+    TextBuffer backed by a gap buffer, for typing runs at one cursor location.
+
+    Characters live in a list with an unused gap at the cursor: inserts and deletes at
+    the cursor are amortized O(1) per character, and the gap moves only when the cursor
+    does. Works as a drop-in receiver for all commands in this module.
+
+    :param gap_size: Initial gap capacity in characters.
+    """
+
+    def __init__(self, text: str = "", cursor: int = 0, gap_size: int = 64) -> None:
+        self._chars: List[str] = []
+        self._gap_start = 0
+        self._gap_end = 0
+        self._gap_size = max(1, gap_size)
+        self._cache: Optional[str] = None
+        super().__init__(text=text, cursor=cursor)
+
+    @property
+    def text(self) -> str:
+        """
+        :return: Current document text (materialized on first read after an edit).
+        """
+        if self._cache is None:
+            chars = self._chars
+            self._cache = "".join(chars[: self._gap_start]) + "".join(chars[self._gap_end:])
+        return self._cache
+
+    @text.setter
+    def text(self, value: str) -> None:
+        self._chars = list(value) + [""] * self._gap_size
+        self._gap_start = len(value)
+        self._gap_end = len(self._chars)
+        self._cache = value
+
+    @property
+    def cursor(self) -> int:
+        """
+        :return: Cursor position (always the start of the gap).
+        """
+        return self._gap_start
+
+    @cursor.setter
+    def cursor(self, pos: int) -> None:
+        pos = max(0, min(pos, len(self)))
+        start, end = self._gap_start, self._gap_end
+        chars = self._chars
+        if pos < start:
+            shift = start - pos
+            chars[end - shift: end] = chars[pos:start]
+            self._gap_start, self._gap_end = pos, end - shift
+        elif pos > start:
+            shift = pos - start
+            chars[start: start + shift] = chars[end: end + shift]
+            self._gap_start, self._gap_end = start + shift, end + shift
+
+    def __len__(self) -> int:
+        return len(self._chars) - (self._gap_end - self._gap_start)
+
+    def insert(self, s: str) -> None:
+        """
+        Inserts string at the current cursor (into the gap) and moves the cursor forward.
+
+        :param s: Text to insert.
+        """
+        if not s:
+            return
+        n = len(s)
+        if self._gap_end - self._gap_start < n:
+            grow = max(n, len(self._chars), self._gap_size)
+            self._chars[self._gap_end: self._gap_end] = [""] * grow
+            self._gap_end += grow
+        self._chars[self._gap_start: self._gap_start + n] = s
+        self._gap_start += n
+        self._cache = None
+
+    def delete(self, count: int) -> str:
+        """
+        Deletes `count` characters starting at current cursor by widening the gap.
+
+        :param count: Number of characters to delete.
+        :return: The deleted substring (for undo).
+        """
+        count = max(0, min(count, len(self._chars) - self._gap_end))
+        if not count:
+            return ""
+        deleted = "".join(self._chars[self._gap_end: self._gap_end + count])
+        self._gap_end += count
+        self._cache = None
+        return deleted
+
+    def move_cursor(self, pos: int) -> int:
+        """
+        Moves cursor (and the gap) to `pos` within [0, len(text)].
+
+        :param pos: Target position.
+        :return: Previous cursor position (for undo).
+        """
+        prev = self._gap_start
+        self.cursor = pos
+        return prev
+
+
+class _Line:
+    """
+    Treap node holding the length of one line (including its trailing newline).
+
+    :param length: Characters in the line.
+    :param priority: Heap priority keeping the treap balanced.
+    """
+
+    __slots__ = ("length", "priority", "size", "count", "left", "right")
+
+    def __init__(self, length: int, priority: float) -> None:
+        self.length = length
+        self.priority = priority
+        self.size = length
+        self.count = 1
+        self.left: Optional[_Line] = None
+        self.right: Optional[_Line] = None
+
+
+def _line_update(node: _Line) -> None:
+    node.size, node.count = node.length, 1
+    for child in (node.left, node.right):
+        if child is not None:
+            node.size += child.size
+            node.count += child.count
+
+
+def _line_split(node: Optional[_Line], k: int) -> Tuple[Optional[_Line], Optional[_Line]]:
+    """
+    Splits a line tree into its first `k` lines and the rest.
+    """
+    if node is None:
+        return None, None
+    left_count = node.left.count if node.left is not None else 0
+    if k <= left_count:
+        left, node.left = _line_split(node.left, k)
+        _line_update(node)
+        return left, node
+    node.right, right = _line_split(node.right, k - left_count - 1)
+    _line_update(node)
+    return node, right
+
+
+def _line_merge(left: Optional[_Line], right: Optional[_Line]) -> Optional[_Line]:
+    """
+    Concatenates two line trees.
+    """
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _line_merge(left.right, right)
+        _line_update(left)
+        return left
+    right.left = _line_merge(left, right.left)
+    _line_update(right)
+    return right
+
+
+def _line_build(lengths: List[int]) -> Optional[_Line]:
+    """
+    Builds a line tree in O(L) (Cartesian tree over random priorities).
+
+    :param lengths: Line lengths in document order.
+    :return: Root of the tree.
+    """
+    spine: List[_Line] = []
+    for length in lengths:
+        node = _Line(length, random.random())
+        last: Optional[_Line] = None
+        while spine and spine[-1].priority < node.priority:
+            last = spine.pop()
+            _line_update(last)
+        node.left = last
+        if spine:
+            spine[-1].right = node
+        spine.append(node)
+    for node in reversed(spine):
+        _line_update(node)
+    return spine[0] if spine else None
+
+
+class LineIndexedBuffer(PieceTableBuffer):
+    """
+    PieceTableBuffer with an incrementally maintained line index.
+
+    Line lengths live in an implicit treap with subtree sums, updated on every
+    insert/delete in O(log L + lines touched), so line -> offset and offset -> line
+    lookups are O(log L) without scanning `text`. Lines and columns are 0-based.
+    """
+
+    def __init__(self, text: str = "", cursor: int = 0) -> None:
+        self._lines: Optional[_Line] = None
+        super().__init__(text=text, cursor=cursor)
+
+    def _load(self, value: str) -> None:
+        """
+        Replaces the whole document and rebuilds the line index in O(n).
+
+        :param value: New document text.
+        """
+        super()._load(value)
+        lengths = [len(line) + 1 for line in value.split("\n")]
+        lengths[-1] -= 1
+        self._lines = _line_build(lengths)
+
+    @property
+    def line_count(self) -> int:
+        """
+        :return: Number of lines (an empty document has one empty line).
+        """
+        return self._lines.count if self._lines is not None else 1
+
+    def line_start(self, line: int) -> int:
+        """
+        :param line: Line number, clamped to [0, line_count - 1].
+        :return: Offset of the first character of the line.
+        """
+        k = max(0, min(line, self.line_count - 1))
+        node, offset = self._lines, 0
+        while node is not None:
+            left_count = node.left.count if node.left is not None else 0
+            if k <= left_count:
+                node = node.left
+            else:
+                offset += (node.left.size if node.left is not None else 0) + node.length
+                k -= left_count + 1
+                node = node.right
+        return offset
+
+    def line_of(self, offset: int) -> int:
+        """
+        :param offset: Character offset, clamped to [0, len(text)].
+        :return: Line containing the offset.
+        """
+        node, line = self._lines, 0
+        offset = max(0, offset)
+        while node is not None:
+            left_size = node.left.size if node.left is not None else 0
+            left_count = node.left.count if node.left is not None else 0
+            if offset < left_size:
+                node = node.left
+            elif offset < left_size + node.length:
+                return line + left_count
+            else:
+                offset -= left_size + node.length
+                line += left_count + 1
+                node = node.right
+        return self.line_count - 1
+
+    def offset_of(self, line: int, column: int) -> int:
+        """
+        :param line: Line number, clamped to the document.
+        :param column: Column, clamped to the line (excluding its newline).
+        :return: Character offset of the position.
+        """
+        line = max(0, min(line, self.line_count - 1))
+        start = self.line_start(line)
+        end = self.line_start(line + 1) - 1 if line + 1 < self.line_count else len(self)
+        return start + max(0, min(column, end - start))
+
+    def insert(self, s: str) -> None:
+        """
+        Inserts string at the current cursor, updating the line index.
+
+        :param s: Text to insert.
+        """
+        pos = self.cursor
+        super().insert(s)
+        if not s:
+            return
+        line = self.line_of(pos)
+        column = pos - self.line_start(line)
+        left, rest = _line_split(self._lines, line)
+        old, right = _line_split(rest, 1)
+        tail = (old.length if old is not None else 0) - column
+        pieces = s.split("\n")
+        if len(pieces) == 1:
+            lengths = [column + len(s) + tail]
+        else:
+            lengths = [column + len(pieces[0]) + 1]
+            lengths += [len(piece) + 1 for piece in pieces[1:-1]]
+            lengths.append(len(pieces[-1]) + tail)
+        self._lines = _line_merge(_line_merge(left, _line_build(lengths)), right)
+
+    def delete(self, count: int) -> str:
+        """
+        Deletes `count` characters starting at current cursor, updating the line index.
+
+        :param count: Number of characters to delete.
+        :return: The deleted substring (for undo).
+        """
+        pos = self.cursor
+        deleted = super().delete(count)
+        if deleted:
+            line = self.line_of(pos)
+            left, rest = _line_split(self._lines, line)
+            old, right = _line_split(rest, deleted.count("\n") + 1)
+            merged = (old.size if old is not None else 0) - len(deleted)
+            self._lines = _line_merge(_line_merge(left, _Line(merged, random.random())), right)
+        return deleted
+
 
 class InsertText(Command):
     """
@@ -106,6 +652,30 @@ class InsertText(Command):
         _ = prev  # explicit no-op to satisfy linters about unused variable
         self._buffer.delete(len(self._text))
 
+    def payload_size(self) -> int:
+        """
+        :return: Approximate bytes retained (description plus inserted text).
+        """
+        return super().payload_size() + sys.getsizeof(self._text)
+
+    def merge(self, other: Command) -> bool:
+        """
+        Merges an insert that started exactly where this one ended.
+
+        :param other: Command executed right after this one.
+        :return: True if merged; False otherwise.
+        """
+        if (
+            not isinstance(other, InsertText)
+            or other._buffer is not self._buffer
+            or self._start_pos is None
+            or other._start_pos != self._start_pos + len(self._text)
+        ):
+            return False
+        self._text += other._text
+        self._description = f"Insert '{self._text}'"
+        return True
+
 
 class DeleteText(Command):
     """
@@ -117,14 +687,52 @@ class DeleteText(Command):
         self._buffer = buffer
         self._count = max(0, count)
         self._deleted: str = ""
+        self._pos: Optional[int] = None
 
     def execute(self) -> None:
-        """Delete and remember removed text for undo."""
+        """Delete and remember position and removed text for undo."""
+        self._pos = self._buffer.cursor
         self._deleted = self._buffer.delete(self._count)
 
     def undo(self) -> None:
-        """Reinsert the previously deleted text."""
+        """Reinsert the previously deleted text where it was and restore the cursor."""
+        if self._pos is None:
+            return
+        self._buffer.move_cursor(self._pos)
         self._buffer.insert(self._deleted)
+        self._buffer.move_cursor(self._pos)
+
+    def payload_size(self) -> int:
+        """
+        :return: Approximate bytes retained (description plus deleted text).
+        """
+        return super().payload_size() + sys.getsizeof(self._deleted)
+
+    def merge(self, other: Command) -> bool:
+        """
+        Merges a delete adjacent to this one: at the same position (forward delete) or
+        ending where this one started (backspace).
+
+        :param other: Command executed right after this one.
+        :return: True if merged; False otherwise.
+        """
+        if (
+            not isinstance(other, DeleteText)
+            or other._buffer is not self._buffer
+            or self._pos is None
+            or other._pos is None
+        ):
+            return False
+        if other._pos == self._pos:
+            self._deleted += other._deleted
+        elif other._pos + len(other._deleted) == self._pos:
+            self._deleted = other._deleted + self._deleted
+            self._pos = other._pos
+        else:
+            return False
+        self._count = len(self._deleted)
+        self._description = f"Delete {self._count} chars"
+        return True
 
 
 class MoveCursor(Command):
@@ -149,6 +757,31 @@ class MoveCursor(Command):
         _ = self._buffer.move_cursor(self._prev)
 
 
+class MoveToLine(Command):
+    """
+    Moves the cursor to a line/column position (0-based) of a LineIndexedBuffer.
+    """
+
+    def __init__(self, buffer: LineIndexedBuffer, line: int, column: int = 0) -> None:
+        super().__init__(description=f"Move cursor to line {line}, column {column}")
+        self._buffer = buffer
+        self._line = line
+        self._column = column
+        self._offset: Optional[int] = None
+        self._prev: Optional[int] = None
+
+    def execute(self) -> None:
+        """Resolve the offset via the line index, move and remember previous position."""
+        self._offset = self._buffer.offset_of(self._line, self._column)
+        self._prev = self._buffer.move_cursor(self._offset)
+
+    def undo(self) -> None:
+        """Return cursor to the previous position."""
+        if self._prev is None:
+            return
+        _ = self._buffer.move_cursor(self._prev)
+
+
 class MacroCommand(Command):
     """
     Executes a list of commands atomically (best-effort) with reverse-order undo.
@@ -182,30 +815,153 @@ class MacroCommand(Command):
             cmd.undo()
         self._executed = 0
 
+    def payload_size(self) -> int:
+        """
+        :return: Approximate bytes retained by the macro and all of its commands.
+        """
+        return super().payload_size() + sum(cmd.payload_size() for cmd in self._items)
+
+
+class BatchEditCommand(Command):
+    """
+    Applies a sorted batch of (position, delete_count, insert_text) edits in one pass,
+    e.g. replace-all or column edits; undo applies the inverse batch in one pass.
+
+    :param edits: Edits sorted by position, non-overlapping (see TextBuffer.apply_batch).
+    """
+
+    def __init__(self, buffer: TextBuffer, edits: Sequence[Tuple[int, int, str]]) -> None:
+        super().__init__(description=f"Batch edit ({len(edits)} edits)")
+        self._buffer = buffer
+        self._edits: List[Tuple[int, int, str]] = list(edits)
+        self._inverse: List[Tuple[int, int, str]] = []
+        self._prev_cursor: Optional[int] = None
+
+    def execute(self) -> None:
+        """Apply the batch and derive the inverse batch in post-edit coordinates."""
+        self._prev_cursor = self._buffer.cursor
+        deleted = self._buffer.apply_batch(self._edits)
+        self._inverse = []
+        shift = 0
+        for (pos, count, insert), removed in zip(self._edits, deleted, strict=True):
+            self._inverse.append((pos + shift, len(insert), removed))
+            shift += len(insert) - count
+
+    def undo(self) -> None:
+        """Apply the inverse batch and restore the cursor."""
+        if self._prev_cursor is None:
+            return
+        self._buffer.apply_batch(self._inverse)
+        self._buffer.move_cursor(self._prev_cursor)
+        self._prev_cursor = None
+
+    def payload_size(self) -> int:
+        """
+        :return: Approximate bytes retained (description plus edit and inverse texts).
+        """
+        texts = [edit[2] for edit in self._edits] + [edit[2] for edit in self._inverse]
+        return super().payload_size() + sum(sys.getsizeof(text) for text in texts)
+
+
+@dataclass(frozen=True, slots=True)
+class HistoryStats:
+    """
+    Snapshot of an Invoker's undo/redo history.
+
+    :param undo_depth: Commands available for undo.
+    :param redo_depth: Commands available for redo.
+    :param undo_bytes: Estimated bytes retained by the undo history.
+    :param redo_bytes: Estimated bytes retained by the redo history.
+    :param evicted: Commands dropped from the undo history because of the limits.
+    """
+    undo_depth: int
+    redo_depth: int
+    undo_bytes: int
+    redo_bytes: int
+    evicted: int
+
 
 class Invoker:
     """
     Executes commands and maintains undo/redo history.
 
+    The undo history is a deque, so evicting the oldest entry is O(1). Entries are
+    evicted when either the count limit or the (optional) byte limit is exceeded;
+    sizes come from ``Command.payload_size()`` and are measured when recorded.
+
+    With a `coalesce_window`, a command run within that many seconds of the previous
+    one is merged into the last history entry when contiguous (see ``Command.merge``),
+    so a typing run undoes as one step. Undo and redo end the current run.
+
     :param undo_limit: Maximum number of entries kept in history.
+    :param byte_limit: Maximum estimated bytes kept in history (None = unlimited).
+    :param coalesce_window: Seconds between runs that still coalesce (None = disabled).
+    :param clock: Monotonic time source in seconds (injectable for tests).
     """
 
-    def __init__(self, undo_limit: int = 100) -> None:
-        self._undo_stack: List[Command] = []
-        self._redo_stack: List[Command] = []
+    def __init__(
+        self,
+        undo_limit: int = 100,
+        byte_limit: Optional[int] = None,
+        coalesce_window: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._undo_stack: Deque[Tuple[Command, int]] = deque()
+        self._redo_stack: List[Tuple[Command, int]] = []
         self._undo_limit = max(1, undo_limit)
+        self._byte_limit = byte_limit
+        self._undo_bytes = 0
+        self._redo_bytes = 0
+        self._evicted = 0
+        self._coalesce_window = coalesce_window
+        self._clock = clock
+        self._last_run_at: Optional[float] = None
 
     def run(self, cmd: Command) -> None:
         """
-        Executes a command and records it for undo; clears redo history.
+        Executes a command and records it for undo (coalescing it into the previous entry
+        when enabled and contiguous); clears redo history.
 
         :param cmd: Command to execute.
         """
         cmd.execute()
-        self._undo_stack.append(cmd)
-        if len(self._undo_stack) > self._undo_limit:
-            self._undo_stack.pop(0)
+        if self._coalesce_window is None:
+            self._record(cmd)
+        else:
+            now = self._clock()
+            last = self._last_run_at
+            if (
+                self._undo_stack
+                and last is not None
+                and now - last <= self._coalesce_window
+                and self._undo_stack[-1][0].merge(cmd)
+            ):
+                top, size = self._undo_stack.pop()
+                self._undo_bytes -= size
+                self._record(top)
+            else:
+                self._record(cmd)
+            self._last_run_at = now
         self._redo_stack.clear()
+        self._redo_bytes = 0
+
+    def _record(self, cmd: Command) -> None:
+        """
+        Pushes an executed command onto the undo history and enforces the limits.
+
+        :param cmd: Executed command.
+        """
+        size = cmd.payload_size()
+        self._undo_stack.append((cmd, size))
+        self._undo_bytes += size
+        while len(self._undo_stack) > self._undo_limit or (
+            self._byte_limit is not None
+            and self._undo_bytes > self._byte_limit
+            and len(self._undo_stack) > 1
+        ):
+            _, evicted_size = self._undo_stack.popleft()
+            self._undo_bytes -= evicted_size
+            self._evicted += 1
 
     def undo(self) -> bool:
         """
@@ -215,9 +971,12 @@ class Invoker:
         """
         if not self._undo_stack:
             return False
-        cmd = self._undo_stack.pop()
+        cmd, size = self._undo_stack.pop()
+        self._undo_bytes -= size
+        self._last_run_at = None
         cmd.undo()
-        self._redo_stack.append(cmd)
+        self._redo_stack.append((cmd, size))
+        self._redo_bytes += size
         return True
 
     def redo(self) -> bool:
@@ -228,7 +987,451 @@ class Invoker:
         """
         if not self._redo_stack:
             return False
-        cmd = self._redo_stack.pop()
+        cmd, size = self._redo_stack.pop()
+        self._redo_bytes -= size
+        self._last_run_at = None
+        cmd.execute()
+        self._record(cmd)
+        return True
+
+    def stats(self) -> HistoryStats:
+        """
+        :return: Current history depths, estimated memory and eviction count.
+        """
+        return HistoryStats(
+            undo_depth=len(self._undo_stack),
+            redo_depth=len(self._redo_stack),
+            undo_bytes=self._undo_bytes,
+            redo_bytes=self._redo_bytes,
+            evicted=self._evicted,
+        )
+
+
+# ==========================
+# Persistent history: compact append-only edit log.
+# Record: type byte, varint payload length, payload. Integers are unsigned LEB128
+# varints; strings are varint byte length + UTF-8.
+# ==========================
+
+_LOG_MAGIC = b"TXTLOG1\n"
+_REC_ENTRY, _REC_UNDO, _REC_REDO, _REC_CHECKPOINT = b"E", b"U", b"R", b"C"
+_OP_INSERT, _OP_DELETE, _OP_MOVE = 0, 1, 2
+_VARINT_MORE, _VARINT_BITS = 0x80, 0x7F  # LEB128 continuation flag / 7-bit payload
+_HEAD_MIN, _HEAD_MAX = 2, 11  # type byte + 1..10 varint bytes of payload length
+
+_EditOp = Tuple[int, int, Union[int, str]]
+
+
+class EditLogError(RuntimeError):
+    """
+    Raised when an edit log cannot be written or read back.
+    """
+
+
+def _put_varint(out: bytearray, value: int) -> None:
+    while value >= _VARINT_MORE:
+        out.append((value & _VARINT_BITS) | _VARINT_MORE)
+        value >>= 7
+    out.append(value)
+
+
+def _get_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & _VARINT_BITS) << shift
+        if byte < _VARINT_MORE:
+            return value, pos
+        shift += 7
+
+
+def _put_str(out: bytearray, value: str) -> None:
+    raw = value.encode("utf-8")
+    _put_varint(out, len(raw))
+    out += raw
+
+
+def _get_str(data: bytes, pos: int) -> Tuple[str, int]:
+    size, pos = _get_varint(data, pos)
+    return data[pos: pos + size].decode("utf-8"), pos + size
+
+
+def _insert_ops(cmd: InsertText) -> List[_EditOp]:
+    return [] if cmd._start_pos is None else [(_OP_INSERT, cmd._start_pos, cmd._text)]
+
+
+def _delete_ops(cmd: DeleteText) -> List[_EditOp]:
+    return [] if cmd._pos is None else [(_OP_DELETE, cmd._pos, cmd._deleted)]
+
+
+def _move_ops(cmd: MoveCursor) -> List[_EditOp]:
+    return [] if cmd._prev is None else [(_OP_MOVE, cmd._prev, cmd._target)]
+
+
+def _move_to_line_ops(cmd: MoveToLine) -> List[_EditOp]:
+    if cmd._prev is None or cmd._offset is None:
+        return []
+    return [(_OP_MOVE, cmd._prev, cmd._offset)]
+
+
+def _macro_ops(cmd: MacroCommand) -> List[_EditOp]:
+    return [op for item in cmd._items[: cmd._executed] for op in _command_ops(item)]
+
+
+def _batch_ops(cmd: BatchEditCommand) -> List[_EditOp]:
+    if cmd._prev_cursor is None:
+        return []
+    # Sequential ops in post-edit coordinates, bracketed by cursor restore/set.
+    ops: List[_EditOp] = [(_OP_MOVE, cmd._prev_cursor, cmd._prev_cursor)]
+    for (_, _, inserted), (pos, _, removed) in zip(cmd._edits, cmd._inverse, strict=True):
+        if removed:
+            ops.append((_OP_DELETE, pos, removed))
+        if inserted:
+            ops.append((_OP_INSERT, pos, inserted))
+    ops.append((_OP_MOVE, cmd._buffer.cursor, cmd._buffer.cursor))
+    return ops
+
+
+_OPS_BY_TYPE: Tuple[Tuple[type, Callable[[Any], List[_EditOp]]], ...] = (
+    (InsertText, _insert_ops),
+    (DeleteText, _delete_ops),
+    (MoveCursor, _move_ops),
+    (MoveToLine, _move_to_line_ops),
+    (MacroCommand, _macro_ops),
+    (BatchEditCommand, _batch_ops),
+)
+
+
+def _command_ops(cmd: Command) -> List[_EditOp]:
+    """
+    Flattens an executed command into primitive ops with resolved positions.
+
+    :param cmd: Executed InsertText, DeleteText, MoveCursor, MoveToLine, MacroCommand
+        or BatchEditCommand.
+    :return: Ops as (kind, position, text-or-target) tuples.
+    :raises EditLogError: If the command type cannot be persisted.
+    """
+    for kind, flatten in _OPS_BY_TYPE:
+        if isinstance(cmd, kind):
+            return flatten(cmd)
+    raise EditLogError(f"Cannot persist command of type {type(cmd).__name__}.")
+
+
+def _encode_ops(ops: List[_EditOp]) -> bytes:
+    out = bytearray()
+    _put_varint(out, len(ops))
+    for kind, pos, arg in ops:
+        out.append(kind)
+        _put_varint(out, pos)
+        if kind == _OP_MOVE:
+            _put_varint(out, max(0, int(arg)))
+        else:
+            _put_str(out, str(arg))
+    return bytes(out)
+
+
+def _decode_ops(payload: bytes) -> List[_EditOp]:
+    count, pos = _get_varint(payload, 0)
+    ops: List[_EditOp] = []
+    for _ in range(count):
+        kind = payload[pos]
+        at, pos = _get_varint(payload, pos + 1)
+        arg: Union[int, str]
+        if kind == _OP_MOVE:
+            arg, pos = _get_varint(payload, pos)
+        else:
+            arg, pos = _get_str(payload, pos)
+        ops.append((kind, at, arg))
+    return ops
+
+
+def _apply_ops(buffer: TextBuffer, ops: List[_EditOp], reverse: bool) -> None:
+    """
+    Replays ops forward (execute/redo) or inverts them in reverse order (undo).
+
+    :param buffer: Receiver to modify.
+    :param ops: Ops decoded from an entry record.
+    :param reverse: True to undo the ops; False to apply them.
+    """
+    if not reverse:
+        for kind, pos, arg in ops:
+            if kind == _OP_MOVE:
+                buffer.move_cursor(int(arg))
+            else:
+                buffer.move_cursor(pos)
+                if kind == _OP_INSERT:
+                    buffer.insert(str(arg))
+                else:
+                    buffer.delete(len(str(arg)))
+        return
+    for kind, pos, arg in reversed(ops):
+        buffer.move_cursor(pos)
+        if kind == _OP_INSERT:
+            buffer.delete(len(str(arg)))
+        elif kind == _OP_DELETE:
+            buffer.insert(str(arg))
+            buffer.move_cursor(pos)
+
+
+def _append_record(out: bytearray, kind: bytes, payload: bytes = b"") -> None:
+    out += kind
+    _put_varint(out, len(payload))
+    out += payload
+
+
+class PersistentInvoker:
+    """
+    Invoker whose undo/redo history lives in an append-only binary edit log on disk.
+
+    Each `run` appends one entry with the command's resolved ops; `undo`/`redo` append
+    markers and read entries back from the file, so command objects (and their text
+    payloads) are not kept in memory: the history costs 8 bytes of RAM per entry.
+    Every `checkpoint_every` entries a snapshot of the buffer is appended. Once dead
+    records (undo/redo markers and entries of abandoned redo branches) outweigh the live
+    entries, the checkpoint compacts the log instead: it is streamed to a new file as the
+    live undo/redo entries followed by one snapshot, dropping dead records and superseded
+    snapshots. Reopening the log restores buffer and history from the last checkpoint; a
+    missing or partially written header starts a new log.
+
+    :param buffer: Receiver the commands operate on; replaced by the logged state on resume.
+    :param path: Log file path (created if missing).
+    :param checkpoint_every: Entries between buffer checkpoints.
+    """
+
+    def __init__(self, buffer: TextBuffer, path: str, checkpoint_every: int = 1000) -> None:
+        self._buffer = buffer
+        self._path = path
+        self._checkpoint_every = max(1, checkpoint_every)
+        self._undo_offsets = array("q")
+        self._redo_offsets = array("q")
+        self._since_checkpoint = 0
+        self._live_bytes = 0  # entry records reachable through undo/redo
+        self._dead_bytes = 0  # markers and entries of abandoned redo branches
+        self._file = open(path, "a+b")  # pylint: disable=consider-using-with
+        self._file.seek(0)
+        header = self._file.read(len(_LOG_MAGIC))
+        if header == _LOG_MAGIC:
+            self._resume()
+        elif _LOG_MAGIC.startswith(header):  # empty, or the header write was cut short
+            self._compact()
+        else:
+            self._file.close()
+            raise EditLogError(f"{path} is not an edit log.")
+
+    def __enter__(self) -> "PersistentInvoker":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Flushes and closes the log file."""
+        self._file.close()
+
+    def _append(self, kind: bytes, payload: bytes = b"") -> int:
+        """
+        Appends one record and flushes it.
+
+        :return: File offset of the record.
+        """
+        offset = self._file.seek(0, os.SEEK_END)
+        record = bytearray()
+        _append_record(record, kind, payload)
+        self._file.write(record)
+        self._file.flush()
+        if kind == _REC_ENTRY:
+            self._live_bytes += len(record)
+        elif kind != _REC_CHECKPOINT:
+            self._dead_bytes += len(record)
+        return offset
+
+    def _record_size(self, offset: int) -> int:
+        """
+        :return: Size in bytes of the record at `offset`, header included.
+        """
+        self._file.seek(offset)
+        size, start = _get_varint(self._file.read(_HEAD_MAX), 1)
+        return start + size
+
+    def _drop_redo(self) -> None:
+        """Abandons the redo branch; its entries become dead records."""
+        for offset in self._redo_offsets:
+            size = self._record_size(offset)
+            self._live_bytes -= size
+            self._dead_bytes += size
+        self._redo_offsets = array("q")
+
+    def _read(self, offset: int) -> Tuple[bytes, bytes, int]:
+        """
+        Reads the record at `offset`.
+
+        :return: (type, payload, offset of the next record).
+        :raises EditLogError: If the record is truncated.
+        """
+        self._file.seek(offset)
+        head = self._file.read(_HEAD_MAX)
+        if len(head) < _HEAD_MIN:
+            raise EditLogError(f"Truncated record at offset {offset}.")
+        size, start = _get_varint(head, 1)
+        self._file.seek(offset + start)
+        payload = self._file.read(size)
+        if len(payload) != size:
+            raise EditLogError(f"Truncated record at offset {offset}.")
+        return head[:1], payload, offset + start + size
+
+    def _resume(self) -> None:
+        """Rebuilds history offsets and buffer state from the log."""
+        end = self._file.seek(0, os.SEEK_END)
+        offset = len(_LOG_MAGIC)
+        checkpoint: Optional[bytes] = None
+        actions: List[Tuple[bytes, int]] = []
+        while offset < end:
+            try:
+                kind, payload, next_offset = self._read(offset)
+            except (EditLogError, IndexError):
+                self._file.truncate(offset)  # drop a partially written tail record
+                break
+            if kind == _REC_ENTRY:
+                self._drop_redo()
+                self._undo_offsets.append(offset)
+                self._live_bytes += next_offset - offset
+                actions.append((kind, offset))
+            elif kind == _REC_UNDO and self._undo_offsets:
+                entry = self._undo_offsets.pop()
+                self._redo_offsets.append(entry)
+                actions.append((kind, entry))
+            elif kind == _REC_REDO and self._redo_offsets:
+                entry = self._redo_offsets.pop()
+                self._undo_offsets.append(entry)
+                actions.append((kind, entry))
+            elif kind == _REC_CHECKPOINT:
+                checkpoint, actions = payload, []
+            if kind not in (_REC_ENTRY, _REC_CHECKPOINT):
+                self._dead_bytes += next_offset - offset
+            offset = next_offset
+        if checkpoint is None:
+            raise EditLogError("Edit log has no checkpoint.")
+        cursor, pos = _get_varint(checkpoint, 0)
+        self._buffer.text, _ = _get_str(checkpoint, pos)
+        self._buffer.cursor = cursor
+        for kind, entry in actions:
+            _apply_ops(self._buffer, _decode_ops(self._read(entry)[1]), kind == _REC_UNDO)
+        self._since_checkpoint = len(actions)
+
+    def checkpoint(self) -> None:
+        """
+        Records a snapshot of the buffer, so resuming replays at most `checkpoint_every`
+        entries. Appends the snapshot while the log is mostly live; once dead records
+        outweigh the live entries, compacts the log instead (see `_compact`).
+        """
+        if self._dead_bytes and self._dead_bytes >= self._live_bytes:
+            self._compact()
+            return
+        self._append(_REC_CHECKPOINT, self._snapshot())
+        self._since_checkpoint = 0
+
+    def _snapshot(self) -> bytes:
+        payload = bytearray()
+        _put_varint(payload, self._buffer.cursor)
+        _put_str(payload, self._buffer.text)
+        return bytes(payload)
+
+    def _compact(self) -> None:
+        """
+        Rewrites the log as the live history plus a snapshot of the buffer.
+
+        Records are streamed one at a time into a new log written next to the old one,
+        which is then atomically swapped in, so a crash leaves either the old or the new
+        log intact. Undo entries are written first, then redo entries (next redo last)
+        followed by one undo marker each, which `_resume` folds back into the same stacks.
+        """
+        undo_offsets, redo_offsets = array("q"), array("q")
+        live = dead = 0
+        scratch = self._path + ".tmp"
+        with open(scratch, "wb") as compacted:
+            compacted.write(_LOG_MAGIC)
+            for offset in chain(self._undo_offsets, reversed(self._redo_offsets)):
+                record = bytearray()
+                _append_record(record, _REC_ENTRY, self._read(offset)[1])
+                undo_offsets.append(compacted.tell())
+                compacted.write(record)
+                live += len(record)
+            for _ in self._redo_offsets:
+                record = bytearray()
+                _append_record(record, _REC_UNDO)
+                redo_offsets.append(undo_offsets.pop())
+                compacted.write(record)
+                dead += len(record)
+            record = bytearray()
+            _append_record(record, _REC_CHECKPOINT, self._snapshot())
+            compacted.write(record)
+            compacted.flush()
+            os.fsync(compacted.fileno())
+        self._file.close()
+        os.replace(scratch, self._path)
+        self._file = open(self._path, "a+b")  # pylint: disable=consider-using-with
+        self._undo_offsets, self._redo_offsets = undo_offsets, redo_offsets
+        self._live_bytes, self._dead_bytes = live, dead
+        self._since_checkpoint = 0
+
+    def _advance(self) -> None:
+        self._since_checkpoint += 1
+        if self._since_checkpoint >= self._checkpoint_every:
+            self.checkpoint()
+
+    @property
+    def undo_depth(self) -> int:
+        """
+        :return: Number of entries available for undo.
+        """
+        return len(self._undo_offsets)
+
+    @property
+    def redo_depth(self) -> int:
+        """
+        :return: Number of entries available for redo.
+        """
+        return len(self._redo_offsets)
+
+    def run(self, cmd: Command) -> None:
+        """
+        Executes a command and appends it to the log; clears redo history.
+
+        :param cmd: InsertText, DeleteText, MoveCursor or MacroCommand to execute.
+        """
         cmd.execute()
-        self._undo_stack.append(cmd)
+        offset = self._append(_REC_ENTRY, _encode_ops(_command_ops(cmd)))
+        self._drop_redo()
+        self._undo_offsets.append(offset)
+        self._advance()
+
+    def undo(self) -> bool:
+        """
+        Undoes the last entry, reading its ops back from the log.
+
+        :return: True if an entry was undone; False otherwise.
+        """
+        if not self._undo_offsets:
+            return False
+        offset = self._undo_offsets.pop()
+        _apply_ops(self._buffer, _decode_ops(self._read(offset)[1]), reverse=True)
+        self._redo_offsets.append(offset)
+        self._append(_REC_UNDO)
+        self._advance()
+        return True
+
+    def redo(self) -> bool:
+        """
+        Re-applies the last undone entry, reading its ops back from the log.
+
+        :return: True if an entry was redone; False otherwise.
+        """
+        if not self._redo_offsets:
+            return False
+        offset = self._redo_offsets.pop()
+        _apply_ops(self._buffer, _decode_ops(self._read(offset)[1]), reverse=False)
+        self._undo_offsets.append(offset)
+        self._append(_REC_REDO)
+        self._advance()
         return True
@@ -7,10 +7,20 @@ It demonstrates a responsibility chain realized via observers that may mutate th
 Query (attack/defense) and then let others continue.
 """
 
+import heapq
+import itertools
 from abc import ABC
 from dataclasses import dataclass
-from enum import Enum, auto
-from typing import Callable, List, Any
+from enum import Enum, IntEnum, auto
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as _np
+
+    HAVE_NUMPY = True
+except ImportError:  # optional: batch evaluation falls back to plain Python
+    HAVE_NUMPY = False
 
 
 # ------------------------------- Domain --------------------------------- #
@@ -34,6 +44,28 @@ class Query:
     value: int
 
 
+class Stage(IntEnum):
+    """
+    Order in which modifiers apply to a Query.
+
+    Stages run in ascending order; within a stage, handlers run by ascending priority
+    and then registration order. Keep a stage's effects commutative (only additions
+    in ADDITIVE, only multiplications in MULTIPLICATIVE) so the result does not depend
+    on subscription order. In OVERRIDE the highest priority is applied last and wins.
+    """
+    BASE = 0
+    ADDITIVE = 1
+    MULTIPLICATIVE = 2
+    OVERRIDE = 3
+
+
+_Handler = Callable[[Any, Query], None]
+_OrderKey = Tuple[int, int, int]
+_DEFAULT_ORDER = (Stage.ADDITIVE, 0)
+_registration = itertools.count()
+_INT64_MAX = 2**63 - 1
+
+
 class Event:
     """
     Simple synchronous pub-sub list with call semantics.
@@ -42,57 +74,391 @@ class Event:
 
     Usage:
         event.append(handler)
-        event(sender, query)  # dispatches to all subscribers in order
+        event(sender, query)  # dispatches to all subscribers in stage order
         event.remove(handler)
 
     Notes:
     - Handlers can mutate `query.value` to influence the final result.
+    - Each registration has an order key (stage, priority, registration sequence);
+      see `Stage`. Handlers appended without an order run in the ADDITIVE stage, so
+      among themselves they keep registration order, as in a plain list.
+    - A handler appended twice runs twice; `remove` drops its earliest registration.
+    - Registrations are kept in a dict keyed by handler (O(1) remove) plus a
+      copy-on-write sorted tuple snapshot that is rebuilt only after a change, so
+      dispatch does not copy or sort the subscriber list.
+    - `version` increases on every change, so callers can detect stale results.
     """
 
     def __init__(self) -> None:
-        self._subscribers: List[Callable[[Any, Query], None]] = []
+        self._subscribers: Dict[_Handler, List[_OrderKey]] = {}
+        self._snapshot: Optional[Tuple[Tuple[_OrderKey, _Handler], ...]] = ()
+        self._count = 0
+        self.version = 0
+
+    def __len__(self) -> int:
+        return self._count
 
     def __call__(self, *args: Any, **kwargs: Any) -> None:
-        """Dispatches the event to all subscribers in registration order."""
-        for fn in list(self._subscribers):
+        """Dispatches the event to all subscribers in stage order."""
+        for _, fn in self.ordered():
             fn(*args, **kwargs)
 
-    def append(self, fn: Callable[[Any, Query], None]) -> None:
-        """Registers a handler."""
-        self._subscribers.append(fn)
+    def ordered(self) -> Tuple[Tuple[_OrderKey, _Handler], ...]:
+        """
+        :return: (order key, handler) pairs in dispatch order.
+        """
+        subscribers = self._snapshot
+        if subscribers is None:
+            subscribers = self._snapshot = tuple(
+                sorted(
+                    ((key, fn) for fn, keys in self._subscribers.items() for key in keys),
+                    key=_first,
+                )
+            )
+        return subscribers
+
+    def append(self, fn: _Handler, order: Tuple[int, int] = _DEFAULT_ORDER) -> None:
+        """
+        Registers a handler.
+
+        :param fn: Handler to register.
+        :param order: (stage, priority) of the handler.
+        """
+        self._subscribers.setdefault(fn, []).append((order[0], order[1], next(_registration)))
+        self._count += 1
+        self._snapshot = None
+        self.version += 1
+
+    def remove(self, fn: _Handler) -> None:
+        """Unregisters the earliest registration of a handler if present."""
+        keys = self._subscribers.get(fn)
+        if keys is not None:
+            del keys[0]
+            if not keys:
+                del self._subscribers[fn]
+            self._count -= 1
+            self._snapshot = None
+            self.version += 1
+
+
+def _magnitude(values: Any) -> int:
+    """
+    :param values: Non-empty NumPy int64 array.
+    :return: Largest absolute value, as a Python int (exact even for INT64_MIN).
+    """
+    return max(int(values.max()), -int(values.min()))
+
 
-    def remove(self, fn: Callable[[Any, Query], None]) -> None:
-        """Unregisters a handler if present."""
+class _AffineColumns:
+    """
+    Composed (multiplier, addend) of every creature with indexed modifiers, for one
+    attribute, stored by row so batch evaluation gathers them instead of recomposing.
+
+    Row 0 is the identity (1, 0), shared by creatures without indexed modifiers. Rows
+    are rewritten after a creature's modifiers change and freed with its last modifier,
+    so the columns never keep other creatures alive. The Python int lists are exact;
+    a NumPy int64 mirror is updated in place while the coefficients fit, and rebuilt
+    on the next batch after it had to grow.
+    """
+
+    def __init__(self) -> None:
+        self.rows: Dict[Any, int] = {}
+        self.multipliers: List[int] = [1]
+        self.addends: List[int] = [0]
+        self.dispatched: Set[int] = set()  # rows with a modifier that is not plain affine
+        self._free: List[int] = []
+        self._mirror: Optional[Tuple[Any, Any, Any]] = None
+        self._wide = False  # coefficients exceed int64; no mirror until they change
+
+    def set(self, creature: Any, coefficients: Optional[Tuple[int, int]]) -> None:
+        """
+        :param creature: Creature with indexed modifiers.
+        :param coefficients: Its composed (m, a), or None if it needs query dispatch.
+        """
+        row = self.rows.get(creature)
+        if row is None:
+            row = self.rows[creature] = self._free.pop() if self._free else self._grow()
+        self._write(row, coefficients)
+
+    def drop(self, creature: Any) -> None:
+        """Frees the row of a creature whose last indexed modifier went away."""
+        row = self.rows.pop(creature, None)
+        if row is not None:
+            self._write(row, (1, 0))
+            self._free.append(row)
+
+    def drop_mirror(self) -> None:
+        """Discards the NumPy mirror ahead of bulk updates (one rebuild beats many writes)."""
+        self._mirror = None
+
+    def _grow(self) -> int:
+        self.multipliers.append(1)
+        self.addends.append(0)
+        return len(self.multipliers) - 1
+
+    def _write(self, row: int, coefficients: Optional[Tuple[int, int]]) -> None:
+        multiplier, addend = (1, 0) if coefficients is None else coefficients
+        self.multipliers[row], self.addends[row] = multiplier, addend
+        if coefficients is None:
+            self.dispatched.add(row)
+        else:
+            self.dispatched.discard(row)
+        self._wide = False
+        mirror = self._mirror
+        if mirror is None:
+            return
+        if row >= len(mirror[0]):
+            self._mirror = None
+            return
         try:
-            self._subscribers.remove(fn)
-        except ValueError:
-            pass  # idempotent remove
+            mirror[0][row], mirror[1][row] = multiplier, addend
+        except OverflowError:
+            self._mirror = None
+            return
+        mirror[2][row] = coefficients is None
+
+    def arrays(self) -> Optional[Tuple[Any, Any, Any]]:
+        """
+        :return: NumPy (multipliers, addends, dispatched) by row, or None if a
+                 coefficient does not fit in int64.
+        """
+        if self._mirror is None and not self._wide:
+            try:
+                multipliers = _np.array(self.multipliers, dtype=_np.int64)
+                addends = _np.array(self.addends, dtype=_np.int64)
+            except OverflowError:
+                self._wide = True
+                return None
+            dispatched = _np.zeros(len(multipliers), dtype=bool)
+            dispatched[list(self.dispatched)] = True
+            self._mirror = multipliers, addends, dispatched
+        return self._mirror
+
+
+def _affine_numpy(
+    creatures: Sequence[Any],
+    base_of: Callable[[Any], int],
+    row_of: Callable[[Any, int], int],
+    columns: Tuple[Any, Any, Any],
+) -> Optional[Tuple[List[int], List[int]]]:
+    """
+    Gathers bases and rows straight into int64 arrays and applies the coefficients
+    with array operations.
+
+    :return: (values, positions needing dispatch), or None if a value could overflow.
+    """
+    multipliers, addends, dispatched = columns
+    count = len(creatures)
+    try:
+        base = _np.fromiter(map(base_of, creatures), dtype=_np.int64, count=count)
+    except OverflowError:
+        return None
+    rows = map(row_of, creatures, itertools.repeat(0))
+    index = _np.fromiter(rows, dtype=_np.intp, count=count)
+    multiplier, addend = multipliers[index], addends[index]
+    if len(base) and (
+        _magnitude(base) * _magnitude(multiplier) + _magnitude(addend) > _INT64_MAX
+    ):
+        return None
+    values = (base * multiplier + addend).tolist()
+    return values, _np.flatnonzero(dispatched[index]).tolist()
+
+
+def _first(pair: Tuple[_OrderKey, _Handler]) -> _OrderKey:
+    return pair[0]
 
 
 class Game:
     """
     Coordinates query dispatch to observers (modifiers).
 
+    Modifiers that declare the attribute they affect are indexed by
+    (creature, attribute), so a query only reaches modifiers targeting that creature
+    and attribute; other subscribers of `queries` see every query. Both kinds are
+    merged by order key, so within one stage and priority they run in registration
+    order regardless of whether they are indexed.
+
     :ivar queries: Event used to broadcast Query objects to all subscribers.
     """
 
     def __init__(self) -> None:
         self.queries = Event()
+        self._index: Dict[WhatToQuery, Dict[Any, Event]] = {what: {} for what in WhatToQuery}
+        self._generation = 0
+        self._columns = {what: _AffineColumns() for what in WhatToQuery}
+        # Indexed creatures whose modifiers changed since their row was last written.
+        self._stale: Dict[WhatToQuery, Set[Any]] = {what: set() for what in WhatToQuery}
+
+    @property
+    def generation(self) -> int:
+        """
+        Counter that increases whenever a change may affect any creature's stats
+        (a broadcast subscriber added or removed, or `invalidate()` without a creature).
+
+        :return: Current game-wide generation.
+        """
+        return self._generation + self.queries.version
+
+    def invalidate(self, creature: Any = None) -> None:
+        """
+        Discards cached stats of one creature, or of every creature when omitted.
+
+        :param creature: Creature whose modifiers changed; None for all creatures.
+        """
+        if creature is None:
+            self._generation += 1
+            for what, index in self._index.items():
+                self._stale[what].update(index)
+            return
+        for what, index in self._index.items():
+            if creature in index:
+                self._stale[what].add(creature)  # recomposed lazily: modifiers may still be set up
+            else:
+                self._stale[what].discard(creature)
+                self._columns[what].drop(creature)
+        # Any sender with a stats cache (Creature) exposes `invalidate()`.
+        invalidate = getattr(creature, "invalidate", None)
+        if invalidate is not None:
+            invalidate()
+
+    def subscribe(
+        self,
+        creature: Any,
+        what: WhatToQuery,
+        fn: _Handler,
+        order: Tuple[int, int] = _DEFAULT_ORDER,
+    ) -> None:
+        """
+        Registers a handler for queries about one attribute of one creature.
+
+        :param creature: Sender whose queries the handler receives.
+        :param what: Attribute the handler receives queries for.
+        :param fn: Handler to register.
+        :param order: (stage, priority) of the handler.
+        """
+        bucket = self._index[what].get(creature)
+        if bucket is None:
+            bucket = self._index[what][creature] = Event()
+        bucket.append(fn, order)
+        self.invalidate(creature)
+
+    def unsubscribe(self, creature: Any, what: WhatToQuery, fn: _Handler) -> None:
+        """
+        Unregisters a handler added with `subscribe` (no-op if absent).
+
+        :param creature: Sender the handler was registered for.
+        :param what: Attribute the handler was registered for.
+        :param fn: Handler to unregister.
+        """
+        bucket = self._index[what].get(creature)
+        if bucket is not None:
+            bucket.remove(fn)
+            if not bucket:
+                del self._index[what][creature]
+            self.invalidate(creature)
+
+    def affine(self, creature: Any, what: WhatToQuery) -> Optional[Tuple[int, int]]:
+        """
+        The creature's indexed modifiers precomposed into one `value * m + a` function.
+
+        Compositions are kept in per-attribute columns (see `_AffineColumns`) and
+        recomputed on first use after the creature's modifiers change, so this is
+        usually a lookup.
+
+        :param creature: Creature to compose modifiers for.
+        :param what: Attribute to compose.
+        :return: (m, a), or None if a modifier is not a plain `AffineModifier`.
+        """
+        columns = self._columns[what]
+        stale = self._stale[what]
+        if creature in stale:
+            stale.discard(creature)
+            columns.set(creature, _compose(self._index[what][creature]))
+        row = columns.rows.get(creature, 0)
+        if row in columns.dispatched:
+            return None
+        return columns.multipliers[row], columns.addends[row]
+
+    def effective_stats(self, creatures: Sequence[Any], what: WhatToQuery) -> List[int]:
+        """
+        Computes one effective stat for many creatures at once.
+
+        Indexed modifiers that are plain `AffineModifier`s are precomposed (`affine`)
+        into one multiplier/addend pair per creature, kept in persistent columns that
+        are updated when modifiers change. A batch only gathers each creature's base and
+        row; the coefficients are then gathered and applied as array operations (NumPy
+        when installed and every value provably fits in int64; Python ints otherwise, so
+        large stats never overflow). Creatures with any other modifier, and every
+        creature while broadcast subscribers exist, go through normal per-creature query
+        dispatch, so results always match `creature.attack`/`creature.defense`.
+
+        :param creatures: Creatures to evaluate.
+        :param what: Attribute to compute.
+        :return: Effective values, in the order of `creatures`.
+        """
+        name = what.name.lower()
+        if self.queries:
+            return [getattr(creature, name) for creature in creatures]
+        self._refresh(what)
+        columns = self._columns[what]
+        base_of = attrgetter(f"initial_{name}")
+        row_of = columns.rows.get
+        arrays = columns.arrays() if HAVE_NUMPY else None
+        evaluated = None
+        if arrays is not None:
+            evaluated = _affine_numpy(creatures, base_of, row_of, arrays)
+        if evaluated is not None:
+            values, dispatched = evaluated
+        else:
+            bases = map(base_of, creatures)
+            rows = list(map(row_of, creatures, itertools.repeat(0)))
+            multipliers, addends = columns.multipliers, columns.addends
+            values = [b * multipliers[r] + addends[r] for b, r in zip(bases, rows, strict=True)]
+            marked = columns.dispatched
+            dispatched = [i for i, row in enumerate(rows) if row in marked] if marked else []
+        for i in dispatched:
+            values[i] = getattr(creatures[i], name)
+        return values
+
+    def _refresh(self, what: WhatToQuery) -> None:
+        """Recomposes the rows of every creature whose modifiers changed."""
+        stale = self._stale[what]
+        if stale:
+            columns, index = self._columns[what], self._index[what]
+            if len(stale) * 8 > len(columns.rows):
+                columns.drop_mirror()
+            for creature in stale:
+                columns.set(creature, _compose(index[creature]))
+            stale.clear()
 
     def perform_query(self, sender: Any, query: Query) -> None:
         """
-        Broadcasts a Query to all current subscribers.
+        Dispatches a Query to the modifiers indexed for (sender, attribute) and to all
+        broadcast subscribers, merged in stage order.
 
         :param sender: The originator of the query (typically a Creature).
         :param query: The mutable Query to be processed by modifiers.
         """
-        self.queries(sender, query)
+        bucket = self._index[query.what_to_query].get(sender)
+        if not self.queries:
+            if bucket is not None:
+                bucket(sender, query)
+        elif bucket is None:
+            self.queries(sender, query)
+        else:
+            for _, fn in heapq.merge(bucket.ordered(), self.queries.ordered(), key=_first):
+                fn(sender, query)
 
 
 class Creature:
     """
     Creature with base (initial) stats influenced by active modifiers.
 
+    Effective stats are cached per attribute together with the game generation and
+    the base value they were computed from; the cache is dropped when one of this
+    creature's modifiers is added, removed or reports a change, so repeated reads
+    are O(1) until then.
+
     :param game: Game instance providing the event bus.
     :param name: Creature name.
     :param attack: Base attack value.
@@ -104,28 +470,44 @@ class Creature:
         self.name = name
         self.initial_attack = attack
         self.initial_defense = defense
+        self._stats: Dict[WhatToQuery, Tuple[int, int, int]] = {}
+
+    def invalidate(self) -> None:
+        """Discards the cached effective stats."""
+        self._stats.clear()
+
+    def _effective(self, what: WhatToQuery, base: int) -> int:
+        generation = self.game.generation
+        cached = self._stats.get(what)
+        if cached is not None and cached[0] == generation and cached[1] == base:
+            return cached[2]
+        coefficients = None if self.game.queries else self.game.affine(self, what)
+        if coefficients is not None:
+            value = base * coefficients[0] + coefficients[1]
+        else:
+            q = Query(self.name, what, base)
+            self.game.perform_query(self, q)
+            value = q.value
+        self._stats[what] = (generation, base, value)
+        return value
 
     @property
     def attack(self) -> int:
         """
-        Computes effective attack via the event chain.
+        Computes effective attack via the event chain (cached until invalidated).
 
         :return: Final attack after modifiers adjust the Query.
         """
-        q = Query(self.name, WhatToQuery.ATTACK, self.initial_attack)
-        self.game.perform_query(self, q)
-        return q.value
+        return self._effective(WhatToQuery.ATTACK, self.initial_attack)
 
     @property
     def defense(self) -> int:
         """
-        Computes effective defense via the event chain.
+        Computes effective defense via the event chain (cached until invalidated).
 
         :return: Final defense after modifiers adjust the Query.
         """
-        q = Query(self.name, WhatToQuery.DEFENSE, self.initial_defense)  # FIXED
-        self.game.perform_query(self, q)
-        return q.value
+        return self._effective(WhatToQuery.DEFENSE, self.initial_defense)
 
     def __str__(self) -> str:
         """Human-readable representation: '<name> (attack/defense)'."""
@@ -138,16 +520,28 @@ class CreatureModifier(ABC):
     Base class for modifiers that participate in the responsibility chain.
 
     Registers `self.handle` to the game's event bus and supports context-manager
-    lifetime for automatic unsubscribe.
+    lifetime for automatic unsubscribe. Modifiers that set `what_to_query` are
+    indexed by (creature, attribute) and only receive matching queries; others
+    receive every query broadcast on `game.queries`. `stage` and `priority` decide
+    where the modifier runs (see `Stage`). A modifier whose effect depends on mutable
+    state must call `changed()` after that state changes.
 
     :param game: Game instance to subscribe to.
     :param creature: Target creature this modifier affects.
     """
 
+    what_to_query: Optional[WhatToQuery] = None
+    stage = Stage.ADDITIVE
+    priority = 0
+
     def __init__(self, game: Game, creature: Creature) -> None:
         self.game = game
         self.creature = creature
-        self.game.queries.append(self.handle)
+        order = (self.stage, self.priority)
+        if self.what_to_query is not None:
+            self.game.subscribe(creature, self.what_to_query, self.handle, order)
+        else:
+            self.game.queries.append(self.handle, order)
 
     def handle(self, sender: Any, query: Query) -> None:
         """
@@ -159,6 +553,10 @@ class CreatureModifier(ABC):
         # Default no-op; concrete modifiers override.
         return None
 
+    def changed(self) -> None:
+        """Invalidates cached stats affected by this modifier."""
+        self.game.invalidate(self.creature if self.what_to_query is not None else None)
+
     # Context management for scoped subscription
     def __enter__(self) -> "CreatureModifier":
         """Enters a scoped subscription (no-op; returns self)."""
@@ -166,41 +564,76 @@ class CreatureModifier(ABC):
 
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:
         """Unsubscribes the handler when leaving the context."""
-        self.game.queries.remove(self.handle)
+        if self.what_to_query is not None:
+            self.game.unsubscribe(self.creature, self.what_to_query, self.handle)
+        else:
+            self.game.queries.remove(self.handle)
 
 
-class DoubleAttackModifier(CreatureModifier):
+class AffineModifier(CreatureModifier):
     """
-    Doubles attack for the target creature while the modifier is active.
+    Modifier that maps the value to `value * multiplier + addend`.
+
+    Because the effect is a known affine function, `Game.effective_stats` can apply it
+    without dispatching a Query. Subclasses set `what_to_query`, `stage`,
+    `multiplier` and `addend`; overriding `handle` opts a subclass out of
+    precomposition.
     """
 
+    multiplier = 1
+    addend = 0
+
     def handle(self, sender: Any, query: Query) -> None:
         """
-        Doubles `query.value` when the sender & attribute match.
+        Applies the affine function when the sender & attribute match.
 
         :param sender: The originator of the query (Creature).
         :param query: Query with current value to potentially modify.
         """
-        if sender is self.creature and query.what_to_query == WhatToQuery.ATTACK:
-            query.value *= 2
+        if sender is self.creature and query.what_to_query == self.what_to_query:
+            query.value = query.value * self.multiplier + self.addend
+
 
+def _compose(bucket: Event) -> Optional[Tuple[int, int]]:
+    """
+    Folds the handlers of one indexed bucket, in stage order, into a single
+    (multiplier, addend) pair.
 
-class IncreaseDefenseModifier(CreatureModifier):
+    :param bucket: Handlers registered for one (creature, attribute).
+    :return: Composite coefficients, or None if a handler is not a plain AffineModifier.
+    """
+    multiplier, addend = 1, 0
+    for _, fn in bucket.ordered():
+        modifier = getattr(fn, "__self__", None)
+        if not isinstance(modifier, AffineModifier):
+            return None
+        if type(modifier).handle is not AffineModifier.handle:
+            return None
+        multiplier *= modifier.multiplier
+        addend = addend * modifier.multiplier + modifier.addend
+    return multiplier, addend
+
+
+class DoubleAttackModifier(AffineModifier):
+    """
+    Doubles attack for the target creature while the modifier is active.
+    """
+
+    what_to_query = WhatToQuery.ATTACK
+    stage = Stage.MULTIPLICATIVE
+    multiplier = 2
+
+
+class IncreaseDefenseModifier(AffineModifier):
     """
     Increases defense by a flat amount for the target creature while active.
 
     The increment is +3 (demo constant).
     """
 
-    def handle(self, sender: Any, query: Query) -> None:
-        """
-        Adds +3 to `query.value` when the sender & attribute match.
-
-        :param sender: The originator of the query (Creature).
-        :param query: Query with current value to potentially modify.
-        """
-        if sender is self.creature and query.what_to_query == WhatToQuery.DEFENSE:
-            query.value += 3
+    what_to_query = WhatToQuery.DEFENSE
+    stage = Stage.ADDITIVE
+    addend = 3
 
 
 # ------------------------------- Demo ----------------------------------- #
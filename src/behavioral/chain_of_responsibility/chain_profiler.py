@@ -0,0 +1,184 @@
+"""
+chain_profiler.py — Opt-in per-handler instrumentation for handler chains.
+
+Works with any linked chain whose handlers expose `handle(request)` and a `_next`
+reference (`BaseHandler` in method_chain.py, `UIHandler` in ui_chain.py). Profiling
+wraps each handler's `handle` when the chain is built; chains built without a
+profiler are untouched, so there is no overhead when disabled. `compile_chain` and
+`handle_many` route instrumented handlers through their wrapped `handle`.
+
+A profiler may be shared by concurrent callers: per-call timing state is thread-local
+and the shared counters are updated under a lock.
+"""
+
+import threading
+import time
+import weakref
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Optional
+
+
+@dataclass(frozen=True, slots=True)
+class HandlerStats:
+    """Exported statistics of one handler in a profiled chain.
+
+    :ivar handler: Handler label ("<position>:<class name>").
+    :ivar calls: Number of `handle` invocations.
+    :ivar total_ms: Cumulative time including downstream handlers.
+    :ivar self_ms: Cumulative time excluding downstream handlers.
+    :ivar p50_ms: Median self-time per call (over the retained samples).
+    :ivar p95_ms: 95th percentile self-time per call.
+    :ivar p99_ms: 99th percentile self-time per call.
+    :ivar final_results: Requests whose final result this handler produced.
+    """
+    handler: str
+    calls: int
+    total_ms: float
+    self_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    final_results: int
+
+
+class _Slot:
+    """Mutable accumulator for one handler."""
+
+    __slots__ = ("calls", "total", "self_total", "samples")
+
+    def __init__(self, max_samples: int) -> None:
+        self.calls = 0
+        self.total = 0.0
+        self.self_total = 0.0
+        self.samples: Deque[float] = deque(maxlen=max_samples)
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class ChainProfiler:
+    """Records per-handler call counts, cumulative/self time, self-time percentiles and
+    which handler produced each request's final result.
+
+    :param max_samples: Self-time samples retained per handler for percentiles.
+    :param clock: High-resolution time source in seconds.
+    """
+
+    def __init__(
+        self, max_samples: int = 10_000, clock: Callable[[], float] = time.perf_counter
+    ) -> None:
+        self._max_samples = max_samples
+        self._clock = clock
+        self._slots: dict[str, _Slot] = {}
+        self._final: Counter[str] = Counter()
+        self._local = threading.local()
+        self._instrumented: weakref.WeakSet[Any] = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def instrument(self, head: Any) -> Any:
+        """Wrap `handle` of every handler in the chain starting at `head`.
+
+        Handlers at the same position with the same class share one row, so several
+        chains built alike aggregate into the same statistics. Handlers already
+        instrumented by this profiler are left as they are.
+
+        :param head: First handler of a linked chain.
+        :return: The same head, for fluent use.
+        """
+        node, position = head, 0
+        while node is not None:
+            if node not in self._instrumented:
+                label = f"{position}:{type(node).__name__}"
+                with self._lock:
+                    slot = self._slots.get(label)
+                    if slot is None:
+                        slot = self._slots[label] = _Slot(self._max_samples)
+                node.handle = self._wrap(label, slot, node.handle)
+                self._instrumented.add(node)
+            node, position = node._next, position + 1
+        return head
+
+    def _wrap(
+        self, label: str, slot: _Slot, handle: Callable[[Any], Any]
+    ) -> Callable[[Any], Any]:
+        clock = self._clock
+        lock = self._lock
+
+        def profiled(request: Any) -> Any:
+            local = self._local
+            stack: Optional[list[float]] = getattr(local, "stack", None)
+            if stack is None:
+                stack = local.stack = []
+            stack.append(0.0)
+            local.returned = (None, None)
+            result = None
+            started = clock()
+            try:
+                result = handle(request)
+            finally:
+                elapsed = clock() - started
+                downstream = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                # A raising handler produced nothing; don't leave its child's result behind.
+                child_result, producer = local.returned
+                if result is None or result is not child_result:
+                    producer = label if result is not None else None
+                local.returned = (result, producer)
+                with lock:
+                    slot.calls += 1
+                    slot.total += elapsed
+                    slot.self_total += elapsed - downstream
+                    slot.samples.append(elapsed - downstream)
+                    if not stack and producer is not None:
+                        self._final[producer] += 1
+            return result
+
+        return profiled
+
+    def stats(self) -> list[HandlerStats]:
+        """
+        :return: One HandlerStats per instrumented handler, in chain order.
+        """
+        with self._lock:
+            snapshot = [
+                (label, slot.calls, slot.total, slot.self_total, sorted(slot.samples))
+                for label, slot in self._slots.items()
+            ]
+            final = self._final.copy()
+        return [
+            HandlerStats(
+                handler=label,
+                calls=calls,
+                total_ms=total * 1e3,
+                self_ms=self_total * 1e3,
+                p50_ms=_percentile(ordered, 0.50) * 1e3,
+                p95_ms=_percentile(ordered, 0.95) * 1e3,
+                p99_ms=_percentile(ordered, 0.99) * 1e3,
+                final_results=final[label],
+            )
+            for label, calls, total, self_total, ordered in snapshot
+        ]
+
+    def table(self) -> str:
+        """
+        :return: The statistics formatted as a plain-text table.
+        """
+        header = ("handler", "calls", "total_ms", "self_ms", "p50_ms", "p95_ms", "p99_ms", "final")
+        lines = [f"{header[0]:<28}" + "".join(f"{name:>10}" for name in header[1:])]
+        for row in self.stats():
+            lines.append(
+                f"{row.handler:<28}{row.calls:>10}{row.total_ms:>10.3f}{row.self_ms:>10.3f}"
+                f"{row.p50_ms:>10.3f}{row.p95_ms:>10.3f}{row.p99_ms:>10.3f}{row.final_results:>10}"
+            )
+        return "\n".join(lines)
+
+
+__all__ = [
+    "ChainProfiler",
+    "HandlerStats",
+]
@@ -12,9 +12,22 @@ Python 3.11+.
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from collections import Counter
+from collections.abc import KeysView, MutableSequence
 from dataclasses import dataclass
 from enum import Enum, auto
-from typing import List
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Union,
+    overload,
+)
 
 
 # ----------------------------- Domain ----------------------------------- #
@@ -36,15 +49,304 @@ class Query:
     value: int
 
 
+GOBLIN = "goblin"
+KING = "king"
+OTHER = "other"
+
+
+def horde_rule(creature: "Creature") -> str:
+    """
+    Classifies a creature by the horde rule its `query` implements.
+
+    :param creature: Creature to classify.
+    :return: KING or GOBLIN for the unmodified built-in rules, OTHER otherwise.
+    """
+    query = type(creature).query
+    if query is GoblinKing.query:
+        return KING
+    if query is Goblin.query:
+        return GOBLIN
+    return OTHER
+
+
+class RegistryChange(Enum):
+    """Kinds of change reported to registry listeners."""
+    ADDED = auto()
+    REMOVED = auto()
+
+
+_NO_CREATURES: Dict["Creature", int] = {}
+
+
+class CreatureRegistry(MutableSequence["Creature"]):
+    """
+    List of the creatures of a Game with per-type indexes and running aggregates.
+
+    The registry is a mutable sequence with list semantics: order is kept, a creature
+    may be listed more than once, and `insert`, `pop`, `remove`, slicing, `del`,
+    `sort` and friends behave as they do on a list (and cost what they cost on a
+    list). On top of that it keeps:
+
+    - `kinds`: entries per horde rule (see `horde_rule`), so horde stats can be
+      evaluated in O(1) instead of broadcasting a Query to every creature;
+    - an index map, so `in`, `count` and `discard` are O(1);
+    - per-type indexes: `of_type(cls)` is a live view of the registered instances of
+      `cls` (subclasses included), without a scan;
+    - listeners added with `subscribe`, called as `listener(change, creature)` once
+      per entry added or removed, so dependent caches can update incrementally.
+
+    `append` and `discard` are the O(1) add/remove pair for large, churning hordes:
+    `discard` swaps the last entry into the freed slot, so unlike `remove` it does
+    not keep the order.
+
+    :param creatures: Initial creatures.
+    """
+
+    def __init__(self, creatures: Iterable["Creature"] = ()) -> None:
+        self.kinds: Counter[str] = Counter()
+        self._items: List["Creature"] = []
+        self._positions: Dict["Creature", Set[int]] = {}
+        self._by_type: Dict[type, Dict["Creature", int]] = {}
+        self._listeners: List[Callable[[RegistryChange, "Creature"], None]] = []
+        self.extend(creatures)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator["Creature"]:
+        return iter(self._items)
+
+    def __contains__(self, creature: object) -> bool:
+        return creature in self._positions
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CreatureRegistry):
+            return self._items == other._items
+        if isinstance(other, list):
+            return self._items == other
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._items!r})"
+
+    @overload
+    def __getitem__(self, index: int) -> "Creature": ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List["Creature"]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union["Creature", List["Creature"]]:
+        return self._items[index]
+
+    @overload
+    def __setitem__(self, index: int, value: "Creature") -> None: ...
+
+    @overload
+    def __setitem__(self, index: slice, value: Iterable["Creature"]) -> None: ...
+
+    def __setitem__(self, index: Union[int, slice], value: Any) -> None:
+        items = list(self._items)
+        items[index] = list(value) if isinstance(index, slice) else value
+        self._assign(items)
+
+    def __delitem__(self, index: Union[int, slice]) -> None:
+        items = list(self._items)
+        del items[index]
+        self._assign(items)
+
+    def insert(self, index: int, value: "Creature") -> None:
+        """
+        :param index: Position to insert at, as for `list.insert`.
+        :param value: Creature to add.
+        """
+        self._items.insert(index, value)
+        self._reindex()
+        self._link(value)
+
+    def append(self, value: "Creature") -> None:
+        """
+        Adds a creature at the end in O(1).
+
+        :param value: Creature to add.
+        """
+        self._positions.setdefault(value, set()).add(len(self._items))
+        self._items.append(value)
+        self._link(value)
+
+    def pop(self, index: int = -1) -> "Creature":
+        """
+        :param index: Position to remove, as for `list.pop` (O(1) for the last entry).
+        :return: The removed creature.
+        """
+        last = len(self._items) - 1
+        if index not in (-1, last):
+            creature = self._items[index]
+            del self[index]
+            return creature
+        creature = self._items.pop()
+        self._forget(creature, last)
+        self._unlink(creature)
+        return creature
+
+    def remove(self, value: "Creature") -> None:
+        """
+        Removes the first entry of a creature, keeping the order of the others.
+
+        :param value: Creature to remove.
+        :raises ValueError: If the creature is not registered.
+        """
+        positions = self._positions.get(value)
+        if not positions:
+            raise ValueError("creature is not registered")
+        del self[min(positions)]
+
+    def discard(self, value: "Creature") -> None:
+        """
+        Removes one entry of a creature in O(1) if it is registered; the last entry
+        is moved into the freed slot.
+
+        :param value: Creature to remove.
+        """
+        positions = self._positions.get(value)
+        if not positions:
+            return
+        last = len(self._items) - 1
+        if last not in positions:
+            moved = self._items[last]
+            position = positions.pop()
+            self._items[position] = moved
+            self._positions[moved].add(position)
+            self._forget(moved, last)
+            positions.add(last)
+        self._items.pop()
+        self._forget(value, last)
+        self._unlink(value)
+
+    def count(self, value: Any) -> int:
+        """
+        :param value: Creature to look up.
+        :return: How many times the creature is listed (O(1)).
+        """
+        return len(self._positions.get(value, ()))
+
+    def sort(
+        self, *, key: Optional[Callable[["Creature"], Any]] = None, reverse: bool = False
+    ) -> None:
+        """Sorts the entries in place, as `list.sort` (no change is reported)."""
+        self._items.sort(key=key, reverse=reverse)
+        self._reindex()
+
+    def reverse(self) -> None:
+        """Reverses the entries in place (no change is reported)."""
+        self._items.reverse()
+        self._reindex()
+
+    def of_type(self, cls: type) -> KeysView["Creature"]:
+        """
+        :param cls: Creature class to look up.
+        :return: Live view of the registered instances of `cls`, including subclasses.
+        """
+        return self._by_type.get(cls, _NO_CREATURES).keys()
+
+    def subscribe(self, listener: Callable[[RegistryChange, "Creature"], None]) -> None:
+        """
+        :param listener: Called as `listener(change, creature)` after every change.
+        """
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[RegistryChange, "Creature"], None]) -> None:
+        """
+        :param listener: Listener to remove (no-op if absent).
+        """
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _assign(self, items: List["Creature"]) -> None:
+        """Replaces the entries, reporting only the creatures added or removed."""
+        removed = Counter(self._items)
+        added = Counter(items)
+        removed.subtract(items)
+        added.subtract(self._items)
+        self._items = items
+        self._reindex()
+        for creature, entries in removed.items():
+            for _ in range(entries):
+                self._unlink(creature)
+        for creature, entries in added.items():
+            for _ in range(entries):
+                self._link(creature)
+
+    def _reindex(self) -> None:
+        self._positions = {}
+        for position, creature in enumerate(self._items):
+            self._positions.setdefault(creature, set()).add(position)
+
+    def _forget(self, creature: "Creature", position: int) -> None:
+        positions = self._positions[creature]
+        positions.discard(position)
+        if not positions:
+            del self._positions[creature]
+
+    def _link(self, creature: "Creature") -> None:
+        for cls in type(creature).__mro__:
+            index = self._by_type.setdefault(cls, {})
+            index[creature] = index.get(creature, 0) + 1
+        self.kinds[horde_rule(creature)] += 1
+        self._notify(RegistryChange.ADDED, creature)
+
+    def _unlink(self, creature: "Creature") -> None:
+        for cls in type(creature).__mro__:
+            index = self._by_type[cls]
+            index[creature] -= 1
+            if not index[creature]:
+                del index[creature]
+        self.kinds[horde_rule(creature)] -= 1
+        self._notify(RegistryChange.REMOVED, creature)
+
+    def _notify(self, change: RegistryChange, creature: "Creature") -> None:
+        for listener in self._listeners:
+            listener(change, creature)
+
+
 class Game:
     """
     Container for all creatures participating in the event chain.
 
-    :ivar creatures: The roster of creatures in the "horde".
+    :ivar creatures: The registry of creatures in the "horde"; assigning any
+        iterable wraps it in a `CreatureRegistry`.
     """
 
     def __init__(self) -> None:
-        self.creatures: List["Creature"] = []
+        self._creatures = CreatureRegistry()
+
+    @property
+    def creatures(self) -> CreatureRegistry:
+        """
+        :return: The registry of creatures in this game.
+        """
+        return self._creatures
+
+    @creatures.setter
+    def creatures(self, creatures: Iterable["Creature"]) -> None:
+        if not isinstance(creatures, CreatureRegistry):
+            creatures = CreatureRegistry(creatures)
+        self._creatures = creatures
+
+    @property
+    def goblin_count(self) -> int:
+        """
+        :return: Registered creatures that follow the plain Goblin rule.
+        """
+        return self._creatures.kinds[GOBLIN]
+
+    @property
+    def king_count(self) -> int:
+        """
+        :return: Registered creatures that follow the GoblinKing rule.
+        """
+        return self._creatures.kinds[KING]
 
 
 class Creature(ABC):
@@ -100,6 +402,10 @@ class Goblin(Creature):
     Rules:
       - Each *other* Goblin adds +1 to DEFENSE of the queried creature.
       - No effect on ATTACK.
+
+    While every creature in the game uses the built-in Goblin/GoblinKing rules, the
+    stats are computed in O(1) from the registry aggregates; otherwise the Query is
+    broadcast to every creature.
     """
 
     def __init__(self, game: Game, attack: int = 1, defense: int = 1) -> None:
@@ -112,6 +418,10 @@ class Goblin(Creature):
 
         :return: Final attack after chain processing.
         """
+        registry = self.game.creatures
+        if not registry.kinds[OTHER]:
+            own = registry.count(self) if horde_rule(self) == KING else 0
+            return self.initial_attack + registry.kinds[KING] - own
         q = Query(WhatToQuery.ATTACK, self.initial_attack)
         for c in self.game.creatures:
             c.query(self, q)
@@ -124,6 +434,10 @@ class Goblin(Creature):
 
         :return: Final defense after chain processing.
         """
+        registry = self.game.creatures
+        if not registry.kinds[OTHER]:
+            goblins = registry.kinds[GOBLIN] + registry.kinds[KING]
+            return self.initial_defense + goblins - registry.count(self)
         q = Query(WhatToQuery.DEFENSE, self.initial_defense)
         for c in self.game.creatures:
             c.query(self, q)
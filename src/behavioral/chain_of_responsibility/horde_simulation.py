@@ -0,0 +1,276 @@
+"""
+horde_simulation.py — Tick-based simulation engine for large goblin hordes.
+
+`goblin_horde_chain.py` models each goblin as an object that answers Queries; that
+API stays the right tool for small games. For load simulation this module snapshots
+a Game into compact typed arrays (base stats, king/alive flags) and applies the
+horde rules of `Goblin.query`/`GoblinKing.query` as whole-array passes each tick:
+
+  - attack  = base attack  + living kings  - (1 if the creature is a king)
+  - defense = base defense + living goblins - 1
+
+Dead creatures have 0 attack/defense. NumPy is used for the passes when installed;
+otherwise they run as plain-Python comprehensions over the same arrays. Independent
+simulations can be sharded across processes with `run_sharded`. Dead creatures keep
+their slot (so indexes stay stable during a run) until `compact()` drops them.
+"""
+
+from __future__ import annotations
+
+import time
+from array import array
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Sequence
+
+from .goblin_horde_chain import KING, OTHER, Game, horde_rule
+
+try:
+    import numpy as _np
+
+    HAVE_NUMPY = True
+except ImportError:  # optional: passes fall back to plain Python
+    HAVE_NUMPY = False
+
+
+@dataclass(frozen=True, slots=True)
+class SimulationReport:
+    """Outcome of running a simulation for a number of ticks.
+
+    :ivar creatures: Creatures alive after the last tick.
+    :ivar ticks: Ticks executed.
+    :ivar seconds: Wall-clock time spent in the run.
+    :ivar attack_total: Sum of effective attack after the last tick.
+    :ivar defense_total: Sum of effective defense after the last tick.
+    """
+    creatures: int
+    ticks: int
+    seconds: float
+    attack_total: int
+    defense_total: int
+
+    @property
+    def ticks_per_second(self) -> float:
+        """
+        :return: Throughput of the run.
+        """
+        return self.ticks / self.seconds if self.seconds else float("inf")
+
+
+class HordeSimulation:
+    """
+    Compact, array-backed copy of a goblin horde.
+
+    Creatures are addressed by index (their position in the source registry, then
+    spawn order). Effective stats are recomputed by `tick()` and read from `attack`
+    and `defense`. Killed creatures stay in the arrays until `compact()` is called,
+    which renumbers the survivors.
+    """
+
+    def __init__(self) -> None:
+        self._base_attack = array("q")
+        self._base_defense = array("q")
+        self._king = bytearray()
+        self._alive = bytearray()
+        self._attack = array("q")
+        self._defense = array("q")
+        self._living = 0
+        self._living_kings = 0
+
+    @classmethod
+    def from_game(cls, game: Game) -> HordeSimulation:
+        """
+        Snapshots the creatures of a game.
+
+        :param game: Game whose creatures all use the built-in Goblin/GoblinKing rules.
+        :return: A simulation with one alive creature per registered creature.
+        :raises ValueError: If a creature implements a custom `query`, or is registered
+            more than once (each array entry is one creature, so the stats would differ).
+        """
+        creatures = game.creatures
+        if creatures.kinds[OTHER]:
+            raise ValueError("creatures with custom query rules cannot be vectorized")
+        if any(creatures.count(creature) > 1 for creature in creatures):
+            raise ValueError("creatures registered more than once cannot be vectorized")
+        simulation = cls()
+        for creature in creatures:
+            simulation.spawn(
+                creature.initial_attack, creature.initial_defense, horde_rule(creature) == KING
+            )
+        return simulation
+
+    def __len__(self) -> int:
+        return len(self._alive)
+
+    @property
+    def living(self) -> int:
+        """
+        :return: Number of creatures alive.
+        """
+        return self._living
+
+    @property
+    def attack(self) -> array:
+        """
+        :return: Effective attack per creature as of the last tick.
+        """
+        return self._attack
+
+    @property
+    def defense(self) -> array:
+        """
+        :return: Effective defense per creature as of the last tick.
+        """
+        return self._defense
+
+    def spawn(self, attack: int, defense: int, king: bool = False) -> int:
+        """
+        Adds a living creature; its effective stats are computed on the next tick.
+
+        :param attack: Base attack.
+        :param defense: Base defense.
+        :param king: Whether the creature follows the GoblinKing rule.
+        :return: Index of the new creature.
+        """
+        self._base_attack.append(attack)
+        self._base_defense.append(defense)
+        self._king.append(king)
+        self._alive.append(True)
+        self._attack.append(0)
+        self._defense.append(0)
+        self._living += 1
+        self._living_kings += king
+        return len(self._alive) - 1
+
+    def kill(self, index: int) -> None:
+        """
+        Marks a creature as dead (no-op if it already is).
+
+        :param index: Index of the creature.
+        """
+        if self._alive[index]:
+            self._alive[index] = False
+            self._living -= 1
+            self._living_kings -= self._king[index]
+
+    def tick(self) -> None:
+        """Recomputes the effective stats of every creature."""
+        kings, goblins = self._living_kings, self._living - 1
+        if HAVE_NUMPY:
+            alive = _np.frombuffer(self._alive, dtype=_np.uint8)
+            king = _np.frombuffer(self._king, dtype=_np.uint8)
+            _np.frombuffer(self._attack, dtype=_np.int64)[:] = (
+                _np.frombuffer(self._base_attack, dtype=_np.int64) + kings - king
+            ) * alive
+            _np.frombuffer(self._defense, dtype=_np.int64)[:] = (
+                _np.frombuffer(self._base_defense, dtype=_np.int64) + goblins
+            ) * alive
+            return
+        rows = zip(self._base_attack, self._king, self._alive, strict=True)
+        self._attack[:] = array("q", [(a + kings - k) * live for a, k, live in rows])
+        self._defense[:] = array(
+            "q",
+            [(d + goblins) * live for d, live in zip(self._base_defense, self._alive, strict=True)],
+        )
+
+    def compact(self) -> List[int]:
+        """
+        Drops dead creatures from the arrays; survivors keep their relative order.
+
+        Call between ticks (e.g. every few hundred ticks of heavy churn) to stop dead
+        slots from costing time and memory in every pass. Indexes change: survivor
+        `i` was at index `survivors[i]` before the call.
+
+        :return: The previous index of each survivor (`survivors`).
+        """
+        survivors = [i for i, alive in enumerate(self._alive) if alive]
+        if len(survivors) == len(self._alive):
+            return survivors
+        self._base_attack = array("q", [self._base_attack[i] for i in survivors])
+        self._base_defense = array("q", [self._base_defense[i] for i in survivors])
+        self._attack = array("q", [self._attack[i] for i in survivors])
+        self._defense = array("q", [self._defense[i] for i in survivors])
+        self._king = bytearray(self._king[i] for i in survivors)
+        self._alive = bytearray(b"\x01" * len(survivors))
+        return survivors
+
+    def run(
+        self, ticks: int, on_tick: Optional[Callable[[HordeSimulation, int], None]] = None
+    ) -> SimulationReport:
+        """
+        Runs a number of ticks.
+
+        :param ticks: Ticks to execute.
+        :param on_tick: Optional hook called as `on_tick(simulation, tick)` after each
+            tick, e.g. to kill or spawn creatures; must be picklable for `run_sharded`.
+        :return: Report of the run.
+        """
+        started = time.perf_counter()
+        for number in range(ticks):
+            self.tick()
+            if on_tick is not None:
+                on_tick(self, number)
+        seconds = time.perf_counter() - started
+        return SimulationReport(
+            creatures=self._living,
+            ticks=ticks,
+            seconds=seconds,
+            attack_total=sum(self._attack),
+            defense_total=sum(self._defense),
+        )
+
+
+def _run_shard(
+    simulation: HordeSimulation,
+    ticks: int,
+    on_tick: Optional[Callable[[HordeSimulation, int], None]],
+) -> SimulationReport:
+    return simulation.run(ticks, on_tick)
+
+
+def run_sharded(
+    simulations: Sequence[HordeSimulation],
+    ticks: int,
+    processes: Optional[int] = None,
+    on_tick: Optional[Callable[[HordeSimulation, int], None]] = None,
+    executor: Optional[Executor] = None,
+) -> List[SimulationReport]:
+    """
+    Runs independent simulations in a pool of worker processes.
+
+    With the default process pool each simulation is pickled to a worker, so the
+    caller's objects are not updated; use the returned reports.
+
+    :param simulations: Simulations to run, one shard each.
+    :param ticks: Ticks to execute per simulation.
+    :param processes: Worker processes of the default pool (default: one per CPU).
+    :param on_tick: Optional module-level hook, see `HordeSimulation.run`.
+    :param executor: Executor to run the shards on instead of a new process pool; it
+        is left open for reuse.
+    :return: One report per simulation, in input order.
+    """
+    count = len(simulations)
+    args = (_run_shard, simulations, [ticks] * count, [on_tick] * count)
+    if executor is not None:
+        return list(executor.map(*args))
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(*args))
+
+
+def total_ticks_per_second(reports: Iterable[SimulationReport]) -> float:
+    """
+    :param reports: Reports of simulations that ran concurrently.
+    :return: Aggregate ticks/sec, i.e. all ticks over the slowest shard's time.
+    """
+    collected = list(reports)
+    slowest = max((report.seconds for report in collected), default=0.0)
+    return sum(report.ticks for report in collected) / slowest if slowest else float("inf")
+
+
+__all__ = [
+    "HAVE_NUMPY",
+    "HordeSimulation",
+    "SimulationReport",
+    "run_sharded",
+    "total_ticks_per_second",
+]
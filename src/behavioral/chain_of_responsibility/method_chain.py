@@ -22,9 +22,17 @@ Notes:
 
 # method_chain.py — Python 3.11-safe forward refs + cleaned docstrings
 
-from abc import ABC, abstractmethod
+import asyncio
+import copy
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Iterator, Sequence
 from dataclasses import dataclass, field
-from typing import Any, Optional
+from itertools import pairwise
+from typing import Any, Callable, Optional
+
+from .chain_profiler import ChainProfiler
 
 
 @dataclass(frozen=True, slots=True)
@@ -51,15 +59,30 @@ class Result:
     data: Optional[Any] = None
 
 
-class BaseHandler(ABC):
-    """Abstract handler defining the chaining protocol.
+class BaseHandler:
+    """Base handler defining the chaining protocol.
+
+    Handlers implement their responsibility in `process` (return a Result to stop the
+    chain, None to pass the request on) and inherit `handle`, which delegates via
+    `_delegate`. Handlers that override `handle` directly are still supported but
+    cannot be flattened by `compile_chain`.
 
-    Handlers should only implement their responsibility in `handle`.
-    Delegation to the next handler is provided via `_delegate`.
+    Handlers may declare the request kinds they act on in `kinds`; for any other kind
+    their `process` must return None, which lets chains skip them. None (the default)
+    marks a wildcard handler that sees every request.
+
+    Handlers whose `process` depends only on the request may set `pure = True`,
+    making them eligible for `memoize_chain`; those whose `process` costs more than a
+    cache lookup (keying the payload, copying the Result) also set `costly = True`,
+    since memoization only pays off for runs that contain one.
 
     :param next_handler: Optional next handler in the chain.
     """
 
+    kinds: Optional[frozenset[str]] = None
+    pure: bool = False
+    costly: bool = False
+
     def __init__(self, next_handler: Optional["BaseHandler"] = None) -> None:
         self._next: Optional["BaseHandler"] = next_handler
 
@@ -72,19 +95,25 @@ class BaseHandler(ABC):
         self._next = handler
         return handler
 
-    @abstractmethod
+    def process(self, request: Request) -> Optional[Result]:
+        """Apply this handler's own responsibility, without delegating.
+
+        :param request: The incoming request.
+        :return: Result to stop the chain; None to pass the request on.
+        """
+        raise NotImplementedError
+
     def handle(self, request: Request) -> Optional[Result]:
         """Attempt to process the request or delegate to the next handler.
 
-        Implementations should:
-          1) Check if they are responsible;
-          2) Return a Result if handled;
-          3) Otherwise delegate via `_delegate`.
-
         :param request: The incoming request.
         :return: Result if handled; delegated result; or None if unhandled by the chain.
         """
-        raise NotImplementedError
+        if self.kinds is None or request.kind in self.kinds:
+            result = self.process(request)
+            if result is not None:
+                return result
+        return self._delegate(request)
 
     def _delegate(self, request: Request) -> Optional[Result]:
         """Delegate handling to the next handler if present.
@@ -96,51 +125,294 @@ class BaseHandler(ABC):
             return self._next.handle(request)
         return None
 
+    def process_many(self, requests: Sequence[Request]) -> list[Optional[Result]]:
+        """Apply `process` to a batch; override for vectorized checks.
+
+        :param requests: Requests this handler applies to.
+        :return: One Result-or-None per request, in the same order.
+        """
+        return [self.process(request) for request in requests]
+
+    def _stage(
+        self, requests: Sequence[Request], pending: list[int]
+    ) -> tuple[list[int], list[Request]]:
+        """Select the pending requests this handler applies to.
+
+        :return: (indexes, requests) of the applicable requests.
+        """
+        if self.kinds is None:
+            return pending, [requests[i] for i in pending]
+        indexes = [i for i in pending if requests[i].kind in self.kinds]
+        return indexes, [requests[i] for i in indexes]
+
+    def _stages(self) -> Iterator["BaseHandler"]:
+        """Yield the handlers a batch passes through, in chain order.
+
+        Compiled chains contribute their flattened handlers. The walk ends after a
+        handler that overrides `handle`, since that handler delegates by itself.
+        """
+        node: Optional[BaseHandler] = self
+        while node is not None:
+            if isinstance(node, CompiledChain):
+                yield from node._stages()
+                return
+            yield node
+            if not _flattenable(node):
+                return
+            node = node._next
+
+    def handle_many(self, requests: Sequence[Request]) -> list[Optional[Result]]:
+        """Push a batch through the chain one handler stage at a time.
+
+        Each handler sees all still-unresolved requests at once (via `process_many`),
+        also inside compiled chains; handlers that override `handle` finish the
+        remaining requests one by one.
+
+        :param requests: The incoming requests.
+        :return: Results matching per-request `handle` output, in input order.
+        """
+        results: list[Optional[Result]] = [None] * len(requests)
+        pending = list(range(len(requests)))
+        for node in self._stages():
+            if not pending:
+                break
+            if _flattenable(node):
+                indexes, batch = node._stage(requests, pending)
+                outcomes = node.process_many(batch)
+            else:
+                indexes, outcomes = pending, [node.handle(requests[i]) for i in pending]
+            pending = _resolve(results, pending, indexes, outcomes)
+        return results
+
+    async def handle_many_async(self, requests: Sequence[Request]) -> list[Optional[Result]]:
+        """Asynchronous `handle_many`: stages run in chain order, and within an
+        AsyncHandler stage all applicable requests are awaited concurrently.
+
+        :param requests: The incoming requests.
+        :return: Results matching per-request `handle` output, in input order.
+        """
+        results: list[Optional[Result]] = [None] * len(requests)
+        pending = list(range(len(requests)))
+        for node in self._stages():
+            if not pending:
+                break
+            if not _flattenable(node):
+                indexes, outcomes = pending, [node.handle(requests[i]) for i in pending]
+            elif isinstance(node, AsyncHandler):
+                indexes, batch = node._stage(requests, pending)
+                outcomes = list(await asyncio.gather(*map(node.process_async, batch)))
+            else:
+                indexes, batch = node._stage(requests, pending)
+                outcomes = node.process_many(batch)
+            pending = _resolve(results, pending, indexes, outcomes)
+        return results
+
+
+def _flattenable(node: BaseHandler) -> bool:
+    """Whether a handler's behavior is fully described by `process` and `kinds`.
+
+    True when its class implements `process` and inherits `BaseHandler.handle`; a
+    handler overriding `handle` anywhere in its MRO, or on the instance (as a
+    ChainProfiler does), may do more than `process` and must be called via `handle`.
+    """
+    cls = type(node)
+    return (
+        "handle" not in vars(node)
+        and cls.handle is BaseHandler.handle
+        and cls.process is not BaseHandler.process
+    )
+
+
+def _resolve(
+    results: list[Optional[Result]],
+    pending: list[int],
+    indexes: list[int],
+    outcomes: Sequence[Optional[Result]],
+) -> list[int]:
+    """Store stage outcomes and return the requests still unresolved.
+
+    :param results: Per-request results, updated in place.
+    :param pending: Indexes unresolved before the stage.
+    :param indexes: Indexes the stage processed (aligned with `outcomes`).
+    :param outcomes: Stage outputs.
+    :return: Indexes still unresolved after the stage, in input order.
+    """
+    resolved = set()
+    for i, outcome in zip(indexes, outcomes, strict=True):
+        if outcome is not None:
+            results[i] = outcome
+            resolved.add(i)
+    return [i for i in pending if i not in resolved] if resolved else pending
+
+
+class AsyncHandler(BaseHandler):
+    """Handler whose check performs I/O and is implemented as a coroutine.
+
+    Implement `process_async`; `handle_many_async` awaits it concurrently across a
+    batch, also when the handler is part of a compiled chain. The synchronous
+    `process` (used by `handle` and `handle_many`) runs the coroutine with
+    `asyncio.run` and must not be used from inside a running event loop.
+    """
+
+    async def process_async(self, request: Request) -> Optional[Result]:
+        """Asynchronously apply this handler's own responsibility.
+
+        :param request: The incoming request.
+        :return: Result to stop the chain; None to pass the request on.
+        """
+        raise NotImplementedError
+
+    def process(self, request: Request) -> Optional[Result]:
+        """Synchronous fallback for use outside an event loop.
+
+        :param request: The incoming request.
+        :return: Result to stop the chain; None to pass the request on.
+        """
+        return asyncio.run(self.process_async(request))
+
 
 class AuthenticationHandler(BaseHandler):
     """Validates that the request is authenticated (e.g., bearer of a user_id)."""
 
-    def handle(self, request: Request) -> Optional[Result]:
-        """Process only when authentication is required and present.
+    pure = True
+
+    def process(self, request: Request) -> Optional[Result]:
+        """Reject requests that require authentication but carry no user.
 
         :param request: The incoming request.
-        :return: Success result if authenticated; otherwise delegate.
+        :return: Failure if unauthenticated; None (pass on) otherwise.
         """
-        requires_auth: bool = request.payload.get("requires_auth", False)
-        user_id: Optional[str] = request.payload.get("user_id")
-
-        if requires_auth and not user_id:
+        payload = request.payload
+        if payload.get("requires_auth", False) and not payload.get("user_id"):
             return Result(success=False, message="Unauthenticated request")
 
-        # Not applicable or passed → delegate
-        return self._delegate(request)
+        # Not applicable or passed → pass on
+        return None
+
+
+class _Stripe:
+    """One lock plus the LRU of token buckets for the keys hashed to it.
+
+    :param capacity: Maximum number of buckets this stripe keeps.
+    """
+
+    __slots__ = ("lock", "buckets", "capacity")
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.buckets: OrderedDict[Hashable, list[float]] = OrderedDict()
+
+
+class TokenBucketLimiter:
+    """Per-key token buckets with lazy refill, bounded memory and lock striping.
+
+    Each key gets a bucket of `burst` tokens refilled at `rate` tokens per second,
+    computed lazily on access (no background timers). Keys are spread over up to
+    `STRIPES` independently locked LRUs whose capacities add up to exactly
+    `max_keys` (fewer stripes are used when `max_keys < STRIPES`), so at most
+    `max_keys` buckets are held. Eviction is least-recently-used within a stripe;
+    an evicted key starts again with a full bucket. Every call is O(1).
+
+    :param rate: Tokens added per second.
+    :param burst: Bucket capacity (maximum burst size).
+    :param max_keys: Maximum number of buckets kept in memory.
+    :param clock: Monotonic time source in seconds (injectable for tests).
+    """
+
+    STRIPES = 16
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        max_keys: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._rate = rate
+        self._burst = burst
+        self._clock = clock
+        max_keys = max(1, max_keys)
+        count = min(self.STRIPES, max_keys)
+        share, extra = divmod(max_keys, count)
+        self._stripes = tuple(_Stripe(share + (i < extra)) for i in range(count))
+
+    def __len__(self) -> int:
+        return sum(len(stripe.buckets) for stripe in self._stripes)
+
+    def allow(self, key: Hashable) -> bool:
+        """Take one token from the bucket of `key`.
+
+        :param key: Identity being limited (e.g. a user id).
+        :return: True if a token was available; False if the key is rate limited.
+        """
+        stripe = self._stripes[hash(key) % len(self._stripes)]
+        with stripe.lock:
+            now = self._clock()
+            buckets = stripe.buckets
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = [self._burst, now]
+                if len(buckets) > stripe.capacity:
+                    buckets.popitem(last=False)
+            else:
+                buckets.move_to_end(key)
+                bucket[0] = min(self._burst, bucket[0] + (now - bucket[1]) * self._rate)
+                bucket[1] = now
+            if bucket[0] >= 1.0:
+                bucket[0] -= 1.0
+                return True
+            return False
 
 
 class RateLimitHandler(BaseHandler):
-    """Applies a simple rate limiting check using a precomputed flag/counter."""
+    """Rejects rate-limited requests.
 
-    def handle(self, request: Request) -> Optional[Result]:
-        """Reject the request if rate-limited; otherwise delegate.
+    Honors a caller-supplied ``rate_limited`` flag and, when a limiter is given,
+    enforces per-user token buckets keyed by ``payload["user_id"]``.
+
+    :param next_handler: Optional next handler in the chain.
+    :param limiter: Optional per-user limiter; requests without a user id are not limited.
+    """
+
+    def __init__(
+        self,
+        next_handler: Optional[BaseHandler] = None,
+        limiter: Optional[TokenBucketLimiter] = None,
+    ) -> None:
+        super().__init__(next_handler)
+        self._limiter = limiter
+        self.pure = limiter is None
+
+    def process(self, request: Request) -> Optional[Result]:
+        """Reject the request if rate-limited.
 
         :param request: The incoming request.
-        :return: Failure if limited; delegated result otherwise.
+        :return: Failure if limited; None (pass on) otherwise.
         """
-        limited: bool = request.payload.get("rate_limited", False)
+        payload = request.payload
+        limited: bool = payload.get("rate_limited", False)
+        if not limited and self._limiter is not None:
+            user_id = payload.get("user_id")
+            limited = user_id is not None and not self._limiter.allow(user_id)
 
         if limited:
             return Result(success=False, message="Rate limit exceeded")
 
-        return self._delegate(request)
+        return None
 
 
 class BusinessRuleHandler(BaseHandler):
     """Validates a domain-specific business rule for a given request kind."""
 
-    def handle(self, request: Request) -> Optional[Result]:
-        """Validate the business rule for supported kinds; otherwise delegate.
+    kinds = frozenset({"create_order"})
+    pure = True
+
+    def process(self, request: Request) -> Optional[Result]:
+        """Validate the business rule for supported kinds.
 
         :param request: The incoming request.
-        :return: Success if the rule passes; delegated/None otherwise.
+        :return: Validation result for supported kinds; None (pass on) otherwise.
         """
         if request.kind == "create_order":
             # Example rule: minimum items required
@@ -150,26 +422,353 @@ class BusinessRuleHandler(BaseHandler):
             # Rule passed → considered handled here (no further processing needed)
             return Result(success=True, message="Order validated", data={"items_count": len(items)})
 
-        # Not our responsibility → delegate
-        return self._delegate(request)
+        # Not our responsibility → pass on
+        return None
+
+
+_Step = Callable[[Request], Optional[Result]]
+# (expires_at, stored Result, copier applied to its data on every hit)
+_CacheEntry = tuple[float, Optional[Result], Callable[[Any], Any]]
+
+
+class CompiledChain(BaseHandler):
+    """A handler chain flattened into a single loop over `process` steps.
+
+    Produced by `compile_chain`: no Python frame per handler and early exit on the
+    first Result, with the same Results as the linked chain. Steps are indexed by
+    request kind, so a request only visits wildcard handlers and the handlers that
+    declared its kind. The chain is snapshotted; recompile after calling `set_next`
+    on any of its handlers.
+
+    `handle_many`/`handle_many_async` do not use the flattened loop: they run the
+    compiled handlers as batch stages (`process_many`, or `process_async` for an
+    AsyncHandler), like a linked chain.
+
+    :param handlers: Flattenable handlers in chain order; their bound `process`
+        methods become the steps.
+    :param tail: First handler that overrides `handle` itself (runs the rest), if any.
+    """
+
+    def __init__(
+        self,
+        handlers: tuple[BaseHandler, ...],
+        tail: Optional[BaseHandler] = None,
+    ) -> None:
+        super().__init__()
+        self._handlers = handlers
+        self._tail = tail
+        entries: list[tuple[_Step, Optional[frozenset[str]]]] = [
+            (handler.process, handler.kinds) for handler in handlers
+        ]
+        self._wildcard = tuple(step for step, kinds in entries if kinds is None)
+        declared: set[str] = set()
+        for _, kinds in entries:
+            declared.update(kinds or ())
+        self._routes = {
+            kind: tuple(step for step, kinds in entries if kinds is None or kind in kinds)
+            for kind in declared
+        }
+
+    def __len__(self) -> int:
+        return len(self._handlers)
+
+    def _stages(self) -> Iterator[BaseHandler]:
+        yield from self._handlers
+        if self._tail is not None:
+            yield self._tail
+        if self._next is not None:
+            yield from self._next._stages()
+
+    def steps_for(self, kind: str) -> int:
+        """Number of handler steps a request of `kind` visits.
+
+        :param kind: Request kind.
+        :return: Count of routed steps (excluding a tail handler).
+        """
+        return len(self._routes.get(kind, self._wildcard))
+
+    def process(self, request: Request) -> Optional[Result]:
+        """Run the steps routed for the request kind until one produces a Result.
+
+        :param request: The incoming request.
+        :return: First Result produced; None if every step passed the request on.
+        """
+        for step in self._routes.get(request.kind, self._wildcard):
+            result = step(request)
+            if result is not None:
+                return result
+        if self._tail is not None:
+            return self._tail.handle(request)
+        return None
+
+
+def compile_chain(head: BaseHandler) -> CompiledChain:
+    """Flatten a linked handler chain into a kind-indexed `CompiledChain`.
+
+    Handlers implementing `process` become loop steps; the first handler that
+    overrides `handle` (and therefore delegates itself) ends the loop as its tail,
+    even if it also has a `process` method. A compiled sub-chain is spliced in; if it
+    has a tail, the handlers linked after the sub-chain are compiled into the next
+    handler of the result, which runs once the tail passes the request on.
+
+    :param head: The head of the handler chain.
+    :return: The compiled chain.
+    """
+    handlers: list[BaseHandler] = []
+    node: Optional[BaseHandler] = head
+    while node is not None:
+        if not _flattenable(node):
+            return CompiledChain(tuple(handlers), tail=node)
+        if isinstance(node, CompiledChain):
+            handlers.extend(node._handlers)
+            if node._tail is not None:
+                compiled = CompiledChain(tuple(handlers), tail=node._tail)
+                if node._next is not None:
+                    compiled.set_next(compile_chain(node._next))
+                return compiled
+        else:
+            handlers.append(node)
+        node = node._next
+    return CompiledChain(tuple(handlers))
+
+
+def _freeze(value: Any) -> Hashable:
+    """Convert a payload value into a hashable, type-tagged key component.
+
+    Plain strings are returned as is (no other component compares equal to one); the
+    exact-type checks keep the common payload shapes off the slower isinstance path.
+
+    :raises TypeError: If the value (or a nested value) is unhashable.
+    """
+    cls = type(value)
+    if cls is str:
+        return value
+    if cls is dict or isinstance(value, dict):
+        return dict, frozenset([(key, _freeze(item)) for key, item in value.items()])
+    if cls is list or cls is tuple or isinstance(value, list | tuple):
+        return cls, tuple([_freeze(item) for item in value])
+    if isinstance(value, set | frozenset):
+        return type(value), frozenset(_freeze(item) for item in value)
+    hash(value)
+    return type(value), value
+
+
+def request_key(request: Request) -> Optional[Hashable]:
+    """Stable cache key for a request, independent of payload insertion order.
+
+    :param request: The request to key.
+    :return: Hashable key, or None if the payload holds unhashable values.
+    """
+    try:
+        return request.kind, _freeze(request.payload)
+    except TypeError:
+        return None
+
+
+class ResultCache:
+    """Size-bounded LRU cache (with optional TTL) of pure handlers' `process` results.
+
+    Every caller gets its own copy of a cached Result, so mutating a returned Result
+    never changes what later callers see. `data` is shared when immutable, shallow-copied
+    when it is a flat list or dict of immutable values, and deep-copied otherwise.
+
+    :param max_entries: Maximum number of cached results.
+    :param ttl: Seconds a result stays valid (None = until evicted).
+    :param clock: Monotonic time source in seconds (injectable for tests).
+    """
 
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_entries = max(1, max_entries)
+        self._ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, _CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.uncacheable = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def wrap(self, handler: BaseHandler) -> _Step:
+        """Memoize `handler.process` through this cache.
+
+        :param handler: A pure handler.
+        :return: Drop-in replacement for the handler's bound `process`.
+        """
+        process = handler.process
+
+        def memoized(request: Request) -> Optional[Result]:
+            key = request_key(request)
+            if key is None:
+                with self._lock:
+                    self.uncacheable += 1
+                return process(request)
+            return self._get_or_compute((handler, key), process, request)
+
+        return memoized
+
+    def _get_or_compute(self, key: Hashable, process: _Step, request: Request) -> Optional[Result]:
+        now = self._clock() if self._ttl is not None else 0.0
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, result, copy_data = entry
+                if expires_at >= now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    if result is None:
+                        return None
+                    return Result(result.success, result.message, copy_data(result.data))
+                del self._entries[key]
+            self.misses += 1
+        result = process(request)
+        expires_at = now + self._ttl if self._ttl is not None else float("inf")
+        stored, copy_data = None, _share
+        if result is not None:
+            copy_data = _data_copier(result.data)
+            stored = Result(result.success, result.message, copy_data(result.data))
+        with self._lock:
+            self._entries[key] = (expires_at, stored, copy_data)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+
+_IMMUTABLE = (str, int, float, complex, bool, bytes, type(None))
+
+
+def _share(data: Any) -> Any:
+    return data
+
+
+def _data_copier(data: Any) -> Callable[[Any], Any]:
+    """Cheapest copy that keeps a cached `data` value independent of its callers."""
+    if isinstance(data, _IMMUTABLE):
+        return _share
+    if type(data) is dict and all(isinstance(item, _IMMUTABLE) for item in data.values()):
+        return dict.copy
+    if type(data) is list and all(isinstance(item, _IMMUTABLE) for item in data):
+        return list.copy
+    return copy.deepcopy
+
+
+class _MemoizedRun(BaseHandler):
+    """Consecutive pure handlers memoized as one step, so a request is keyed once.
+
+    :param handlers: Flattenable pure handlers in chain order.
+    """
+
+    pure = True
+    costly = True
+
+    def __init__(self, handlers: tuple[BaseHandler, ...]) -> None:
+        super().__init__()
+        self._steps = tuple((handler.process, handler.kinds) for handler in handlers)
+        if all(handler.kinds is not None for handler in handlers):
+            self.kinds = frozenset().union(*(handler.kinds or () for handler in handlers))
+
+    def process(self, request: Request) -> Optional[Result]:
+        """Run the handlers' steps that apply to the request until one produces a Result.
+
+        :param request: The incoming request.
+        :return: First Result produced; None if every step passed the request on.
+        """
+        kind = request.kind
+        for step, kinds in self._steps:
+            if kinds is None or kind in kinds:
+                result = step(request)
+                if result is not None:
+                    return result
+        return None
+
+
+def memoize_chain(head: BaseHandler, cache: ResultCache) -> BaseHandler:
+    """Route the `process` step of every pure handler in a chain through `cache`.
 
-def build_default_chain() -> BaseHandler:
+    Consecutive pure handlers that inherit `handle` are relinked as a single memoized
+    step, so a request is keyed and looked up once per run rather than once per
+    handler. Runs without a `costly` handler are left as they are: computing them is
+    cheaper than the lookup. Apply before `compile_chain` so compiled steps pick up the
+    memoized methods. Impure handlers (e.g. a RateLimitHandler with a limiter) are left
+    untouched.
+
+    :param head: The head of the handler chain.
+    :param cache: Cache receiving the results.
+    :return: Head of the memoized chain (a new node if the head starts a run).
+    """
+    links: list[BaseHandler] = []
+    run: list[BaseHandler] = []
+    node: Optional[BaseHandler] = head
+    while node is not None:
+        if node.pure and _flattenable(node) and not isinstance(node, CompiledChain):
+            run.append(node)
+        else:
+            links.extend(_memoized_run(run, cache))
+            run = []
+            if node.costly and node.pure and type(node).process is not BaseHandler.process:
+                vars(node)["process"] = cache.wrap(node)  # handle() still calls process
+            links.append(node)
+        node = node._next
+    links.extend(_memoized_run(run, cache))
+    for link, following in pairwise(links):
+        link._next = following
+    links[-1]._next = None
+    return links[0]
+
+
+def _memoized_run(run: list[BaseHandler], cache: ResultCache) -> list[BaseHandler]:
+    """:return: The run as one memoized link (the handler itself if it runs alone);
+        the run unchanged if none of its handlers is costly.
+    """
+    if not any(handler.costly for handler in run):
+        return run
+    node = run[0] if len(run) == 1 else _MemoizedRun(tuple(run))
+    vars(node)["process"] = cache.wrap(node)  # instance attribute shadows the method
+    return [node]
+
+
+def build_default_chain(
+    compiled: bool = False,
+    limiter: Optional[TokenBucketLimiter] = None,
+    profiler: Optional[ChainProfiler] = None,
+) -> BaseHandler:
     """Build a canonical chain (Authentication → RateLimit → BusinessRule).
 
+    :param compiled: Return the chain flattened by `compile_chain`.
+    :param limiter: Optional per-user limiter for the RateLimitHandler.
+    :param profiler: Optional profiler instrumenting every handler (linked chains only).
     :return: The head of the handler chain.
+    :raises ValueError: If both `compiled` and `profiler` are requested.
     """
+    if compiled and profiler is not None:
+        raise ValueError("Profiled handlers cannot be flattened; profile the linked chain.")
     head = AuthenticationHandler()
-    head.set_next(RateLimitHandler()).set_next(BusinessRuleHandler())
-    return head
+    head.set_next(RateLimitHandler(limiter=limiter)).set_next(BusinessRuleHandler())
+    if profiler is not None:
+        profiler.instrument(head)
+    return compile_chain(head) if compiled else head
 
 
 __all__ = [
     "Request",
     "Result",
     "BaseHandler",
+    "AsyncHandler",
     "AuthenticationHandler",
+    "TokenBucketLimiter",
     "RateLimitHandler",
     "BusinessRuleHandler",
+    "CompiledChain",
+    "compile_chain",
+    "ResultCache",
+    "request_key",
+    "memoize_chain",
     "build_default_chain",
 ]
@@ -2,8 +2,9 @@
 ui_chain.py — Chain-of-Responsibility for robust UI actions in Selenium tests.
 """
 
+import time
 from dataclasses import dataclass, field
-from typing import Any, Optional, Mapping
+from typing import Any, Callable, Optional, Mapping
 from types import MappingProxyType
 from abc import ABC, abstractmethod
 
@@ -11,6 +12,8 @@ from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from .chain_profiler import ChainProfiler
+
 
 # ---------- Data Models ----------
 @dataclass(frozen=True, slots=True)
@@ -24,12 +27,15 @@ class UIRequest:
     :param action: Logical action to perform ("click", ...). Handlers may ignore unknown actions.
     :param params: Extra parameters for fine-grained control (e.g., timeouts, validation locators).
                    Exposed as a read-only mapping.
+    :param context: Mutable scratch space shared by the handlers of one flow run
+                    (e.g., the resolved element under "element").
     """
     driver: WebDriver
     by: str
     value: str
     action: str = "click"
     params: Mapping[str, Any] = field(default_factory=dict)
+    context: dict[str, Any] = field(default_factory=dict, compare=False)
 
     def __post_init__(self) -> None:
         """Wraps `params` into an immutable MappingProxy for safety."""
@@ -158,27 +164,228 @@ class ScrollIntoView(UIHandler):
 
 
 class WaitStable(UIHandler):
-    """Waits for the element's layout to stabilize."""
+    """
+    Waits for the element's layout to stabilize.
+
+    Supported params:
+      - stability_mode: "fixed" (default) samples twice, `stability_delay` apart;
+        "adaptive" polls every `stability_interval` and passes as soon as
+        `stability_samples` consecutive samples match, failing after `stability_timeout`
+      - stability_delay: float seconds (default: 0.25)
+      - stability_interval: float seconds (default: 0.02)
+      - stability_samples: int, at least 2 (default: the constructor's `stability_samples`)
+      - stability_timeout: float seconds (default: 1.0)
+    """
+
+    JS = "return arguments[0].getBoundingClientRect().toJSON();"
+
+    # Fewer samples would pass without ever comparing two rects.
+    MIN_STABILITY_SAMPLES = 2
+
+    def __init__(
+        self,
+        nxt: Optional[UIHandler] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        stability_samples: int = 3,
+    ) -> None:
+        """
+        :param nxt: Next handler in the chain to which this handler can delegate.
+        :param clock: Monotonic time source in seconds (injectable for tests/benchmarks).
+        :param sleep: Sleep function matching `clock` (injectable for tests/benchmarks).
+        :param stability_samples: Consecutive matching samples required in adaptive mode.
+        :raises ValueError: If `stability_samples` is below 2 (nothing would be compared).
+        """
+        if stability_samples < self.MIN_STABILITY_SAMPLES:
+            raise ValueError(
+                f"stability_samples must be at least {self.MIN_STABILITY_SAMPLES}, "
+                f"got {stability_samples}"
+            )
+        super().__init__(nxt)
+        self._clock = clock
+        self._sleep = sleep
+        self._stability_samples = stability_samples
 
     def handle(self, req: UIRequest) -> Optional[UIResult]:
         """
-        Samples the element's boundingClientRect twice and compares results.
+        Samples the element's boundingClientRect and compares results.
 
         :param req: UIRequest containing driver and locator.
         :return: Failure if positions differ (unstable layout); delegated result otherwise.
         """
-        import time
-        js = "return arguments[0].getBoundingClientRect().toJSON();"
         try:
             el = req.driver.find_element(req.by, req.value)
-            rect1 = req.driver.execute_script(js, el)
-            time.sleep(float(req.params.get("stability_delay", 0.25)))
-            rect2 = req.driver.execute_script(js, el)
-            if rect1 == rect2:
-                return self._delegate(req)
-            return UIResult(False, "Element layout unstable before action")
+            if req.params.get("stability_mode", "fixed") == "adaptive":
+                stable = self._settles(req, el)
+            else:
+                rect1 = req.driver.execute_script(self.JS, el)
+                self._sleep(float(req.params.get("stability_delay", 0.25)))
+                stable = rect1 == req.driver.execute_script(self.JS, el)
         except Exception:
             return UIResult(False, "Failed stability check")
+        if stable:
+            return self._delegate(req)
+        return UIResult(False, "Element layout unstable before action")
+
+    def _settles(self, req: UIRequest, el: Any) -> bool:
+        """
+        Polls the bounding rect until enough consecutive samples match.
+
+        :param req: UIRequest carrying the adaptive stability params.
+        :param el: Element to sample.
+        :return: True once the layout is stable; False if the cap is reached first.
+        :raises ValueError: If the request asks for fewer than 2 samples.
+        """
+        interval = float(req.params.get("stability_interval", 0.02))
+        needed = int(req.params.get("stability_samples", self._stability_samples))
+        if needed < self.MIN_STABILITY_SAMPLES:
+            raise ValueError(
+                f"stability_samples must be at least {self.MIN_STABILITY_SAMPLES}, got {needed}"
+            )
+        deadline = self._clock() + float(req.params.get("stability_timeout", 1.0))
+        previous = req.driver.execute_script(self.JS, el)
+        streak = 1
+        while streak < needed:
+            if self._clock() >= deadline:
+                return False
+            self._sleep(interval)
+            current = req.driver.execute_script(self.JS, el)
+            streak = streak + 1 if current == previous else 1
+            previous = current
+        return True
+
+
+class FusedWait(UIHandler):
+    """
+    Presence, visibility, scroll and stability checks in a single browser round trip.
+
+    Replaces FindElement → EnsureVisible → ScrollIntoView → WaitStable: one
+    `execute_async_script` call locates the element, waits until it is visible,
+    centers it once and then polls its bounding rect until two consecutive samples
+    match, all inside the page. The resolved element is cached in
+    `req.context["element"]` while the following handlers run, and removed again when
+    they return, so a reused request never clicks an element from an earlier pass.
+    Locators the page cannot resolve itself (e.g. link text) are first polled with
+    `find_element` every `poll_interval`; that wait counts against the same
+    `timeout_ready`.
+
+    Supported params:
+      - timeout_ready: float seconds for the whole check (default: 8); keep it below
+        the driver's script timeout (30 s by default)
+      - poll_interval: float seconds between in-page samples (default: 0.05)
+    """
+
+    # Locator strategies resolved in the page; others are awaited via WebDriverWait first.
+    IN_PAGE_STRATEGIES = frozenset(
+        {"css selector", "xpath", "id", "name", "class name", "tag name"}
+    )
+
+    SCRIPT = """
+var by = arguments[0], value = arguments[1], found = arguments[2];
+var deadline = Date.now() + arguments[3], interval = arguments[4];
+var done = arguments[arguments.length - 1];
+var scrolled = false, last = null, status = 'absent';
+function locate() {
+  if (found) return found.isConnected ? found : null;
+  switch (by) {
+    case 'css selector': return document.querySelector(value);
+    case 'id': return document.getElementById(value);
+    case 'name': return document.getElementsByName(value)[0] || null;
+    case 'class name': return document.getElementsByClassName(value)[0] || null;
+    case 'tag name': return document.getElementsByTagName(value)[0] || null;
+    case 'xpath': return document.evaluate(value, document, null,
+        XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+  }
+  return null;
+}
+function visible(el) {
+  var style = window.getComputedStyle(el), rect = el.getBoundingClientRect();
+  return style.visibility !== 'hidden' && style.display !== 'none'
+      && style.opacity !== '0' && rect.width > 0 && rect.height > 0;
+}
+function poll() {
+  var el = locate();
+  if (!el) { status = 'absent'; last = null; }
+  else if (!visible(el)) { status = 'hidden'; last = null; }
+  else {
+    if (!scrolled) { el.scrollIntoView({block: 'center'}); scrolled = true; }
+    var r = el.getBoundingClientRect(), sample = [r.x, r.y, r.width, r.height].join(',');
+    if (sample === last) { done({status: 'ok', element: el}); return; }
+    status = 'unstable'; last = sample;
+  }
+  if (Date.now() >= deadline) { done({status: status, element: null}); return; }
+  setTimeout(poll, interval);
+}
+poll();
+"""
+
+    def __init__(
+        self,
+        nxt: Optional[UIHandler] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """
+        :param nxt: Next handler in the chain to which this handler can delegate.
+        :param clock: Monotonic time source in seconds (injectable for tests/benchmarks).
+        :param sleep: Sleep function matching `clock` (injectable for tests/benchmarks).
+        """
+        super().__init__(nxt)
+        self._clock = clock
+        self._sleep = sleep
+
+    def handle(self, req: UIRequest) -> Optional[UIResult]:
+        """
+        Runs the fused readiness check and delegates on success.
+
+        :param req: UIRequest containing driver and locator.
+        :return: Failure result naming the unmet condition; delegated result otherwise.
+        """
+        timeout = float(req.params.get("timeout_ready", 8))
+        interval = float(req.params.get("poll_interval", 0.05))
+        deadline = self._clock() + timeout
+        found = None
+        if req.by not in self.IN_PAGE_STRATEGIES:
+            found = self._await_presence(req, deadline, interval)
+            if found is None:
+                return UIResult(False, f"Element not present: ({req.by}, {req.value})")
+        timeout_ms = max(0, int((deadline - self._clock()) * 1000))
+        try:
+            outcome = req.driver.execute_async_script(
+                self.SCRIPT, req.by, req.value, found, timeout_ms, int(interval * 1000)
+            )
+        except Exception:
+            return UIResult(False, "Failed fused readiness check")
+        status = outcome.get("status") if outcome else None
+        if status == "ok":
+            req.context["element"] = outcome["element"]
+            try:
+                return self._delegate(req)
+            finally:
+                req.context.pop("element", None)
+        if status == "hidden":
+            return UIResult(False, f"Element not visible: ({req.by}, {req.value})")
+        if status == "unstable":
+            return UIResult(False, "Element layout unstable before action")
+        return UIResult(False, f"Element not present: ({req.by}, {req.value})")
+
+    def _await_presence(self, req: UIRequest, deadline: float, interval: float) -> Any:
+        """
+        Polls `find_element` for a locator the page script cannot resolve.
+
+        :param req: UIRequest containing driver and locator.
+        :param deadline: `clock` time at which to give up.
+        :param interval: Seconds between lookups.
+        :return: The located element, or None if it did not appear before `deadline`.
+        """
+        while True:
+            try:
+                return req.driver.find_element(req.by, req.value)
+            except Exception:
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    return None
+                self._sleep(min(interval, remaining))
 
 
 class ClickAction(UIHandler):
@@ -196,7 +403,7 @@ class ClickAction(UIHandler):
             return self._delegate(req)
 
         try:
-            el = req.driver.find_element(req.by, req.value)
+            el = req.context.get("element") or req.driver.find_element(req.by, req.value)
             el.click()
             return self._delegate(req) or UIResult(True, "Clicked")
         except Exception:
@@ -233,7 +440,9 @@ class ValidateResult(UIHandler):
 
 
 # ---------- Builder ----------
-def build_ui_click_flow() -> UIHandler:
+def build_ui_click_flow(
+    profiler: Optional[ChainProfiler] = None, fused: bool = False
+) -> UIHandler:
     """
     Builds a canonical chain for robust clicking in UI tests.
 
@@ -245,12 +454,24 @@ def build_ui_click_flow() -> UIHandler:
       5) ClickAction       — perform the click.
       6) ValidateResult    — optional post-condition check.
 
+    With `fused=True`, steps 1–4 are replaced by a single FusedWait round trip.
+
+    :param profiler: Optional profiler instrumenting every handler of the flow.
+    :param fused: Whether to use FusedWait instead of the four separate checks.
     :return: The head of the chain (first handler).
     """
-    head = FindElement()
-    head.set_next(EnsureVisible()) \
-        .set_next(ScrollIntoView()) \
-        .set_next(WaitStable()) \
-        .set_next(ClickAction()) \
-        .set_next(ValidateResult())
+    head: UIHandler
+    if fused:
+        head = FusedWait()
+        head.set_next(ClickAction()) \
+            .set_next(ValidateResult())
+    else:
+        head = FindElement()
+        head.set_next(EnsureVisible()) \
+            .set_next(ScrollIntoView()) \
+            .set_next(WaitStable()) \
+            .set_next(ClickAction()) \
+            .set_next(ValidateResult())
+    if profiler is not None:
+        profiler.instrument(head)
     return head
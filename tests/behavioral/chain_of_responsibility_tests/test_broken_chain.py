@@ -1,6 +1,8 @@
 import pytest
+
+from behavioral.chain_of_responsibility import broken_chain
 from behavioral.chain_of_responsibility.broken_chain import Game, Creature, DoubleAttackModifier,\
-    IncreaseDefenseModifier
+    IncreaseDefenseModifier, WhatToQuery, AffineModifier, Stage
 
 
 class StrongCreature(Creature):
@@ -18,3 +20,264 @@ def test_modifiers_double_attack_and_increase_defense():
         with IncreaseDefenseModifier(game, gob):
             assert gob.defense == 5
     assert gob.attack == 2 and gob.defense == 2
+
+
+@pytest.mark.unit
+def test_indexed_modifiers_only_see_their_creature_and_attribute():
+    game = Game()
+    creatures = [Creature(game, f"gob{i}", attack=1, defense=1) for i in range(100)]
+    seen = []
+
+    class CountingAttackModifier(DoubleAttackModifier):
+        def handle(self, sender, query):
+            seen.append((sender.name, query.what_to_query))
+            super().handle(sender, query)
+
+    modifiers = [DoubleAttackModifier(game, c) for c in creatures]
+    counter = CountingAttackModifier(game, creatures[7])
+    assert [c.attack for c in creatures[5:9]] == [2, 2, 4, 2]
+    assert creatures[7].defense == 1
+    assert seen == [("gob7", WhatToQuery.ATTACK)]
+
+    counter.__exit__(None, None, None)
+    counter.__exit__(None, None, None)  # removing twice is a no-op
+    for modifier in modifiers:
+        modifier.__exit__(None, None, None)
+    assert creatures[7].attack == 1
+    assert not any(game._index[what] for what in WhatToQuery)
+
+
+@pytest.mark.unit
+def test_broadcast_subscriber_can_unsubscribe_during_dispatch():
+    game = Game()
+    gob = Creature(game, "gob", attack=2, defense=2)
+    calls = []
+
+    def once(sender, query):
+        calls.append(query.what_to_query)
+        game.queries.remove(once)
+
+    def plus_one(sender, query):
+        query.value += 1
+
+    game.queries.append(once)
+    game.queries.append(plus_one)
+    with DoubleAttackModifier(game, gob):
+        assert gob.attack == 6  # additive stage runs before the multiplicative one
+        assert gob.attack == 6
+    assert calls == [WhatToQuery.ATTACK]
+    assert len(game.queries) == 1
+
+
+@pytest.mark.unit
+def test_dispatch_keeps_registration_order_and_duplicate_handlers():
+    game = Game()
+    gob = Creature(game, "gob", attack=2, defense=2)
+    calls = []
+
+    def log(sender, query):
+        calls.append("broadcast")
+
+    class Logged(AffineModifier):
+        what_to_query = WhatToQuery.ATTACK
+
+        def handle(self, sender, query):
+            calls.append("indexed")
+
+    game.queries.append(log)
+    Logged(game, gob)
+    game.queries.append(log)
+    assert len(game.queries) == 2
+    assert gob.attack == 2
+    assert calls == ["broadcast", "indexed", "broadcast"]
+
+    game.queries.remove(log)
+    assert len(game.queries) == 1
+    calls.clear()
+    assert gob.attack == 2
+    assert calls == ["indexed", "broadcast"]
+
+    with IncreaseDefenseModifier(game, gob) as twice:
+        game.subscribe(gob, WhatToQuery.DEFENSE, twice.handle)
+        assert gob.defense == 8
+        assert game.effective_stats([gob], WhatToQuery.DEFENSE) == [8]
+    assert gob.defense == 5
+
+
+@pytest.mark.unit
+def test_effective_stats_are_cached_until_modifiers_change():
+    game = Game()
+    gob = Creature(game, "gob", attack=2, defense=2)
+    other = Creature(game, "other", attack=1, defense=1)
+    calls = []
+
+    class ScalableAttack(DoubleAttackModifier):
+        factor = 2
+
+        def handle(self, sender, query):
+            calls.append(sender.name)
+            query.value *= self.factor
+
+    modifier = ScalableAttack(game, gob)
+    assert [gob.attack for _ in range(5)] == [4] * 5
+    assert calls == ["gob"]
+
+    assert other.attack == 1
+    with DoubleAttackModifier(game, other):
+        assert other.attack == 2
+        assert gob.attack == 4 and calls == ["gob"]  # other creature's change is precise
+
+    modifier.factor = 3
+    modifier.changed()
+    assert gob.attack == 6 and len(calls) == 2
+
+    gob.initial_attack = 5
+    assert gob.attack == 15
+
+    def plus_one(sender, query):
+        query.value += 1
+
+    game.queries.append(plus_one)  # broadcast subscribers invalidate every creature
+    assert gob.attack == 18 and other.attack == 2
+    game.queries.remove(plus_one)
+    modifier.__exit__(None, None, None)
+    assert gob.attack == 5 and other.attack == 1
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("numpy_enabled", [False] + [True] * broken_chain.HAVE_NUMPY)
+def test_batch_effective_stats_match_per_creature_queries(monkeypatch, numpy_enabled):
+    monkeypatch.setattr(broken_chain, "HAVE_NUMPY", numpy_enabled)
+    game = Game()
+    creatures = [Creature(game, f"gob{i}", attack=i % 7, defense=i % 5) for i in range(300)]
+
+    class PlusTwoAttack(DoubleAttackModifier):
+        def handle(self, sender, query):
+            if sender is self.creature and query.what_to_query == WhatToQuery.ATTACK:
+                query.value += 2
+
+    for i, creature in enumerate(creatures):
+        for _ in range(i % 3):
+            DoubleAttackModifier(game, creature)
+        if i % 4 == 0:
+            IncreaseDefenseModifier(game, creature)
+        if i % 50 == 0:
+            PlusTwoAttack(game, creature)
+        if i % 60 == 0:
+            IncreaseDefenseModifier(game, creature)  # defense +3 applied twice
+
+    def expected():
+        return [c.attack for c in creatures], [c.defense for c in creatures]
+
+    attacks, defenses = expected()
+    assert game.effective_stats(creatures, WhatToQuery.ATTACK) == attacks
+    assert game.effective_stats(creatures, WhatToQuery.DEFENSE) == defenses
+    assert defenses[0] == 0 + 3 + 3 and attacks[50] == (50 % 7) * 4 + 2
+
+    def halve(sender, query):
+        query.value //= 2
+
+    game.queries.append(halve)  # broadcast subscribers force the dispatch path
+    attacks, _ = expected()
+    assert game.effective_stats(creatures, WhatToQuery.ATTACK) == attacks
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("base", [2**40, 2**62, 2**70])
+def test_numpy_batch_path_does_not_overflow(monkeypatch, base):
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(broken_chain, "HAVE_NUMPY", True)
+    game = Game()
+    creatures = [Creature(game, f"gob{i}", attack=base + i, defense=0) for i in range(3)]
+    for creature in creatures[1:]:
+        DoubleAttackModifier(game, creature)
+    DoubleAttackModifier(game, creatures[2])
+    expected = [base, (base + 1) * 2, (base + 2) * 4]
+    assert game.effective_stats(creatures, WhatToQuery.ATTACK) == expected
+    assert [c.attack for c in creatures] == expected
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("numpy_enabled", [False] + [True] * broken_chain.HAVE_NUMPY)
+def test_batch_columns_follow_modifier_changes(monkeypatch, numpy_enabled):
+    monkeypatch.setattr(broken_chain, "HAVE_NUMPY", numpy_enabled)
+    game = Game()
+    creatures = [Creature(game, f"gob{i}", attack=i + 1, defense=0) for i in range(6)]
+
+    def check():
+        expected = [c.attack for c in creatures]
+        assert game.effective_stats(creatures, WhatToQuery.ATTACK) == expected
+
+    modifiers = [DoubleAttackModifier(game, c) for c in creatures[:3]]
+    check()
+    DoubleAttackModifier(game, creatures[0])  # updates an existing row
+    modifiers += [DoubleAttackModifier(game, c) for c in creatures[3:]]  # grows the columns
+    check()
+    with modifiers[1]:
+        pass  # frees gob1's row ...
+    DoubleAttackModifier(game, creatures[5])
+    check()
+    with modifiers[2]:
+        pass
+    DoubleAttackModifier(game, creatures[2])  # ... and gob2 reuses one
+    check()
+    big = DoubleAttackModifier(game, creatures[4])
+    big.multiplier = 2**70
+    big.changed()  # coefficients no longer fit in int64
+    check()
+    assert game.effective_stats(creatures, WhatToQuery.ATTACK)[4] == 5 * 2 * 2**70
+
+
+@pytest.mark.unit
+def test_composed_cache_only_holds_creatures_with_modifiers():
+    game = Game()
+    creatures = [Creature(game, f"gob{i}", attack=1, defense=1) for i in range(50)]
+    assert [c.attack for c in creatures] == [1] * 50
+    assert game.effective_stats(creatures, WhatToQuery.DEFENSE) == [1] * 50
+    assert not any(columns.rows for columns in game._columns.values())
+
+    with DoubleAttackModifier(game, creatures[3]):
+        assert creatures[3].attack == 2
+        assert list(game._columns[WhatToQuery.ATTACK].rows) == [creatures[3]]
+    assert creatures[3].attack == 1
+    assert not any(columns.rows for columns in game._columns.values())
+    assert not any(game._stale.values())
+
+
+@pytest.mark.unit
+def test_stages_make_modifier_order_irrelevant():
+    class Plus(AffineModifier):
+        what_to_query = WhatToQuery.ATTACK
+        addend = 1
+
+    class Reset(AffineModifier):
+        what_to_query = WhatToQuery.ATTACK
+        stage = Stage.OVERRIDE
+        multiplier = 0
+
+        def __init__(self, game, creature, value, priority):
+            self.addend = value
+            self.priority = priority
+            super().__init__(game, creature)
+
+    results = set()
+    for order in ((0, 1, 2), (2, 1, 0), (1, 2, 0)):
+        game = Game()
+        gob = Creature(game, "gob", attack=3, defense=0)
+        factories = [
+            lambda g=game, c=gob: DoubleAttackModifier(g, c),
+            lambda g=game, c=gob: Plus(g, c),
+            lambda g=game, c=gob: Plus(g, c),
+        ]
+        for i in order:
+            factories[i]()
+        results.add((gob.attack, game.affine(gob, WhatToQuery.ATTACK)))
+    assert results == {(10, (2, 4))}
+
+    game = Game()
+    gob = Creature(game, "gob", attack=3, defense=0)
+    Reset(game, gob, value=100, priority=5)
+    Reset(game, gob, value=7, priority=1)
+    DoubleAttackModifier(game, gob)
+    assert gob.attack == 100  # highest-priority override is applied last
+    assert game.effective_stats([gob], WhatToQuery.ATTACK) == [100]
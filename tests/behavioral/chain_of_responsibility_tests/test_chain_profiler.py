@@ -0,0 +1,96 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from behavioral.chain_of_responsibility.chain_profiler import ChainProfiler
+from behavioral.chain_of_responsibility.method_chain import (
+    BaseHandler,
+    BusinessRuleHandler,
+    Request,
+    build_default_chain,
+    compile_chain,
+)
+
+
+@pytest.mark.unit
+def test_profiler_counts_calls_and_final_result_producers():
+    profiler = ChainProfiler()
+    chain = build_default_chain(profiler=profiler)
+    chain.handle(Request(kind="create_order", payload={"requires_auth": True}))
+    chain.handle(Request(kind="create_order", payload={"user_id": "u1", "rate_limited": True}))
+    chain.handle(Request(kind="create_order", payload={"user_id": "u1", "items": ["A"]}))
+    chain.handle(Request(kind="other", payload={"user_id": "u1"}))
+    stats = {row.handler: row for row in profiler.stats()}
+    assert [row.calls for row in stats.values()] == [4, 3, 2]
+    assert stats["0:AuthenticationHandler"].final_results == 1
+    assert stats["1:RateLimitHandler"].final_results == 1
+    assert stats["2:BusinessRuleHandler"].final_results == 1
+    for row in stats.values():
+        assert 0.0 <= row.self_ms <= row.total_ms
+    assert "BusinessRuleHandler" in profiler.table()
+
+
+@pytest.mark.unit
+def test_profiler_cannot_be_combined_with_compiled_chain():
+    with pytest.raises(ValueError):
+        build_default_chain(compiled=True, profiler=ChainProfiler())
+
+
+@pytest.mark.unit
+def test_profiler_aggregates_alike_chains_and_ignores_reinstrumenting():
+    profiler = ChainProfiler()
+    first = build_default_chain(profiler=profiler)
+    second = build_default_chain(profiler=profiler)
+    profiler.instrument(first)
+    request = Request(kind="create_order", payload={"user_id": "u1", "items": ["A"]})
+    first.handle(request)
+    second.handle(request)
+    assert [row.calls for row in profiler.stats()] == [2, 2, 2]
+    assert profiler.stats()[2].final_results == 2
+
+
+class _Boom(BaseHandler):
+    def handle(self, request):
+        raise RuntimeError(self._delegate(request))
+
+
+class _Recover(BaseHandler):
+    def handle(self, request):
+        try:
+            return self._delegate(request)
+        except RuntimeError as exc:
+            return exc.args[0]
+
+
+@pytest.mark.unit
+def test_profiler_resets_result_attribution_when_a_handler_raises():
+    profiler = ChainProfiler()
+    head = _Recover()
+    head.set_next(_Boom()).set_next(BusinessRuleHandler())
+    profiler.instrument(head)
+    assert head.handle(Request(kind="create_order", payload={"items": ["A"]})).success
+    stats = {row.handler: row for row in profiler.stats()}
+    assert stats["0:_Recover"].final_results == 1
+    assert stats["2:BusinessRuleHandler"].final_results == 0
+
+
+@pytest.mark.unit
+def test_profiler_sees_batches_and_compiled_chains():
+    profiler = ChainProfiler()
+    chain = build_default_chain(profiler=profiler)
+    request = Request(kind="create_order", payload={"user_id": "u1", "items": ["A"]})
+    chain.handle_many([request, request])
+    compile_chain(chain).handle(request)
+    assert [row.calls for row in profiler.stats()] == [3, 3, 3]
+    assert profiler.stats()[2].final_results == 3
+
+
+@pytest.mark.unit
+def test_profiler_counts_concurrent_calls():
+    profiler = ChainProfiler()
+    chain = build_default_chain(profiler=profiler)
+    request = Request(kind="create_order", payload={"user_id": "u1", "items": ["A"]})
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: chain.handle(request), range(2_000)))
+    assert [row.calls for row in profiler.stats()] == [2_000] * 3
+    assert profiler.stats()[2].final_results == 2_000
@@ -1,5 +1,6 @@
 import pytest
-from behavioral.chain_of_responsibility.goblin_horde_chain import Game, Goblin, GoblinKing
+from behavioral.chain_of_responsibility.goblin_horde_chain import Game, Goblin, GoblinKing, Query,\
+    RegistryChange, WhatToQuery
 
 
 @pytest.mark.unit
@@ -11,3 +12,96 @@ def test_goblin_horde_effects():
     assert g1.attack == 1 and g1.defense == 2
     king = GoblinKing(g); g.creatures.append(king)
     assert g1.attack == 2 and g1.defense == 3
+
+
+def broadcast(creature, what):
+    base = creature.initial_attack if what == WhatToQuery.ATTACK else creature.initial_defense
+    q = Query(what, base)
+    for c in creature.game.creatures:
+        c.query(creature, q)
+    return q.value
+
+
+@pytest.mark.unit
+def test_horde_aggregates_match_broadcast_queries():
+    g = Game()
+    goblins = [Goblin(g) for _ in range(5)]
+    kings = [GoblinKing(g) for _ in range(2)]
+    g.creatures += goblins
+    g.creatures.extend(kings)
+    g.creatures.append(goblins[0])  # listed twice
+    g.creatures.insert(0, kings[0])
+    g.creatures.remove(goblins[3])
+    outsider = Goblin(g)
+
+    def check():
+        for c in goblins + kings + [outsider]:
+            assert (c.attack, c.defense) == (
+                broadcast(c, WhatToQuery.ATTACK), broadcast(c, WhatToQuery.DEFENSE))
+
+    check()
+    assert (g.goblin_count, g.king_count) == (5, 3)
+    assert (kings[0].attack, kings[0].defense) == (4, 9)
+    g.creatures.pop()
+    del g.creatures[:2]
+    check()
+    g.creatures = list(kings)
+    check()
+    assert (g.goblin_count, g.king_count) == (0, 2)
+
+
+@pytest.mark.unit
+def test_registry_keeps_list_semantics():
+    g = Game()
+    a, b, c = Goblin(g), GoblinKing(g), Goblin(g)
+    g.creatures += [a, b, c, a]
+    assert g.creatures == [a, b, c, a] and g.creatures[1:3] == [b, c]
+    assert g.creatures.count(a) == 2 and g.creatures.index(c) == 2
+    g.creatures.remove(a)
+    assert g.creatures == [b, c, a]
+    assert g.creatures.pop(0) is b and g.creatures == [c, a]
+    g.creatures[0] = b
+    g.creatures.sort(key=lambda creature: creature.initial_attack)
+    assert g.creatures == [a, b]
+    g.creatures[:] = [c]
+    assert list(g.creatures.of_type(Goblin)) == [c] and g.king_count == 0
+
+
+@pytest.mark.unit
+def test_registry_swap_remove_type_index_and_notifications():
+    g = Game()
+    changes = []
+    g.creatures.subscribe(lambda change, creature: changes.append((change, creature)))
+    horde = [GoblinKing(g) if i % 3 == 0 else Goblin(g) for i in range(9)]
+    g.creatures += horde
+    kings = g.creatures.of_type(GoblinKing)
+    assert set(kings) == {horde[0], horde[3], horde[6]}
+
+    g.creatures.discard(horde[0])
+    g.creatures.discard(horde[0])  # no-op once absent
+    with pytest.raises(ValueError):
+        g.creatures.remove(horde[0])
+    assert g.creatures[0] is horde[8]  # last creature moved into the freed slot
+    assert len(g.creatures) == 8 and horde[0] not in g.creatures
+    assert set(kings) == {horde[3], horde[6]}  # the view follows the registry
+    assert len(g.creatures.of_type(Goblin)) == 8
+    assert changes[-1] == (RegistryChange.REMOVED, horde[0])
+    assert [c for change, c in changes if change is RegistryChange.ADDED] == horde
+
+    g.creatures.clear()
+    assert not g.creatures.of_type(Goblin) and not kings and g.king_count == 0
+    assert len(changes) == 9 + 9
+
+
+@pytest.mark.unit
+def test_custom_rules_fall_back_to_broadcast():
+    class Shaman(Goblin):
+        def query(self, source, query):
+            if query.what_to_query == WhatToQuery.ATTACK:
+                query.value *= 2
+
+    g = Game()
+    g1, shaman, king = Goblin(g), Shaman(g), GoblinKing(g)
+    g.creatures += [g1, shaman, king]
+    assert g1.attack == 2 * 1 + 1
+    assert g1.defense == 1 + 1
@@ -0,0 +1,117 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from behavioral.chain_of_responsibility import horde_simulation
+from behavioral.chain_of_responsibility.goblin_horde_chain import Game, Goblin, GoblinKing
+from behavioral.chain_of_responsibility.horde_simulation import (
+    HordeSimulation,
+    run_sharded,
+    total_ticks_per_second,
+)
+
+
+def build_game(size):
+    game = Game()
+    game.creatures += [GoblinKing(game) if i % 4 == 0 else Goblin(game, attack=i % 3)
+                       for i in range(size)]
+    return game
+
+
+def kill_first_alive(simulation, tick):
+    simulation.kill(tick)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("numpy_enabled", [False] + [True] * horde_simulation.HAVE_NUMPY)
+def test_tick_matches_per_object_stats(monkeypatch, numpy_enabled):
+    monkeypatch.setattr(horde_simulation, "HAVE_NUMPY", numpy_enabled)
+    game = build_game(13)
+    simulation = HordeSimulation.from_game(game)
+    simulation.tick()
+    creatures = list(game.creatures)
+    assert list(simulation.attack) == [c.attack for c in creatures]
+    assert list(simulation.defense) == [c.defense for c in creatures]
+
+    simulation.kill(0)
+    simulation.kill(0)
+    game.creatures.remove(creatures[0])
+    index = simulation.spawn(5, 5, king=True)
+    king = GoblinKing(game)
+    king.initial_attack = king.initial_defense = 5
+    game.creatures.append(king)
+    simulation.tick()
+    assert simulation.attack[0] == simulation.defense[0] == 0
+    assert simulation.living == 13
+    for position, creature in [(i, creatures[i]) for i in range(1, 13)] + [(index, king)]:
+        assert (simulation.attack[position], simulation.defense[position]) == (
+            creature.attack, creature.defense)
+
+
+@pytest.mark.unit
+def test_custom_rules_are_rejected():
+    class Shaman(Goblin):
+        def query(self, source, query):
+            pass
+
+    game = build_game(3)
+    game.creatures.append(Shaman(game))
+    with pytest.raises(ValueError):
+        HordeSimulation.from_game(game)
+
+
+@pytest.mark.unit
+def test_duplicate_registrations_are_rejected():
+    game = build_game(4)
+    twice = game.creatures[1]
+    game.creatures.append(twice)
+    with pytest.raises(ValueError):
+        HordeSimulation.from_game(game)
+
+    game.creatures.pop()
+    simulation = HordeSimulation.from_game(game)
+    simulation.tick()
+    assert list(simulation.defense) == [creature.defense for creature in game.creatures]
+    assert list(simulation.attack) == [creature.attack for creature in game.creatures]
+
+
+@pytest.mark.unit
+def test_run_reports_and_sharding():
+    simulation = HordeSimulation.from_game(build_game(8))
+    report = simulation.run(3, on_tick=kill_first_alive)
+    assert (report.ticks, report.creatures) == (3, 5)
+    assert report.attack_total == sum(simulation.attack)
+    assert report.ticks_per_second > 0
+
+    shards = [HordeSimulation.from_game(build_game(size)) for size in (8, 20)]
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        reports = run_sharded(shards, ticks=3, on_tick=kill_first_alive, executor=pool)
+    assert reports[0] == report.__class__(5, 3, reports[0].seconds, report.attack_total,
+                                         report.defense_total)
+    assert reports[1].creatures == 17
+    assert total_ticks_per_second(reports) > 0
+
+
+@pytest.mark.slow
+def test_sharding_across_processes_leaves_callers_simulations_untouched():
+    shards = [HordeSimulation.from_game(build_game(size)) for size in (8, 20)]
+    reports = run_sharded(shards, ticks=3, processes=2, on_tick=kill_first_alive)
+    assert [r.creatures for r in reports] == [5, 17]
+    assert [shard.living for shard in shards] == [8, 20]
+
+
+@pytest.mark.unit
+def test_compact_drops_dead_creatures_and_keeps_stats():
+    game = build_game(10)
+    simulation = HordeSimulation.from_game(game)
+    for index in (0, 3, 4, 9):
+        simulation.kill(index)
+    simulation.tick()
+    before = [(simulation.attack[i], simulation.defense[i]) for i in range(10)]
+    survivors = simulation.compact()
+    assert survivors == [1, 2, 5, 6, 7, 8]
+    assert len(simulation) == simulation.living == 6
+    simulation.tick()
+    assert list(zip(simulation.attack, simulation.defense, strict=True)) == [
+        before[i] for i in survivors]
+    assert simulation.compact() == list(range(6))
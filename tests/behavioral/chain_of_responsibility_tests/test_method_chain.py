@@ -1,5 +1,22 @@
+import asyncio
+
 import pytest
-from behavioral.chain_of_responsibility.method_chain import build_default_chain, Request, Result
+from behavioral.chain_of_responsibility.method_chain import (
+    AsyncHandler,
+    AuthenticationHandler,
+    BaseHandler,
+    BusinessRuleHandler,
+    CompiledChain,
+    RateLimitHandler,
+    Request,
+    Result,
+    ResultCache,
+    TokenBucketLimiter,
+    build_default_chain,
+    compile_chain,
+    memoize_chain,
+    request_key,
+)
 
 
 @pytest.mark.unit
@@ -28,3 +45,257 @@ def test_create_order_validation_fails_when_empty():
     chain = build_default_chain()
     res = chain.handle(Request(kind="create_order", payload={"user_id": "u1", "items": []}))
     assert isinstance(res, Result) and res.success is False and "at least 1 item" in res.message
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "request_",
+    [
+        Request(kind="create_order", payload={"requires_auth": True, "items": ["A"]}),
+        Request(kind="create_order", payload={"user_id": "u1", "rate_limited": True}),
+        Request(kind="create_order", payload={"user_id": "u1", "items": ["A", "B"]}),
+        Request(kind="create_order", payload={"user_id": "u1", "items": []}),
+        Request(kind="unknown", payload={"user_id": "u1"}),
+    ],
+)
+def test_compiled_chain_matches_linked_chain(request_):
+    compiled = build_default_chain(compiled=True)
+    assert isinstance(compiled, CompiledChain) and len(compiled) == 3
+    assert compiled.handle(request_) == build_default_chain().handle(request_)
+
+
+class _LegacyHandler(BaseHandler):
+    def handle(self, request):
+        if request.kind == "legacy":
+            return Result(success=True, message="legacy")
+        return self._delegate(request)
+
+
+@pytest.mark.unit
+def test_compile_chain_keeps_handle_only_handlers_as_tail():
+    head = AuthenticationHandler()
+    head.set_next(_LegacyHandler()).set_next(BusinessRuleHandler())
+    compiled = compile_chain(head)
+    assert len(compiled) == 1
+    assert compiled.handle(Request(kind="legacy")).message == "legacy"
+    assert compiled.handle(Request(kind="create_order", payload={"items": ["A"]})).success
+
+
+class _ScreeningHandler(BusinessRuleHandler):
+    def handle(self, request):
+        if request.payload.get("flagged"):
+            return Result(success=False, message="flagged")
+        return super().handle(request)
+
+
+@pytest.mark.unit
+def test_compile_chain_keeps_handle_overrides_with_inherited_process():
+    head = AuthenticationHandler()
+    head.set_next(_ScreeningHandler())
+    compiled = compile_chain(head)
+    assert len(compiled) == 1
+    flagged = Request(kind="create_order", payload={"items": ["A"], "flagged": True})
+    assert compiled.handle(flagged).message == "flagged"
+    assert compiled.handle(Request(kind="create_order", payload={"items": ["A"]})).success
+
+
+class _AuditHandler(BaseHandler):
+    kinds = frozenset({"audit"})
+
+    def process(self, request):
+        return Result(success=True, message="audited")
+
+
+@pytest.mark.unit
+def test_compiled_chain_routes_by_request_kind():
+    head = AuthenticationHandler()
+    head.set_next(_AuditHandler()).set_next(RateLimitHandler()).set_next(BusinessRuleHandler())
+    compiled = compile_chain(head)
+    assert compiled.steps_for("audit") == 3
+    assert compiled.steps_for("create_order") == 3
+    assert compiled.steps_for("other") == 2
+    for request in (
+        Request(kind="audit"),
+        Request(kind="create_order", payload={"items": ["A"]}),
+        Request(kind="other", payload={"rate_limited": True}),
+        Request(kind="other"),
+    ):
+        assert compiled.handle(request) == head.handle(request)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("legacy_tail", [False, True])
+def test_compile_chain_keeps_handlers_after_compiled_sub_chain(legacy_tail):
+    sub_head = AuthenticationHandler()
+    if legacy_tail:
+        sub_head.set_next(_LegacyHandler())
+    sub = compile_chain(sub_head)
+    sub.set_next(_AuditHandler()).set_next(BusinessRuleHandler())
+    compiled = compile_chain(sub)
+    requests = [
+        Request(kind="audit"),
+        Request(kind="legacy"),
+        Request(kind="create_order", payload={"items": []}),
+        Request(kind="other"),
+    ]
+    expected = [sub.handle(request) for request in requests]
+    assert expected[0].message == "audited"
+    assert expected[2].success is False
+    assert [compiled.handle(request) for request in requests] == expected
+    assert compiled.handle_many(requests) == expected
+
+
+@pytest.mark.unit
+def test_token_bucket_limits_per_user_and_refills():
+    now = [0.0]
+    limiter = TokenBucketLimiter(rate=1.0, burst=2, clock=lambda: now[0])
+    chain = build_default_chain(limiter=limiter)
+    order = {"user_id": "u1", "items": ["A"]}
+    results = [chain.handle(Request(kind="create_order", payload=order)) for _ in range(3)]
+    assert [r.success for r in results] == [True, True, False]
+    assert chain.handle(Request(kind="create_order", payload={**order, "user_id": "u2"})).success
+    now[0] += 1.0
+    assert chain.handle(Request(kind="create_order", payload=order)).success
+
+
+@pytest.mark.unit
+def test_token_bucket_memory_is_bounded():
+    limiter = TokenBucketLimiter(rate=1.0, burst=1, max_keys=TokenBucketLimiter.STRIPES * 4)
+    for user in range(10_000):
+        limiter.allow(f"user-{user}")
+    assert len(limiter) <= TokenBucketLimiter.STRIPES * 4
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("max_keys", [1, 5, 20, 100])
+def test_token_bucket_holds_exactly_max_keys(max_keys):
+    limiter = TokenBucketLimiter(rate=1.0, burst=1, max_keys=max_keys)
+    for user in range(1_000):
+        limiter.allow(f"user-{user}")
+    assert len(limiter) == max_keys
+
+
+_BATCH = [
+    Request(kind="create_order", payload={"requires_auth": True, "items": ["A"]}),
+    Request(kind="create_order", payload={"user_id": "u1", "rate_limited": True}),
+    Request(kind="create_order", payload={"user_id": "u1", "items": ["A", "B"]}),
+    Request(kind="create_order", payload={"user_id": "u1", "items": []}),
+    Request(kind="unknown", payload={"user_id": "u1"}),
+]
+
+
+@pytest.mark.unit
+def test_handle_many_matches_per_request_handle():
+    chain = build_default_chain()
+    assert chain.handle_many(_BATCH) == [chain.handle(r) for r in _BATCH]
+    compiled = build_default_chain(compiled=True)
+    assert compiled.handle_many(_BATCH) == [chain.handle(r) for r in _BATCH]
+
+
+class _SlowLookupHandler(AsyncHandler):
+    def __init__(self):
+        super().__init__()
+        self.in_flight = 0
+        self.peak = 0
+
+    async def process_async(self, request):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if request.payload.get("user_id") == "blocked":
+            return Result(success=False, message="Blocked user")
+        return None
+
+
+@pytest.mark.unit
+def test_handle_many_async_awaits_stage_concurrently_and_keeps_order():
+    lookup = _SlowLookupHandler()
+    head = AuthenticationHandler()
+    head.set_next(lookup).set_next(BusinessRuleHandler())
+    batch = _BATCH + [Request(kind="create_order", payload={"user_id": "blocked", "items": ["A"]})]
+    results = asyncio.run(head.handle_many_async(batch))
+    assert lookup.peak == len(batch) - 1
+    assert results[-1].message == "Blocked user"
+    assert results == [head.handle(r) for r in batch]
+
+
+@pytest.mark.unit
+def test_compiled_chain_awaits_async_handlers_in_batches():
+    lookup = _SlowLookupHandler()
+    head = AuthenticationHandler()
+    head.set_next(lookup).set_next(BusinessRuleHandler())
+    compiled = compile_chain(head)
+    batch = _BATCH + [Request(kind="create_order", payload={"user_id": "blocked", "items": ["A"]})]
+    results = asyncio.run(compiled.handle_many_async(batch))
+    assert lookup.peak == len(batch) - 1
+    assert results == [head.handle(r) for r in batch]
+
+
+class _QuoteHandler(BaseHandler):
+    kinds = frozenset({"quote"})
+    pure = True
+    costly = True
+
+    def process(self, request):
+        items = request.payload.get("items", [])
+        return Result(success=True, message="Quoted", data={"total": sum(map(len, items))})
+
+
+def _quote_chain():
+    head = AuthenticationHandler()
+    head.set_next(_QuoteHandler()).set_next(RateLimitHandler()).set_next(BusinessRuleHandler())
+    return head
+
+
+_QUOTE = Request(kind="quote", payload={"user_id": "u1", "items": ["AB", "C"]})
+
+
+@pytest.mark.unit
+def test_memoized_chain_matches_uncached_results_and_counts_hits():
+    cache = ResultCache(max_entries=100)
+    chain = compile_chain(memoize_chain(_quote_chain(), cache))
+    plain = _quote_chain()
+    batch = _BATCH + [_QUOTE]
+    for _ in range(2):
+        assert [chain.handle(r) for r in batch] == [plain.handle(r) for r in batch]
+    # The pure run is keyed once per request, not once per handler.
+    assert cache.misses == len(batch) and cache.hits == cache.misses
+    reordered = Request(kind="create_order", payload={"items": ["A", "B"], "user_id": "u1"})
+    assert request_key(reordered) == request_key(_BATCH[2])
+
+
+@pytest.mark.unit
+def test_memoize_chain_leaves_cheap_runs_alone():
+    cache = ResultCache()
+    head = build_default_chain()
+    assert memoize_chain(head, cache) is head
+    assert "process" not in vars(head)
+    head.handle(_BATCH[2])
+    assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
+
+
+@pytest.mark.unit
+def test_result_cache_ttl_and_unhashable_payloads():
+    now = [0.0]
+    cache = ResultCache(ttl=10.0, clock=lambda: now[0])
+    chain = memoize_chain(_quote_chain(), cache)
+    chain.handle(_QUOTE)
+    chain.handle(_QUOTE)
+    now[0] = 11.0
+    chain.handle(_QUOTE)
+    assert (cache.hits, cache.misses) == (1, 2)
+    chain.handle(Request(kind="quote", payload={"user_id": "u1", "items": [bytearray()]}))
+    assert cache.uncacheable == 1
+
+
+@pytest.mark.unit
+def test_result_cache_hands_out_independent_copies():
+    cache = ResultCache()
+    chain = memoize_chain(_quote_chain(), cache)
+    first = chain.handle(_QUOTE)
+    first.data["total"] = 99
+    first.message = "tampered"
+    second = chain.handle(_QUOTE)
+    assert cache.hits == 1
+    assert (second.message, second.data) == ("Quoted", {"total": 3})
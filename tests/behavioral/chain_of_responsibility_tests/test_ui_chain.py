@@ -48,3 +48,166 @@ def test_ui_click_flow_happy_path(monkeypatch):
     )
     result = flow.handle(req)
     assert result and result.success, result.message
+
+
+class FusedDriver(FakeDriver):
+    def __init__(self, status="ok"):
+        super().__init__()
+        self.status = status
+        self.calls = []
+
+    def find_element(self, by, value):
+        self.calls.append("find_element")
+        return self.element
+
+    def execute_async_script(self, script, *args):
+        by, _, found, timeout_ms, interval_ms = args
+        self.calls.append(("execute_async_script", by, found is not None, timeout_ms, interval_ms))
+        return {"status": self.status, "element": self.element if self.status == "ok" else None}
+
+
+def fused_flow(clock):
+    head = UIC.FusedWait(clock=clock.monotonic, sleep=clock.sleep)
+    head.set_next(UIC.ClickAction()).set_next(UIC.ValidateResult())
+    return head
+
+
+@pytest.mark.unit
+def test_fused_flow_uses_one_round_trip_and_caches_element():
+    clicked = []
+
+    class Recorder(UIC.UIHandler):
+        def handle(self, req):
+            clicked.append(req.context.get("element"))
+            return UIC.UIResult(True, "Clicked")
+
+    driver = FusedDriver()
+    req = UIC.UIRequest(driver=driver, by="css selector", value="#add-btn",
+                        params={"timeout_ready": 2, "poll_interval": 0.02})
+    result = fused_flow(FakeClock()).handle(req)
+    assert result and result.success, result.message
+    assert driver.calls == [("execute_async_script", "css selector", False, 2000, 20)]
+    assert driver.element._clicked
+
+    head = UIC.FusedWait(Recorder(), clock=FakeClock().monotonic)
+    assert head.handle(req).success
+    assert clicked == [driver.element] and "element" not in req.context
+
+
+@pytest.mark.unit
+def test_reused_request_does_not_click_element_from_earlier_pass(monkeypatch):
+    monkeypatch.setattr(UIC, "WebDriverWait", FakeWait)
+    driver = FusedDriver()
+    req = UIC.UIRequest(driver=driver, by="id", value="add")
+    assert fused_flow(FakeClock()).handle(req).success
+    stale, driver.element = driver.element, DummyElement()  # page re-rendered the button
+
+    assert UIC.build_ui_click_flow().handle(req).success
+    assert driver.element._clicked
+    stale._clicked = False
+    assert UIC.ClickAction().handle(req).success
+    assert driver.element._clicked and not stale._clicked
+
+
+class PresenceDriver(FusedDriver):
+    """Finds the element once the fake clock reaches `appears_at`."""
+
+    def __init__(self, clock, appears_at):
+        super().__init__()
+        self.clock = clock
+        self.appears_at = appears_at
+
+    def find_element(self, by, value):
+        self.calls.append("find_element")
+        if self.clock.now < self.appears_at:
+            raise LookupError(value)
+        return self.element
+
+
+@pytest.mark.unit
+def test_fused_flow_waits_for_locators_resolved_outside_the_page():
+    clock = FakeClock()
+    driver = PresenceDriver(clock, appears_at=0.5)
+    req = UIC.UIRequest(driver=driver, by="link text", value="Add", params={"poll_interval": 0.25})
+    assert fused_flow(clock).handle(req).success
+    assert driver.calls == ["find_element"] * 3 + [
+        ("execute_async_script", "link text", True, 7500, 250)]
+
+    clock = FakeClock()
+    driver = PresenceDriver(clock, appears_at=9.0)
+    result = fused_flow(clock).handle(UIC.UIRequest(driver=driver, by="link text", value="Add"))
+    assert not result.success and result.message == "Element not present: (link text, Add)"
+    assert "execute_async_script" not in str(driver.calls) and clock.now == pytest.approx(8.0)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("status, message", [
+    ("absent", "Element not present: (id, add)"),
+    ("hidden", "Element not visible: (id, add)"),
+    ("unstable", "Element layout unstable before action"),
+])
+def test_fused_flow_reports_unmet_condition(status, message):
+    driver = FusedDriver(status)
+    result = UIC.build_ui_click_flow(fused=True).handle(
+        UIC.UIRequest(driver=driver, by="id", value="add"))
+    assert not result.success and result.message == message
+    assert not driver.element._clicked
+
+
+class AnimatedDriver(FakeDriver):
+    """Element moves for the first `moving_samples` rect samples, then stays put."""
+
+    def __init__(self, moving_samples):
+        super().__init__()
+        self.moving_samples = moving_samples
+        self.samples = 0
+
+    def execute_script(self, script, element):
+        self.samples += 1
+        rect = dict(self.element._rect)
+        rect["y"] += min(self.samples, self.moving_samples + 1)
+        return rect
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.mark.unit
+def test_adaptive_stability_returns_after_consecutive_matches():
+    clock = FakeClock()
+    wait = UIC.WaitStable(clock=clock.monotonic, sleep=clock.sleep)
+    params = {"stability_mode": "adaptive", "stability_interval": 0.01, "stability_samples": 3}
+    driver = AnimatedDriver(moving_samples=4)
+    result = wait.handle(
+        UIC.UIRequest(driver=driver, by="id", value="add", params=params))
+    assert result is None  # stable and no next handler
+    assert driver.samples == 7 and clock.now == pytest.approx(0.06)
+
+    driver = AnimatedDriver(moving_samples=1000)
+    result = wait.handle(UIC.UIRequest(
+        driver=driver, by="id", value="add", params={**params, "stability_timeout": 0.1}))
+    assert not result.success and result.message == "Element layout unstable before action"
+    assert clock.now == pytest.approx(0.06 + 0.1)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("samples", [1, 0, -3])
+def test_adaptive_stability_requires_two_samples(samples):
+    with pytest.raises(ValueError, match="stability_samples"):
+        UIC.WaitStable(stability_samples=samples)
+
+    clock = FakeClock()
+    wait = UIC.WaitStable(clock=clock.monotonic, sleep=clock.sleep)
+    driver = AnimatedDriver(moving_samples=1000)
+    params = {"stability_mode": "adaptive", "stability_samples": samples}
+    result = wait.handle(UIC.UIRequest(driver=driver, by="id", value="add", params=params))
+    assert not result.success and result.message == "Failed stability check"
+    assert driver.samples == 0
@@ -1,5 +1,19 @@
 import pytest
-from behavioral.command.atomic_transfer_command import BankAccount, TransferCommand, TransactionError
+
+from behavioral.command.atomic_transfer_command import (
+    AtomicCompositeCommand,
+    BankAccount,
+    Command,
+    DepositCommand,
+    NettedTransferBatch,
+    PartialRollbackError,
+    RollbackMetrics,
+    TransactionError,
+    TransferCommand,
+    WithdrawCommand,
+    default_metrics,
+    net_transfers,
+)
 
 
 def test_transfer_success():
@@ -20,3 +34,169 @@ def test_transfer_rollback_on_overdraft():
     # balances unchanged after rollback
     assert a.balance_cents == 500
     assert b.balance_cents == 500
+
+
+def test_partial_rollback_to_savepoint_and_resume():
+    a = BankAccount("A", balance_cents=300)
+    b = BankAccount("B")
+    batch = AtomicCompositeCommand("batch", partial_rollback=True)
+    batch.add(TransferCommand(a, b, 100))
+    batch.add(TransferCommand(a, b, 100))
+    batch.savepoint()
+    batch.add(TransferCommand(a, b, 50))
+    batch.add(TransferCommand(a, b, 100))  # overdraft: only this segment is undone
+    with pytest.raises(PartialRollbackError) as info:
+        batch.execute()
+    assert info.value.savepoint == 2
+    assert batch.pending
+    assert (a.balance_cents, b.balance_cents) == (100, 200)
+
+    a.deposit(200)
+    batch.resume()
+    assert batch.executed
+    assert (a.balance_cents, b.balance_cents) == (150, 350)
+
+
+def test_nested_composite_resumes_from_inner_savepoint():
+    a = BankAccount("A", balance_cents=150)
+    b = BankAccount("B")
+    inner = AtomicCompositeCommand("inner", partial_rollback=True)
+    inner.add(TransferCommand(a, b, 100))
+    inner.savepoint()
+    inner.add(TransferCommand(a, b, 100))
+    outer = AtomicCompositeCommand("outer", [inner], partial_rollback=True)
+    with pytest.raises(PartialRollbackError):
+        outer.execute()
+    assert (a.balance_cents, b.balance_cents) == (50, 100)
+
+    outer.rollback()
+    assert (a.balance_cents, b.balance_cents) == (150, 0)
+    assert not inner.pending
+
+
+def test_strict_parent_rolls_back_pending_nested_composite():
+    a = BankAccount("A", balance_cents=150)
+    b = BankAccount("B")
+    inner = AtomicCompositeCommand("inner", partial_rollback=True)
+    inner.add(TransferCommand(a, b, 100))
+    inner.savepoint()
+    inner.add(TransferCommand(a, b, 100))
+    outer = AtomicCompositeCommand("outer", [TransferCommand(b, a, 0), inner])
+    with pytest.raises(TransactionError):
+        outer.execute()
+    assert (a.balance_cents, b.balance_cents) == (150, 0)
+
+
+def test_strict_parent_rolls_back_pending_grandchild():
+    a = BankAccount("A")
+    b = BankAccount("B")
+    child = AtomicCompositeCommand("child", [DepositCommand(a, 10)], partial_rollback=True)
+    child.savepoint()
+    child.add(WithdrawCommand(b, 5))
+    middle = AtomicCompositeCommand("middle", [child], partial_rollback=True)
+    outer = AtomicCompositeCommand("outer", [middle])
+    with pytest.raises(TransactionError) as info:
+        outer.execute()
+    assert not isinstance(info.value, PartialRollbackError)
+    assert a.balance_cents == 0
+    assert not (outer.pending or middle.pending or child.pending)
+
+
+def test_pending_grandchild_resumes_through_parents():
+    a = BankAccount("A")
+    b = BankAccount("B")
+    child = AtomicCompositeCommand("child", [DepositCommand(a, 10)], partial_rollback=True)
+    child.savepoint()
+    child.add(WithdrawCommand(b, 5))
+    middle = AtomicCompositeCommand("middle", [child], partial_rollback=True)
+    with pytest.raises(PartialRollbackError):
+        middle.execute()
+    assert middle.pending and child.pending
+    assert a.balance_cents == 10
+
+    b.deposit(5)
+    middle.resume()
+    assert middle.executed
+    assert (a.balance_cents, b.balance_cents) == (10, 0)
+
+
+def test_bilateral_netting_collapses_offsetting_flows():
+    a = BankAccount("A", balance_cents=100)
+    b = BankAccount("B", balance_cents=0)
+    batch = NettedTransferBatch(
+        "settle", [TransferCommand(a, b, 100), TransferCommand(b, a, 60)]
+    )
+    assert (batch.gross_count, batch.net_count) == (2, 1)
+    batch.execute()
+    assert (a.balance_cents, b.balance_cents) == (60, 40)
+
+
+def test_multilateral_netting_cancels_cycles():
+    a, b, c = BankAccount("A"), BankAccount("B"), BankAccount("C")
+    gross = [TransferCommand(a, b, 100), TransferCommand(b, c, 100), TransferCommand(c, a, 70)]
+    netted = net_transfers(gross, multilateral=True)
+    assert len(netted) == 1
+    assert (netted[0].source, netted[0].destination, netted[0].amount_cents) == (a, c, 30)
+    assert len(net_transfers(gross)) == 3
+
+
+def test_netted_batch_is_all_or_nothing():
+    a = BankAccount("A", balance_cents=50)
+    b = BankAccount("B", balance_cents=0)
+    c = BankAccount("C", balance_cents=0)
+    batch = NettedTransferBatch(
+        "settle", [TransferCommand(c, a, 5), TransferCommand(a, b, 50)], multilateral=True
+    )
+    with pytest.raises(TransactionError):
+        batch.execute()
+    assert (a.balance_cents, b.balance_cents, c.balance_cents) == (50, 0, 0)
+
+
+class _BrokenUndo(Command):
+    def __init__(self) -> None:
+        super().__init__("broken undo")
+
+    def execute(self) -> None:
+        self._executed = True
+
+    def undo(self) -> None:
+        raise RuntimeError("cannot compensate")
+
+
+def test_rollback_metrics_count_steps_and_undo_failures():
+    metrics = RollbackMetrics()
+    a = BankAccount("A", balance_cents=0)
+    b = BankAccount("B")
+    batch = AtomicCompositeCommand(
+        "batch", [_BrokenUndo(), TransferCommand(b, a, 0), TransferCommand(a, b, 1)], metrics=metrics
+    )
+    with pytest.raises(TransactionError):
+        batch.execute()
+    snap = metrics.snapshot()
+    assert snap["executes"] == 3  # the batch and both nested transfers
+    assert snap["rollbacks"] == 2  # the failing transfer and the batch
+    assert snap["steps_undone"] == 2
+    assert snap["undo_failures"] == 1
+    assert snap["max_rollback_seconds"] >= 0.0
+
+
+def test_nested_transfers_report_to_parent_metrics_and_undo_is_counted():
+    metrics = RollbackMetrics()
+    before = default_metrics.snapshot()
+    a = BankAccount("A", balance_cents=100)
+    b = BankAccount("B", balance_cents=0)
+    batch = AtomicCompositeCommand("batch", partial_rollback=True, metrics=metrics)
+    batch.add(TransferCommand(a, b, 10))
+    batch.savepoint()
+    batch.add(TransferCommand(a, b, 500))
+    with pytest.raises(PartialRollbackError):
+        batch.execute()
+    a.balance_cents += 1_000
+    batch.resume()
+    batch.undo()
+    snap = metrics.snapshot()
+    assert (snap["executes"], snap["resumes"]) == (4, 1)
+    assert (snap["rollbacks"], snap["undos"]) == (2, 1)
+    assert snap["undo_seconds"] >= 0.0
+    assert default_metrics.snapshot() == before
+    assert (a.balance_cents, b.balance_cents) == (1_100, 0)
@@ -1,4 +1,20 @@
-from behavioral.command.text_editor_command import TextBuffer, InsertText, MacroCommand, Invoker
+import pytest
+
+from behavioral.command.text_editor_command import (
+    BatchEditCommand,
+    DeleteText,
+    EditLogError,
+    GapBuffer,
+    InsertText,
+    Invoker,
+    LineIndexedBuffer,
+    MacroCommand,
+    MoveCursor,
+    MoveToLine,
+    PersistentInvoker,
+    PieceTableBuffer,
+    TextBuffer,
+)
 
 
 def test_insert_and_undo():
@@ -29,3 +45,205 @@ def test_invoker_undo_redo():
     assert buf.text == "A"
     assert inv.redo() is True
     assert buf.text == "AB"
+
+
+def test_alternative_buffers_match_string_buffer():
+    plain = TextBuffer("Hello World")
+    pieces, gap = PieceTableBuffer("Hello World"), GapBuffer("Hello World", gap_size=2)
+    for buf in (plain, pieces, gap):
+        inv = Invoker()
+        inv.run(MoveCursor(buf, 6))
+        inv.run(InsertText(buf, "dear "))
+        inv.run(MoveCursor(buf, 0))
+        inv.run(DeleteText(buf, 6))
+        inv.undo()
+    assert pieces.text == gap.text == plain.text == "Hello dear World"
+    assert pieces.cursor == gap.cursor == plain.cursor
+
+
+def test_invoker_evicts_oldest_by_count_and_bytes():
+    buf = TextBuffer()
+    inv = Invoker(undo_limit=3)
+    for ch in "abcde":
+        inv.run(InsertText(buf, ch))
+    stats = inv.stats()
+    assert (stats.undo_depth, stats.evicted) == (3, 2)
+
+    small = InsertText(TextBuffer(), "x")
+    small.execute()
+    byte_limit = 2 * small.payload_size()
+    inv = Invoker(undo_limit=100, byte_limit=byte_limit)
+    for _ in range(5):
+        inv.run(InsertText(buf, "x"))
+    assert inv.stats().undo_depth == 2
+    assert inv.stats().undo_bytes <= byte_limit
+    assert inv.undo() and inv.stats().redo_depth == 1
+
+
+def test_invoker_coalesces_typing_runs_within_window():
+    now = [0.0]
+    buf = TextBuffer()
+    inv = Invoker(coalesce_window=1.0, clock=lambda: now[0])
+    for ch in "Hello":
+        inv.run(InsertText(buf, ch))
+        now[0] += 0.1
+    now[0] += 5.0
+    inv.run(InsertText(buf, "!"))
+    assert inv.stats().undo_depth == 2
+    assert inv.undo() and buf.text == "Hello"
+    assert inv.undo() and buf.text == ""
+    assert inv.redo() and buf.text == "Hello"
+
+
+def test_invoker_coalesces_backspace_run():
+    buf = TextBuffer("abcdef", cursor=6)
+    inv = Invoker(coalesce_window=1.0, clock=lambda: 0.0)
+    for pos in (5, 4, 3):
+        buf.move_cursor(pos)
+        inv.run(DeleteText(buf, 1))
+    assert buf.text == "abc"
+    assert inv.stats().undo_depth == 1
+    assert inv.undo() and (buf.text, buf.cursor) == ("abcdef", 3)
+
+
+def test_persistent_invoker_resumes_buffer_and_history(tmp_path):
+    path = str(tmp_path / "session.log")
+    buf = TextBuffer()
+    with PersistentInvoker(buf, path, checkpoint_every=2) as inv:
+        inv.run(InsertText(buf, "Hello World"))
+        inv.run(MacroCommand([MoveCursor(buf, 6), InsertText(buf, "dear ")]))
+        inv.run(MoveCursor(buf, 0))
+        inv.run(DeleteText(buf, 6))
+        assert inv.undo() and buf.text == "Hello dear World"
+
+    resumed = TextBuffer()
+    with PersistentInvoker(resumed, path) as inv:
+        assert (resumed.text, resumed.cursor) == (buf.text, buf.cursor)
+        assert (inv.undo_depth, inv.redo_depth) == (3, 1)
+        assert inv.redo() and resumed.text == "dear World"
+        assert inv.undo() and inv.undo() and inv.undo()
+        assert resumed.text == "Hello World"
+
+
+def test_persistent_invoker_drops_truncated_tail(tmp_path):
+    path = tmp_path / "session.log"
+    buf = TextBuffer()
+    with PersistentInvoker(buf, str(path)) as inv:
+        inv.run(InsertText(buf, "abc"))
+        inv.run(InsertText(buf, "def"))
+    path.write_bytes(path.read_bytes()[:-2])
+
+    resumed = TextBuffer()
+    with PersistentInvoker(resumed, str(path)) as inv:
+        assert resumed.text == "abc"
+        assert inv.undo_depth == 1
+
+
+def test_batch_edit_replace_all_and_undo():
+    for buf in (TextBuffer("a-b-c-d", cursor=7), PieceTableBuffer("a-b-c-d", cursor=7)):
+        edits = [(i, 1, " + ") for i, ch in enumerate(buf.text) if ch == "-"]
+        inv = Invoker()
+        inv.run(BatchEditCommand(buf, edits))
+        assert (buf.text, buf.cursor) == ("a + b + c + d", 13)
+        assert inv.undo() and (buf.text, buf.cursor) == ("a-b-c-d", 7)
+        assert inv.redo() and buf.text == "a + b + c + d"
+
+
+def test_batch_edit_rejects_overlapping_edits():
+    buf = TextBuffer("abcdef")
+    with pytest.raises(ValueError):
+        buf.apply_batch([(0, 3, "x"), (2, 1, "y")])
+    assert buf.text == "abcdef"
+
+
+def test_persistent_invoker_logs_batch_edits(tmp_path):
+    path = str(tmp_path / "session.log")
+    buf = TextBuffer("x1x2x3", cursor=2)
+    with PersistentInvoker(buf, path) as inv:
+        inv.run(BatchEditCommand(buf, [(0, 1, "yy"), (2, 1, ""), (4, 0, "!")]))
+        edited = (buf.text, buf.cursor)
+
+    resumed = TextBuffer()
+    with PersistentInvoker(resumed, path) as inv:
+        assert (resumed.text, resumed.cursor) == edited
+        assert inv.undo() and (resumed.text, resumed.cursor) == ("x1x2x3", 2)
+
+
+def test_line_index_tracks_edits():
+    buf = LineIndexedBuffer("first\nsecond\nthird")
+    assert buf.line_count == 3
+    assert [buf.line_start(i) for i in range(3)] == [0, 6, 13]
+    inv = Invoker()
+    inv.run(MoveToLine(buf, 1, 3))
+    inv.run(InsertText(buf, "X\nY"))
+    assert buf.text == "first\nsecX\nYond\nthird"
+    assert buf.line_count == 4
+    assert buf.line_of(buf.cursor) == 2
+    assert buf.offset_of(3, 99) == len(buf.text)
+    inv.run(MoveToLine(buf, 0, 5))
+    inv.run(DeleteText(buf, 5))
+    assert buf.text == "first\nYond\nthird"
+    assert [buf.line_start(i) for i in range(buf.line_count)] == [0, 6, 11]
+    inv.undo()
+    inv.undo()
+    inv.undo()
+    assert (buf.text, buf.line_count, buf.line_of(buf.cursor)) == ("first\nsecond\nthird", 3, 1)
+
+
+def test_persistent_invoker_compacts_log_at_checkpoints(tmp_path):
+    path = tmp_path / "session.log"
+    buf = TextBuffer()
+    with PersistentInvoker(buf, str(path), checkpoint_every=4) as inv:
+        for _ in range(200):
+            inv.run(InsertText(buf, "x" * 50))
+            inv.undo()
+        inv.run(InsertText(buf, "kept"))
+        inv.run(InsertText(buf, "!"))
+        assert inv.undo()
+    # Superseded snapshots and undone branches are gone; live history survives.
+    assert path.stat().st_size < 200
+
+    resumed = TextBuffer()
+    with PersistentInvoker(resumed, str(path)) as inv:
+        assert resumed.text == "kept"
+        assert (inv.undo_depth, inv.redo_depth) == (1, 1)
+        assert inv.redo() and resumed.text == "kept!"
+        assert inv.undo() and inv.undo() and resumed.text == ""
+
+
+def test_persistent_invoker_appends_checkpoints_without_dead_records(tmp_path):
+    path = tmp_path / "session.log"
+    buf = TextBuffer()
+    with PersistentInvoker(buf, str(path), checkpoint_every=2) as inv:
+        inode = path.stat().st_ino
+        for word in ("a", "b", "c", "d", "e"):
+            inv.run(InsertText(buf, word))
+        inv.checkpoint()
+        # Nothing was undone, so checkpoints are appended in place.
+        assert path.stat().st_ino == inode
+        assert inv.undo() and inv.undo() and inv.undo()
+        inv.run(InsertText(buf, "!"))
+        inv.checkpoint()
+        # The abandoned redo branch outweighs the live entries: the log is rewritten.
+        assert path.stat().st_ino != inode
+
+    resumed = TextBuffer()
+    with PersistentInvoker(resumed, str(path)) as inv:
+        assert resumed.text == "ab!"
+        assert (inv.undo_depth, inv.redo_depth) == (3, 0)
+
+
+def test_persistent_invoker_treats_partial_header_as_new_log(tmp_path):
+    path = tmp_path / "session.log"
+    path.write_bytes(b"TXT")
+    buf = TextBuffer("draft", cursor=5)
+    with PersistentInvoker(buf, str(path)) as inv:
+        inv.run(InsertText(buf, "!"))
+
+    resumed = TextBuffer()
+    with PersistentInvoker(resumed, str(path)):
+        assert resumed.text == "draft!"
+
+    path.write_bytes(b"not a log")
+    with pytest.raises(EditLogError):
+        PersistentInvoker(TextBuffer(), str(path))